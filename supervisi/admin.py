@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import FormatSupervisi, ItemFormat, AspekFormat, Supervisi, JawabanItem, JawabanAspek
+from .models import FormatSupervisi, ItemFormat, AspekFormat, Supervisi, JawabanItem, JawabanAspek, Tugas
 
 class AspekFormatInline(admin.TabularInline):
     model = AspekFormat
@@ -11,7 +11,7 @@ class ItemFormatInline(admin.TabularInline):
 
 @admin.register(FormatSupervisi)
 class FormatSupervisiAdmin(admin.ModelAdmin):
-    list_display = ('nama', 'deskripsi')
+    list_display = ('nama', 'deskripsi', 'total_item', 'total_aspek')
     inlines = [ItemFormatInline]
 
 @admin.register(ItemFormat)
@@ -40,3 +40,9 @@ class JawabanAspekAdmin(admin.ModelAdmin):
     list_display = ('supervisi', 'aspek', 'd', 'td')
 
 admin.site.register(JawabanItem)
+
+
+@admin.register(Tugas)
+class TugasAdmin(admin.ModelAdmin):
+    list_display = ('id', 'jenis', 'status', 'progres', 'dibuat_oleh', 'dibuat', 'selesai')
+    list_filter = ('jenis', 'status')
@@ -0,0 +1,99 @@
+"""
+Analitik kepatuhan per aspek atas seluruh supervisi.
+
+Persentase D / TD / tidak dijawab per aspek dihitung dengan satu GROUP BY atas
+JawabanAspek join AspekFormat/ItemFormat, opsional dipecah per ruang, tim,
+jenjang PK, atau bulan. Hasil disimpan di cache per kombinasi filter; kunci
+cache memuat versi data jawaban (`VersiData 'jawaban'`) yang dinaikkan setiap
+kali jawaban ditulis, sehingga cache lama otomatis tidak terpakai lagi.
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import Count, F, Q
+from django.db.models.functions import TruncMonth
+
+from .models import JawabanAspek, VersiData
+
+VERSI_JAWABAN = 'jawaban'
+DURASI_CACHE = 60 * 60
+
+KELOMPOK = {
+    'ruang': ("Ruang", F('supervisi__ruang')),
+    'tim': ("Tim", F('supervisi__tim')),
+    'jenjang_pk': ("Jenjang PK", F('supervisi__jenjang_pk')),
+    'bulan': ("Bulan", TruncMonth('supervisi__tanggal')),
+}
+
+
+def _persen(n, total):
+    return round(n / total * 100, 1) if total else 0
+
+
+def _hitung(filter_form, kelompok):
+    qs = filter_form.filter(JawabanAspek.objects.all(), prefix='supervisi__')
+    kolom = ['aspek_id', 'aspek__nama_aspek', 'aspek__item_format_id',
+             'aspek__item_format__pertanyaan', 'aspek__item_format__format_supervisi__nama']
+    anotasi = {}
+    if kelompok:
+        anotasi['kelompok'] = KELOMPOK[kelompok][1]
+
+    baris = (
+        qs.order_by()
+        .values(*kolom, **anotasi)
+        .annotate(
+            total=Count('id'),
+            jumlah_d=Count('id', filter=Q(d=True)),
+            jumlah_td=Count('id', filter=Q(td=True, d=False)),
+            kosong=Count('id', filter=Q(d=False, td=False)),
+        )
+        .order_by('aspek__item_format__format_supervisi__nama', 'aspek__item_format_id', 'aspek_id',
+                  *(['kelompok'] if kelompok else []))
+    )
+    hasil = []
+    for b in baris:
+        label = b.get('kelompok')
+        if kelompok == 'bulan' and label is not None:
+            label = label.strftime('%Y-%m')
+        elif kelompok == 'tim' and label is not None:
+            label = f"Tim {label}"
+        hasil.append({
+            'aspek_id': b['aspek_id'],
+            'aspek': b['aspek__nama_aspek'],
+            'item_id': b['aspek__item_format_id'],
+            'item': b['aspek__item_format__pertanyaan'],
+            'format': b['aspek__item_format__format_supervisi__nama'],
+            'kelompok': label,
+            'total': b['total'],
+            'jumlah_d': b['jumlah_d'],
+            'jumlah_td': b['jumlah_td'],
+            'kosong': b['kosong'],
+            'persen_d': _persen(b['jumlah_d'], b['total']),
+            'persen_td': _persen(b['jumlah_td'], b['total']),
+            'persen_kosong': _persen(b['kosong'], b['total']),
+        })
+    return hasil
+
+
+def analitik_aspek(filter_form, kelompok=None):
+    """
+    Kembalikan daftar baris analitik per aspek (dan per `kelompok` bila diisi:
+    'ruang', 'tim', 'jenjang_pk', atau 'bulan') untuk supervisi yang lolos filter.
+    """
+    if kelompok not in KELOMPOK:
+        kelompok = None
+    parameter = f"{filter_form.kunci_cache()}#{kelompok or ''}"
+    kunci = 'analitik_aspek:{}:{}'.format(
+        VersiData.ambil(VERSI_JAWABAN),
+        hashlib.sha1(parameter.encode()).hexdigest(),
+    )
+    hasil = cache.get(kunci)
+    if hasil is None:
+        hasil = _hitung(filter_form, kelompok)
+        cache.set(kunci, hasil, DURASI_CACHE)
+    return hasil
+
+
+def tandai_jawaban_berubah():
+    """Naikkan versi data jawaban sehingga semua cache analitik menjadi usang."""
+    VersiData.naikkan(VERSI_JAWABAN)
@@ -0,0 +1,268 @@
+"""
+API JSON baca-saja untuk tablet ruangan dan sistem pelaporan rumah sakit.
+
+Endpoint (memerlukan login; perawat hanya melihat supervisinya sendiri):
+    GET  api/supervisi/            daftar supervisi (filter sama dengan SupervisiFilterForm)
+    GET  api/supervisi/<id>/       satu supervisi
+    GET  api/format/               daftar format
+    GET  api/format/<id>/          satu format
+    POST api/supervisi/kirim/      simpan kiriman offline tablet (lihat `kirim_supervisi`)
+
+Parameter umum:
+    fields=a,b,c   hanya kembalikan field tersebut (default: semua)
+    batas=N        ukuran halaman (default 50, maks 200)
+    setelah / sebelum   cursor dari `berikutnya` / `sebelumnya` halaman lain
+    jawaban=1      (supervisi) sertakan jawaban per aspek
+    struktur=1     (format) sertakan item dan aspek
+
+Baris dibaca dengan `.values()` hanya untuk kolom yang diminta (join ke user/format
+hanya bila field-nya diminta), dan data bertingkat dimuat sekali per halaman,
+sehingga jumlah query per permintaan tetap berapa pun ukuran halamannya.
+"""
+import json
+from functools import wraps
+
+from django.http import Http404, JsonResponse
+from django.views.decorators.http import require_POST, require_safe
+
+from .forms import SupervisiFilterForm
+from .models import FormatSupervisi, Supervisi
+from .pagination import paginasi_keyset
+from .services import jawaban_supervisi, simpan_kiriman
+from .storage import penyimpanan_ttd
+from .struktur import struktur_format_banyak
+
+UKURAN_HALAMAN = 50
+UKURAN_HALAMAN_MAKS = 200
+URUTAN_SUPERVISI = ('-tanggal', '-id')
+URUTAN_FORMAT = ('id',)
+MAKS_KIRIMAN = 200
+
+
+def _url_ttd(nama):
+    return penyimpanan_ttd.url(nama) if nama else None
+
+
+# nama field API -> (kolom `.values()`, fungsi konversi atau None)
+FIELD_SUPERVISI = {
+    'id': ('id', None),
+    'tanggal': ('tanggal', None),
+    'diubah': ('diubah', None),
+    'format_id': ('format_supervisi_id', None),
+    'format_nama': ('format_supervisi__nama', None),
+    'perawat': ('perawat__username', None),
+    'perawat_nama': ('perawat_nama', None),
+    'kepala_ruangan': ('kepala_ruangan__username', None),
+    'kepala_nama': ('kepala_nama', None),
+    'kepala_nip': ('kepala_nip', None),
+    'ruang': ('ruang', None),
+    'tim': ('tim', None),
+    'jenjang_pk': ('jenjang_pk', None),
+    'skor_total': ('skor_total', None),
+    'ttd_perawat': ('ttd_perawat', _url_ttd),
+    'ttd_kepala': ('ttd_kepala', _url_ttd),
+}
+
+FIELD_FORMAT = {
+    'id': ('id', None),
+    'nama': ('nama', None),
+    'deskripsi': ('deskripsi', None),
+    'total_item': ('total_item', None),
+    'total_aspek': ('total_aspek', None),
+    'versi': ('versi', None),
+}
+
+
+class KesalahanApi(Exception):
+    def __init__(self, pesan, status=400, **data):
+        super().__init__(pesan)
+        self.status = status
+        self.data = data
+
+
+def _api(view):
+    """Balas 401 JSON (bukan redirect login) dan ubah KesalahanApi/404 menjadi JSON."""
+    @wraps(view)
+    def pembungkus(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return JsonResponse({'error': "Login diperlukan."}, status=401)
+        try:
+            return view(request, *args, **kwargs)
+        except KesalahanApi as e:
+            return JsonResponse({'error': str(e), **e.data}, status=e.status)
+        except Http404:
+            return JsonResponse({'error': "Tidak ditemukan."}, status=404)
+    return pembungkus
+
+
+def api_view(view):
+    return require_safe(_api(view))
+
+
+def api_post(view):
+    return require_POST(_api(view))
+
+
+def _opsi(request, nama):
+    return request.GET.get(nama, '').lower() in ('1', 'true', 'ya')
+
+
+def _pilih_field(request, daftar):
+    """Nama field API yang diminta lewat `fields=`, urut seperti `daftar`."""
+    diminta = [f.strip() for f in request.GET.get('fields', '').split(',') if f.strip()]
+    if not diminta:
+        return list(daftar)
+    tidak_dikenal = [f for f in diminta if f not in daftar]
+    if tidak_dikenal:
+        raise KesalahanApi(
+            f"Field tidak dikenal: {', '.join(tidak_dikenal)}.", field_tersedia=list(daftar),
+        )
+    return [f for f in daftar if f in diminta]
+
+
+def _ukuran_halaman(request):
+    try:
+        ukuran = int(request.GET.get('batas', UKURAN_HALAMAN))
+    except ValueError:
+        raise KesalahanApi("Parameter 'batas' harus bilangan bulat.")
+    return max(1, min(ukuran, UKURAN_HALAMAN_MAKS))
+
+
+def _baris(qs, field, daftar, urutan=()):
+    """`.values()` untuk field API terpilih (plus kolom urutan yang dibutuhkan cursor)."""
+    kolom = {daftar[f][0] for f in field} | {u.lstrip('-') for u in urutan}
+    return qs.values(*kolom)
+
+
+def _serialisasi(baris, field, daftar):
+    hasil = {}
+    for f in field:
+        kolom, ubah = daftar[f]
+        hasil[f] = ubah(baris[kolom]) if ubah else baris[kolom]
+    return hasil
+
+
+def _url_halaman(request, kunci, cursor):
+    if cursor is None:
+        return None
+    q = request.GET.copy()
+    q.pop('setelah', None)
+    q.pop('sebelum', None)
+    q[kunci] = cursor
+    return f"{request.path}?{q.urlencode()}"
+
+
+def _respons_halaman(request, halaman, hasil):
+    return JsonResponse({
+        'hasil': hasil,
+        'berikutnya': _url_halaman(request, 'setelah', halaman.berikutnya),
+        'sebelumnya': _url_halaman(request, 'sebelum', halaman.sebelumnya),
+    })
+
+
+# ================== SUPERVISI ==================
+def _supervisi_terlihat(request):
+    qs = Supervisi.objects.all()
+    if not request.user.is_staff:
+        qs = qs.filter(perawat=request.user)
+    return qs
+
+
+def _data_supervisi(request, daftar_baris, field):
+    hasil = [_serialisasi(b, field, FIELD_SUPERVISI) for b in daftar_baris]
+    if _opsi(request, 'jawaban'):
+        jawaban = jawaban_supervisi([b['id'] for b in daftar_baris])
+        for data, b in zip(hasil, daftar_baris):
+            data['jawaban'] = [
+                {'aspek_id': aspek_id, 'd': d, 'td': td}
+                for aspek_id, (d, td) in sorted(jawaban.get(b['id'], {}).items())
+            ]
+    return hasil
+
+
+@api_view
+def daftar_supervisi(request):
+    filter_form = SupervisiFilterForm(request.GET)
+    if not filter_form.is_valid():
+        raise KesalahanApi("Filter tidak valid.", errors=filter_form.errors)
+    field = _pilih_field(request, FIELD_SUPERVISI)
+    qs = _baris(filter_form.filter(_supervisi_terlihat(request)), field, FIELD_SUPERVISI, URUTAN_SUPERVISI)
+    halaman = paginasi_keyset(
+        qs, URUTAN_SUPERVISI, request.GET.get('setelah'), request.GET.get('sebelum'),
+        ukuran=_ukuran_halaman(request),
+    )
+    return _respons_halaman(request, halaman, _data_supervisi(request, halaman.objek, field))
+
+
+@api_post
+def kirim_supervisi(request):
+    """
+    Simpan beberapa supervisi yang diisi offline di tablet sekaligus.
+
+    Body JSON: {"supervisi": [{"kunci": "<uuid buatan tablet>", "format_id": 3,
+    "tanggal": "2024-05-01", "tim": 1, "jenjang_pk": "PK I", "ruang": "...",
+    "jawaban": {"<aspek_id>": "D" | "TD" | ""}}, ...]}. Seperti form web, request
+    memerlukan header X-CSRFToken. Hasil per item dikembalikan urut seperti
+    kiriman; mengirim ulang batch yang sama tidak menggandakan data.
+    """
+    try:
+        data = json.loads(request.body)
+    except (ValueError, UnicodeDecodeError):
+        raise KesalahanApi("Body harus berupa JSON.")
+    daftar = data.get('supervisi') if isinstance(data, dict) else data
+    if not isinstance(daftar, list) or not daftar:
+        raise KesalahanApi("Kirim daftar supervisi pada kunci 'supervisi'.")
+    if len(daftar) > MAKS_KIRIMAN:
+        raise KesalahanApi(f"Maksimal {MAKS_KIRIMAN} supervisi per kiriman.")
+    hasil = simpan_kiriman(request.user, daftar)
+    jumlah = {status: sum(1 for h in hasil if h['status'] == status) for status in ('dibuat', 'sudah_ada', 'gagal')}
+    return JsonResponse({'hasil': hasil, **jumlah})
+
+
+@api_view
+def detail_supervisi(request, supervisi_id):
+    field = _pilih_field(request, FIELD_SUPERVISI)
+    baris = _baris(_supervisi_terlihat(request).filter(id=supervisi_id), field, FIELD_SUPERVISI, ('id',)).first()
+    if baris is None:
+        raise Http404
+    return JsonResponse(_data_supervisi(request, [baris], field)[0])
+
+
+# ================== FORMAT ==================
+def _data_format(request, daftar_baris, field):
+    hasil = [_serialisasi(b, field, FIELD_FORMAT) for b in daftar_baris]
+    if _opsi(request, 'struktur'):
+        struktur = struktur_format_banyak([b['id'] for b in daftar_baris])
+        for data, b in zip(hasil, daftar_baris):
+            data['items'] = [
+                {
+                    'id': item.id,
+                    'pertanyaan': item.pertanyaan,
+                    'bobot': item.bobot,
+                    'aspek': [
+                        {'id': a.id, 'nama_aspek': a.nama_aspek, 'd': a.d, 'td': a.td} for a in item.aspek
+                    ],
+                }
+                for item in (struktur[b['id']].items if b['id'] in struktur else ())
+            ]
+    return hasil
+
+
+@api_view
+def daftar_format(request):
+    field = _pilih_field(request, FIELD_FORMAT)
+    qs = _baris(FormatSupervisi.objects.all(), field, FIELD_FORMAT, URUTAN_FORMAT)
+    halaman = paginasi_keyset(
+        qs, URUTAN_FORMAT, request.GET.get('setelah'), request.GET.get('sebelum'),
+        ukuran=_ukuran_halaman(request),
+    )
+    return _respons_halaman(request, halaman, _data_format(request, halaman.objek, field))
+
+
+@api_view
+def detail_format(request, format_id):
+    field = _pilih_field(request, FIELD_FORMAT)
+    baris = _baris(FormatSupervisi.objects.filter(id=format_id), field, FIELD_FORMAT, ('id',)).first()
+    if baris is None:
+        raise Http404
+    return JsonResponse(_data_format(request, [baris], field)[0])
@@ -0,0 +1,69 @@
+"""
+Utilitas bersama untuk perintah benchmark (`manage.py bench_*`).
+
+Benchmark selalu berjalan di database uji sementara sehingga data produksi
+tidak tersentuh. Data contoh (format, supervisi) dibuat dengan sintetis.py.
+"""
+import json
+import statistics
+import time
+from contextlib import contextmanager
+
+from django.contrib.auth.models import Group, User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+
+
+@contextmanager
+def database_uji(verbosity=0):
+    """Buat database uji sementara selama blok `with`, lalu hapus lagi."""
+    setup_test_environment()
+    nama_lama = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=verbosity, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(nama_lama, verbosity=verbosity)
+        teardown_test_environment()
+
+
+def buat_user(username, staff=False, password='rahasia123'):
+    """Buat user dengan grup yang sama seperti halaman Kelola Akun."""
+    user = User.objects.create_user(username, password=password, is_staff=staff)
+    group, _ = Group.objects.get_or_create(name="Kepala Ruangan" if staff else "Perawat")
+    user.groups.add(group)
+    return user
+
+
+def ukur(fungsi, ulang):
+    """
+    Jalankan `fungsi` sebanyak `ulang` kali dan kembalikan statistik latensi (ms)
+    serta jumlah query per panggilan.
+    """
+    durasi = []
+    queries = []
+    for _ in range(ulang):
+        with CaptureQueriesContext(connection) as ctx:
+            mulai = time.perf_counter()
+            fungsi()
+            durasi.append((time.perf_counter() - mulai) * 1000)
+        queries.append(len(ctx.captured_queries))
+    durasi.sort()
+    return {
+        'ulang': ulang,
+        'p50_ms': round(statistics.median(durasi), 2),
+        'p95_ms': round(durasi[min(len(durasi) - 1, int(len(durasi) * 0.95))], 2),
+        'maks_ms': round(durasi[-1], 2),
+        'queries': max(queries),
+    }
+
+
+def tulis_laporan(stdout, baris, kolom, sebagai_json=False):
+    """Cetak hasil benchmark sebagai tabel teks atau JSON."""
+    if sebagai_json:
+        stdout.write(json.dumps(baris, indent=2))
+        return
+    lebar = {k: max(len(k), *(len(str(b.get(k, ''))) for b in baris)) for k in kolom}
+    stdout.write("  ".join(k.rjust(lebar[k]) for k in kolom))
+    for b in baris:
+        stdout.write("  ".join(str(b.get(k, '')).rjust(lebar[k]) for k in kolom))
@@ -0,0 +1,259 @@
+"""
+Ekspor massal hasil supervisi yang di-stream ke browser: arsip PDF (ZIP) dan
+data tabel (CSV/XLSX) ringkasan per supervisi atau per jawaban aspek.
+"""
+import csv
+import io
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+from django.db.models import BooleanField, ExpressionWrapper, Q
+
+from .models import JawabanAspek, Supervisi
+from .pdf import data_pdf_banyak, path_cache, render_pdf_bytes, simpan_cache_pdf
+from .pool_pdf import jumlah_worker_pdf, render_banyak
+
+
+class _Penampung:
+    """
+    Tujuan tulis tanpa seek untuk ZipFile. Byte yang sudah ditulis diambil lagi
+    dengan `ambil()` sehingga arsip bisa dikirim sepotong demi sepotong.
+    """
+
+    def __init__(self):
+        self._buf = bytearray()
+
+    def write(self, data):
+        self._buf += data
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def ambil(self):
+        data = bytes(self._buf)
+        self._buf.clear()
+        return data
+
+
+# jumlah minimal supervisi yang dibaca dan dirender per langkah ekspor ZIP
+# (dengan banyak worker: 4 PDF per worker supaya semua proses kebagian)
+UKURAN_BATCH_PDF = 20
+
+
+def _potong(daftar, ukuran):
+    for i in range(0, len(daftar), ukuran):
+        yield daftar[i:i + ukuran]
+
+
+def zip_pdf_supervisi(qs, ukuran_batch=None):
+    """
+    Generator potongan byte arsip ZIP berisi PDF setiap supervisi di `qs`.
+
+    Supervisi diproses per batch: data dibaca dari database dengan jumlah query
+    tetap per batch, PDF yang belum ada di cache dirender paralel di process pool
+    (lihat pool_pdf.py) dan disimpan ke cache, lalu langsung ditulis ke arsip.
+    Memori hanya menampung satu batch.
+    """
+    ukuran_batch = ukuran_batch or max(UKURAN_BATCH_PDF, 4 * jumlah_worker_pdf())
+    ids = list(qs.order_by('tanggal', 'id').values_list('id', flat=True))
+    penampung = _Penampung()
+
+    with zipfile.ZipFile(penampung, 'w', zipfile.ZIP_STORED) as arsip:
+        for batch_ids in _potong(ids, ukuran_batch):
+            batch = list(
+                Supervisi.objects
+                .filter(id__in=batch_ids)
+                .select_related('format_supervisi', 'perawat', 'kepala_ruangan')
+                .order_by('tanggal', 'id')
+            )
+            perlu_render = [s for s in batch if not path_cache(s).exists()]
+            hasil = dict(zip(
+                [s.id for s in perlu_render],
+                render_banyak(data_pdf_banyak(perlu_render)),
+            ))
+
+            for s in batch:
+                if s.id in hasil:
+                    isi = hasil[s.id]
+                    simpan_cache_pdf(s, isi)
+                else:
+                    try:
+                        isi = path_cache(s).read_bytes()
+                    except FileNotFoundError:
+                        isi = render_pdf_bytes(data_pdf_banyak([s])[0])
+                arsip.writestr(f"{s.tanggal:%Y-%m-%d}_supervisi_{s.id}.pdf", isi)
+                yield penampung.ambil()
+
+    # central directory ditulis saat arsip ditutup
+    yield penampung.ambil()
+
+
+# ================== EKSPOR DATA (CSV / XLSX) ==================
+UKURAN_CHUNK_EKSPOR = 2000
+
+_ADA_TTD_PERAWAT = ExpressionWrapper(Q(ttd_perawat__isnull=False) & ~Q(ttd_perawat=''), BooleanField())
+_ADA_TTD_KEPALA = ExpressionWrapper(Q(ttd_kepala__isnull=False) & ~Q(ttd_kepala=''), BooleanField())
+
+# (judul kolom, lookup values_list)
+KOLOM_RINGKASAN = [
+    ("ID", 'id'),
+    ("Tanggal", 'tanggal'),
+    ("Username Perawat", 'perawat__username'),
+    ("Nama Perawat", 'perawat_nama'),
+    ("Format", 'format_supervisi__nama'),
+    ("Ruang", 'ruang'),
+    ("Tim", 'tim'),
+    ("Jenjang PK", 'jenjang_pk'),
+    ("Skor Total", 'skor_total'),
+    ("TTD Perawat", 'ada_ttd_perawat'),
+    ("TTD Kepala", 'ada_ttd_kepala'),
+    ("Kepala Ruangan", 'kepala_nama'),
+    ("NIP Kepala", 'kepala_nip'),
+]
+KOLOM_JAWABAN = [
+    ("ID Supervisi", 'supervisi_id'),
+    ("Tanggal", 'supervisi__tanggal'),
+    ("Username Perawat", 'supervisi__perawat__username'),
+    ("Format", 'supervisi__format_supervisi__nama'),
+    ("Ruang", 'supervisi__ruang'),
+    ("Tim", 'supervisi__tim'),
+    ("Jenjang PK", 'supervisi__jenjang_pk'),
+    ("ID Item", 'aspek__item_format_id'),
+    ("Prosedur", 'aspek__item_format__pertanyaan'),
+    ("ID Aspek", 'aspek_id'),
+    ("Aspek", 'aspek__nama_aspek'),
+    ("D", 'd'),
+    ("TD", 'td'),
+]
+JENIS_EKSPOR = ('ringkasan', 'jawaban')
+
+
+def baris_ekspor(filter_form, jenis, ukuran_chunk=UKURAN_CHUNK_EKSPOR):
+    """
+    Kembalikan (judul kolom, iterator tuple baris) untuk ekspor `jenis`
+    ('ringkasan' = satu baris per supervisi, 'jawaban' = satu baris per
+    JawabanAspek). Baris dibaca dari database per potongan `ukuran_chunk`.
+    """
+    if jenis == 'jawaban':
+        kolom = KOLOM_JAWABAN
+        qs = filter_form.filter(JawabanAspek.objects.all(), prefix='supervisi__').order_by('supervisi_id', 'id')
+    else:
+        kolom = KOLOM_RINGKASAN
+        qs = filter_form.filter(
+            Supervisi.objects.annotate(ada_ttd_perawat=_ADA_TTD_PERAWAT, ada_ttd_kepala=_ADA_TTD_KEPALA)
+        ).order_by('tanggal', 'id')
+    baris = qs.values_list(*[lookup for _, lookup in kolom]).iterator(chunk_size=ukuran_chunk)
+    return [judul for judul, _ in kolom], baris
+
+
+def _nilai(v):
+    if isinstance(v, bool):
+        return int(v)
+    if isinstance(v, float):
+        return round(v, 2)
+    if v is None:
+        return ''
+    if hasattr(v, 'isoformat'):
+        return v.isoformat()
+    return v
+
+
+def _teks_aman(v):
+    # cegah teks diartikan sebagai rumus oleh aplikasi spreadsheet (CSV injection)
+    if isinstance(v, str) and v[:1] in ('=', '+', '-', '@', '\t', '\r'):
+        return "'" + v
+    return v
+
+
+def csv_stream(judul, baris, ukuran_chunk=UKURAN_CHUNK_EKSPOR):
+    """Generator potongan teks CSV (UTF-8 dengan BOM supaya terbaca benar di Excel)."""
+    buf = io.StringIO()
+    penulis = csv.writer(buf)
+    buf.write('\ufeff')
+    penulis.writerow(judul)
+    n = 0
+    for b in baris:
+        penulis.writerow([_teks_aman(_nilai(v)) for v in b])
+        n += 1
+        if n % ukuran_chunk == 0:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue()
+
+
+_XLSX_STATIS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+        'relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="{nama}" sheetId="1" r:id="rId1"/></sheets></workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+        'relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+_KARAKTER_ILEGAL_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def _sel_xlsx(v):
+    v = _nilai(v)
+    if isinstance(v, (int, float)):
+        return f'<c><v>{v}</v></c>'
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{escape(_KARAKTER_ILEGAL_XML.sub("", str(v)))}</t></is></c>'
+
+
+def xlsx_stream(judul, baris, nama_sheet="Supervisi", ukuran_chunk=UKURAN_CHUNK_EKSPOR):
+    """
+    Generator potongan byte workbook XLSX satu sheet. Sheet ditulis sebagai XML
+    dengan inline string langsung ke arsip ZIP yang di-stream (lihat `_Penampung`),
+    jadi tidak perlu pustaka tambahan dan memori tidak bergantung jumlah baris.
+    """
+    penampung = _Penampung()
+    with zipfile.ZipFile(penampung, 'w', zipfile.ZIP_DEFLATED) as arsip:
+        for nama, isi in _XLSX_STATIS.items():
+            arsip.writestr(nama, isi.replace('{nama}', escape(nama_sheet)))
+        yield penampung.ambil()
+
+        with arsip.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            bagian = [
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>',
+                '<row>' + ''.join(_sel_xlsx(j) for j in judul) + '</row>',
+            ]
+            n = 0
+            for b in baris:
+                bagian.append('<row>' + ''.join(_sel_xlsx(v) for v in b) + '</row>')
+                n += 1
+                if n % ukuran_chunk == 0:
+                    sheet.write(''.join(bagian).encode())
+                    bagian.clear()
+                    yield penampung.ambil()
+            bagian.append('</sheetData></worksheet>')
+            sheet.write(''.join(bagian).encode())
+        yield penampung.ambil()
+    yield penampung.ambil()
@@ -0,0 +1,221 @@
+"""
+Impor/ekspor definisi format supervisi (JSON atau CSV).
+
+Bentuk JSON:
+    {"nama": ..., "deskripsi": ..., "items": [
+        {"pertanyaan": ..., "bobot": 1.0, "aspek": [{"nama_aspek": ..., "d": false, "td": false}, ...]},
+    ]}
+
+Bentuk CSV: satu baris per aspek dengan kolom `prosedur, bobot, aspek, d, td`
+(kolom `format` dan `deskripsi` opsional). Baris berurutan dengan prosedur yang
+sama menjadi satu item; prosedur tanpa aspek ditulis dengan kolom aspek kosong.
+
+Impor menulis semua item dan aspek dengan bulk_create dalam satu transaksi.
+"""
+import csv
+import io
+import json
+import math
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .models import AspekFormat, FormatSupervisi, ItemFormat
+from .struktur import struktur_format
+
+KOLOM_CSV = ['format', 'deskripsi', 'prosedur', 'bobot', 'aspek', 'd', 'td']
+_BENAR = {'1', 'true', 'ya', 'y', 'x', 'v', 'on'}
+
+
+# ================== EKSPOR ==================
+def definisi_format(format_supervisi):
+    """Definisi lengkap sebuah format sebagai dict biasa (dari cache struktur)."""
+    struktur = struktur_format(format_supervisi)
+    return {
+        'nama': format_supervisi.nama,
+        'deskripsi': format_supervisi.deskripsi or '',
+        'items': [
+            {
+                'pertanyaan': item.pertanyaan,
+                'bobot': item.bobot,
+                'aspek': [{'nama_aspek': a.nama_aspek, 'd': a.d, 'td': a.td} for a in item.aspek],
+            }
+            for item in struktur.items
+        ],
+    }
+
+
+def ekspor_json(format_supervisi):
+    return json.dumps(definisi_format(format_supervisi), ensure_ascii=False, indent=2)
+
+
+def ekspor_csv(format_supervisi):
+    definisi = definisi_format(format_supervisi)
+    buf = io.StringIO()
+    penulis = csv.writer(buf)
+    penulis.writerow(KOLOM_CSV)
+    for item in definisi['items']:
+        for aspek in item['aspek'] or [None]:
+            penulis.writerow([
+                definisi['nama'], definisi['deskripsi'], item['pertanyaan'], item['bobot'],
+                aspek['nama_aspek'] if aspek else '',
+                int(aspek['d']) if aspek else '', int(aspek['td']) if aspek else '',
+            ])
+    return buf.getvalue()
+
+
+# ================== BACA ==================
+def _bool(nilai):
+    if isinstance(nilai, bool):
+        return nilai
+    return str(nilai or '').strip().lower() in _BENAR
+
+
+def _bobot(nilai, posisi):
+    if nilai in (None, ''):
+        return 1.0
+    try:
+        bobot = float(nilai)
+    except (TypeError, ValueError):
+        raise ValidationError(f"{posisi}: bobot '{nilai}' bukan angka.")
+    if not math.isfinite(bobot):
+        raise ValidationError(f"{posisi}: bobot '{nilai}' bukan angka.")
+    return bobot
+
+
+def _nama_format(nama):
+    nama = str(nama or '').strip()
+    if len(nama) > FormatSupervisi._meta.get_field('nama').max_length:
+        raise ValidationError("Nama format terlalu panjang.")
+    return nama
+
+
+def _validasi(definisi):
+    """Rapikan dan periksa definisi; kembalikan dict dengan items yang bersih."""
+    if not isinstance(definisi, dict) or not isinstance(definisi.get('items'), list):
+        raise ValidationError("Definisi format harus berupa objek dengan daftar 'items'.")
+    items = []
+    for i, item in enumerate(definisi['items'], start=1):
+        if not isinstance(item, dict):
+            raise ValidationError(f"Item {i}: harus berupa objek.")
+        pertanyaan = str(item.get('pertanyaan') or '').strip()
+        if not pertanyaan:
+            raise ValidationError(f"Item {i}: pertanyaan/prosedur kosong.")
+        if item.get('aspek') is not None and not isinstance(item['aspek'], list):
+            raise ValidationError(f"Item {i}: 'aspek' harus berupa daftar.")
+        aspek = []
+        for j, a in enumerate(item.get('aspek') or [], start=1):
+            if not isinstance(a, dict):
+                raise ValidationError(f"Item {i}, aspek {j}: harus berupa objek.")
+            nama = str(a.get('nama_aspek') or '').strip()
+            if not nama:
+                raise ValidationError(f"Item {i}, aspek {j}: nama aspek kosong.")
+            if len(nama) > AspekFormat._meta.get_field('nama_aspek').max_length:
+                raise ValidationError(f"Item {i}, aspek {j}: nama aspek terlalu panjang.")
+            aspek.append({'nama_aspek': nama, 'd': _bool(a.get('d')), 'td': _bool(a.get('td'))})
+        items.append({'pertanyaan': pertanyaan, 'bobot': _bobot(item.get('bobot'), f"Item {i}"), 'aspek': aspek})
+    if not items:
+        raise ValidationError("Definisi format tidak berisi item.")
+    return {
+        'nama': _nama_format(definisi.get('nama')),
+        'deskripsi': str(definisi.get('deskripsi') or '').strip(),
+        'items': items,
+    }
+
+
+def baca_json(teks):
+    try:
+        return _validasi(json.loads(teks))
+    except json.JSONDecodeError as e:
+        raise ValidationError(f"JSON tidak valid: {e}")
+
+
+def baca_csv(teks):
+    pembaca = csv.DictReader(io.StringIO(teks))
+    kolom = {k.strip().lower() for k in (pembaca.fieldnames or [])}
+    if not {'prosedur', 'aspek'} <= kolom:
+        raise ValidationError("CSV harus memiliki kolom 'prosedur' dan 'aspek'.")
+    definisi = {'items': []}
+    item = None
+    for no, baris in enumerate(pembaca, start=2):
+        baris = {(k or '').strip().lower(): (v or '').strip() for k, v in baris.items()}
+        if not definisi.get('nama') and baris.get('format'):
+            definisi['nama'] = baris['format']
+            definisi['deskripsi'] = baris.get('deskripsi', '')
+        prosedur = baris.get('prosedur')
+        if not prosedur and item is None:
+            raise ValidationError(f"Baris {no}: prosedur kosong.")
+        if prosedur and (item is None or prosedur != item['pertanyaan']):
+            item = {'pertanyaan': prosedur, 'bobot': _bobot(baris.get('bobot'), f"Baris {no}"), 'aspek': []}
+            definisi['items'].append(item)
+        if baris.get('aspek'):
+            item['aspek'].append({'nama_aspek': baris['aspek'], 'd': baris.get('d'), 'td': baris.get('td')})
+    return _validasi(definisi)
+
+
+def baca_berkas(berkas, nama_berkas=''):
+    """Baca file unggahan/lokal (bytes atau file-like) sebagai JSON atau CSV menurut ekstensinya."""
+    data = berkas if isinstance(berkas, bytes) else berkas.read()
+    try:
+        teks = data.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        raise ValidationError("File harus ber-encoding UTF-8.")
+    if nama_berkas.lower().endswith('.csv'):
+        return baca_csv(teks)
+    return baca_json(teks)
+
+
+def definisi_dari_post(post):
+    """
+    Baca isian form Tambah Item (`prosedur_{i}`, `aspek_{i}_{j}`, `d_{i}_{j}`,
+    `td_{i}_{j}`) menjadi daftar item definisi. Baris kosong dilewati.
+    """
+    items = []
+    i = 0
+    while f'prosedur_{i}' in post:
+        pertanyaan = post.get(f'prosedur_{i}', '').strip()
+        if pertanyaan:
+            aspek = []
+            j = 0
+            while f'aspek_{i}_{j}' in post:
+                nama = post.get(f'aspek_{i}_{j}', '').strip()
+                if nama:
+                    aspek.append({
+                        'nama_aspek': nama,
+                        'd': post.get(f'd_{i}_{j}') == 'on',
+                        'td': post.get(f'td_{i}_{j}') == 'on',
+                    })
+                j += 1
+            items.append({'pertanyaan': pertanyaan, 'bobot': 1.0, 'aspek': aspek})
+        i += 1
+    return items
+
+
+# ================== TULIS ==================
+def impor_format(definisi, format_supervisi=None, ukuran_batch=1000):
+    """
+    Tulis item dan aspek `definisi` (hasil `baca_*`) ke `format_supervisi`,
+    atau ke format baru bernama definisi['nama'] bila tidak diberikan. Item
+    ditambahkan setelah item yang sudah ada. Semua dalam satu transaksi dengan
+    dua bulk_create; jumlah item/aspek dan versi format diperbarui sekali di akhir.
+    Mengembalikan (format, jumlah item, jumlah aspek).
+    """
+    with transaction.atomic():
+        if format_supervisi is None:
+            if not definisi.get('nama'):
+                raise ValidationError("Nama format baru belum diisi.")
+            format_supervisi = FormatSupervisi.objects.create(
+                nama=_nama_format(definisi['nama']), deskripsi=definisi.get('deskripsi') or None,
+            )
+        items = ItemFormat.objects.bulk_create([
+            ItemFormat(format_supervisi=format_supervisi, pertanyaan=item['pertanyaan'], bobot=item['bobot'])
+            for item in definisi['items']
+        ], batch_size=ukuran_batch)
+        aspek = AspekFormat.objects.bulk_create([
+            AspekFormat(item_format=obj, nama_aspek=a['nama_aspek'], d=a['d'], td=a['td'])
+            for obj, item in zip(items, definisi['items'])
+            for a in item['aspek']
+        ], batch_size=ukuran_batch)
+        FormatSupervisi.hitung_ulang_jumlah(FormatSupervisi.objects.filter(id=format_supervisi.id))
+    format_supervisi.refresh_from_db()
+    return format_supervisi, len(items), len(aspek)
@@ -1,8 +1,11 @@
 from django import forms
+from django.db.models import Q
 from .models import JawabanItem, FormatSupervisi, ItemFormat, Supervisi
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
 
+from .format_io import baca_berkas
+
 ROLE_CHOICES = [
     ('perawat', 'Perawat'),
     ('kepala', 'Kepala Ruangan'),
@@ -134,3 +137,143 @@ class SupervisiForm(forms.ModelForm):
             'skor_total': forms.NumberInput(attrs={'class': 'form-control'}),
             'ttd_kepala': forms.CheckboxInput(attrs={'class': 'form-check-input'}),
         }
+
+
+class SupervisiFilterForm(forms.Form):
+    """Filter daftar/ekspor supervisi. Semua field opsional."""
+    tanggal_dari = forms.DateField(
+        label="Dari Tanggal", required=False,
+        widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control'})
+    )
+    tanggal_sampai = forms.DateField(
+        label="Sampai Tanggal", required=False,
+        widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control'})
+    )
+    ruang = forms.CharField(
+        label="Ruang", required=False,
+        widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Semua ruang'})
+    )
+    tim = forms.TypedChoiceField(
+        label="Tim", required=False, coerce=int, empty_value=None,
+        choices=[('', 'Semua tim')] + Supervisi.TIM_CHOICES,
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    format_supervisi = forms.ModelChoiceField(
+        label="Format", required=False, queryset=FormatSupervisi.objects.all(),
+        empty_label="Semua format",
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    jenjang_pk = forms.CharField(
+        label="Jenjang PK", required=False,
+        widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Semua jenjang'})
+    )
+    status_ttd = forms.ChoiceField(
+        label="Tanda Tangan", required=False,
+        choices=[
+            ('', 'Semua status'),
+            ('lengkap', 'Lengkap'),
+            ('perawat', 'Hanya Perawat'),
+            ('kepala', 'Hanya Kepala'),
+            ('belum', 'Belum'),
+        ],
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+
+    def filter(self, qs, prefix=''):
+        """
+        Terapkan filter yang valid ke queryset Supervisi. `prefix` dipakai untuk
+        queryset model lain yang berelasi ke Supervisi, mis. 'supervisi__'.
+        """
+        if not self.is_valid():
+            return qs
+        data = self.cleaned_data
+        p = prefix
+        if data.get('tanggal_dari'):
+            qs = qs.filter(**{f'{p}tanggal__gte': data['tanggal_dari']})
+        if data.get('tanggal_sampai'):
+            qs = qs.filter(**{f'{p}tanggal__lte': data['tanggal_sampai']})
+        if data.get('ruang'):
+            qs = qs.filter(**{f'{p}ruang': data['ruang'].strip()})
+        if data.get('tim'):
+            qs = qs.filter(**{f'{p}tim': data['tim']})
+        if data.get('format_supervisi'):
+            qs = qs.filter(**{f'{p}format_supervisi': data['format_supervisi']})
+        if data.get('jenjang_pk'):
+            qs = qs.filter(**{f'{p}jenjang_pk': data['jenjang_pk'].strip()})
+
+        status = data.get('status_ttd')
+        if status:
+            ada_perawat = ~Q(**{f'{p}ttd_perawat': ''}) & Q(**{f'{p}ttd_perawat__isnull': False})
+            ada_kepala = ~Q(**{f'{p}ttd_kepala': ''}) & Q(**{f'{p}ttd_kepala__isnull': False})
+            qs = qs.filter({
+                'lengkap': ada_perawat & ada_kepala,
+                'perawat': ada_perawat & ~ada_kepala,
+                'kepala': ~ada_perawat & ada_kepala,
+                'belum': ~ada_perawat & ~ada_kepala,
+            }[status])
+        return qs
+
+    def kunci_cache(self):
+        """Representasi stabil filter yang valid, untuk kunci cache."""
+        if not self.is_valid():
+            return ''
+        return '|'.join(
+            f"{nama}={getattr(nilai, 'pk', nilai)}"
+            for nama, nilai in sorted(self.cleaned_data.items()) if nilai not in (None, '')
+        )
+
+
+class ImporFormatForm(forms.Form):
+    """Unggah definisi format (JSON/CSV) ke format baru atau format yang sudah ada."""
+    UKURAN_MAKS = 5 * 1024 * 1024
+
+    berkas = forms.FileField(
+        label="File Definisi (JSON/CSV)",
+        widget=forms.ClearableFileInput(attrs={'class': 'form-control', 'accept': '.json,.csv'})
+    )
+    format_supervisi = forms.ModelChoiceField(
+        label="Tambahkan ke Format", required=False, queryset=FormatSupervisi.objects.all(),
+        empty_label="Buat format baru",
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    nama = forms.CharField(
+        label="Nama Format Baru", required=False, max_length=255,
+        help_text="Kosongkan untuk memakai nama dari file.",
+        widget=forms.TextInput(attrs={'class': 'form-control'})
+    )
+
+    def clean(self):
+        data = super().clean()
+        berkas = data.get('berkas')
+        if not berkas:
+            return data
+        if berkas.size > self.UKURAN_MAKS:
+            raise forms.ValidationError("Ukuran file maksimal 5MB.")
+        definisi = baca_berkas(berkas, berkas.name)
+        if data.get('nama'):
+            definisi['nama'] = data['nama'].strip()
+        if not data.get('format_supervisi') and not definisi['nama']:
+            raise forms.ValidationError("Isi nama format baru (file tidak memuat nama format).")
+        data['definisi'] = definisi
+        return data
+
+
+class ImporSupervisiForm(forms.Form):
+    """Unggah data supervisi lama (CSV/JSON) untuk diimpor massal."""
+    UKURAN_MAKS = 20 * 1024 * 1024
+
+    berkas = forms.FileField(
+        label="File Supervisi (CSV/JSON)",
+        widget=forms.ClearableFileInput(attrs={'class': 'form-control', 'accept': '.csv,.json'})
+    )
+    lewati_salah = forms.BooleanField(
+        label="Lewati baris yang tidak valid", required=False,
+        help_text="Jika tidak dicentang, satu baris salah membatalkan seluruh impor.",
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'})
+    )
+
+    def clean_berkas(self):
+        berkas = self.cleaned_data['berkas']
+        if berkas.size > self.UKURAN_MAKS:
+            raise forms.ValidationError("Ukuran file maksimal 20MB.")
+        return berkas
@@ -0,0 +1,293 @@
+"""
+Impor massal supervisi lama (hasil salinan formulir kertas) dari CSV/JSON.
+
+Bentuk CSV: satu baris per supervisi dengan kolom
+    perawat, format, tanggal, ruang, tim, jenjang_pk
+    [, perawat_nama, kepala, kepala_nama, kepala_nip]
+lalu satu kolom per aspek bernama `aspek_<id>` (boleh diikuti nama aspek, mis.
+`aspek_12 Cuci tangan`) berisi D, TD, atau kosong. `perawat`/`kepala` adalah
+username, `format` id atau nama format, `tanggal` YYYY-MM-DD atau DD/MM/YYYY.
+Lihat `templat_csv()` untuk header lengkap sebuah format.
+
+Bentuk JSON: daftar objek dengan kunci yang sama; jawaban boleh ditulis sebagai
+kolom `aspek_<id>` atau objek `"jawaban": {"<id>": "D", ...}`.
+
+Semua baris divalidasi dulu (tanpa menulis apa pun), baru ditulis per batch:
+tiap batch satu transaksi berisi bulk_create Supervisi (skor sudah dihitung di
+memori) dan satu executemany untuk JawabanAspek. Karena bulk_create tidak memicu signals,
+ringkasan dashboard dan versi cache analitik diperbarui di transaksi batch yang sama,
+jadi dashboard tidak pernah melihat supervisi yang belum terhitung (juga bila impor
+gagal di tengah jalan).
+"""
+import csv
+import io
+import json
+import re
+import time
+from datetime import datetime
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .analitik import tandai_jawaban_berubah
+from .models import FormatSupervisi, JawabanAspek, Supervisi
+from .ringkasan import tambah_ringkasan
+from .scoring import skor_dari_jawaban
+from .struktur import struktur_format
+
+KOLOM_WAJIB = ['perawat', 'format', 'tanggal', 'ruang', 'tim', 'jenjang_pk']
+KOLOM_OPSIONAL = ['perawat_nama', 'kepala', 'kepala_nama', 'kepala_nip']
+FORMAT_TANGGAL = ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y')
+NILAI_JAWABAN = {'': (False, False), 'D': (True, False), 'TD': (False, True)}
+MAKS_PESAN = 20
+
+_KOLOM_ASPEK = re.compile(r'^aspek_(\d+)\b')
+_JENJANG = {k for k, _ in Supervisi.JENJANG_CHOICES}
+_TIM = {k for k, _ in Supervisi.TIM_CHOICES}
+_PANJANG_MAKS = {
+    f: Supervisi._meta.get_field(f).max_length for f in ('ruang', 'perawat_nama', 'kepala_nama', 'kepala_nip')
+}
+
+
+def templat_csv(format_supervisi):
+    """Header CSV impor untuk satu format (kolom aspek diberi nama aspeknya)."""
+    buf = io.StringIO()
+    csv.writer(buf).writerow(
+        KOLOM_WAJIB + KOLOM_OPSIONAL
+        + [f"aspek_{a.id} {a.nama_aspek}" for item in struktur_format(format_supervisi).items for a in item.aspek]
+    )
+    return buf.getvalue()
+
+
+# ================== BACA ==================
+def _baris_csv(teks):
+    pembaca = csv.reader(io.StringIO(teks))
+    header = [h.strip().lower() for h in next(pembaca, [])]
+    kurang = [k for k in KOLOM_WAJIB if k not in header]
+    if kurang:
+        raise ValidationError(f"CSV tidak memiliki kolom: {', '.join(kurang)}.")
+    biasa = [(i, h) for i, h in enumerate(header) if h in KOLOM_WAJIB or h in KOLOM_OPSIONAL]
+    aspek = [(i, int(m.group(1))) for i, m in ((i, _KOLOM_ASPEK.match(h)) for i, h in enumerate(header)) if m]
+    for no, sel in enumerate(pembaca, start=2):
+        if not any(s.strip() for s in sel):
+            continue
+        sel = sel + [''] * (len(header) - len(sel))
+        yield no, {h: sel[i].strip() for i, h in biasa}, {a: sel[i] for i, a in aspek}
+
+
+def kolom_dari_objek(obj):
+    """(kolom, jawaban) dari satu objek JSON supervisi; jawaban None bila bentuknya salah."""
+    kolom = {k: str(obj.get(k) if obj.get(k) is not None else '').strip() for k in KOLOM_WAJIB + KOLOM_OPSIONAL}
+    jawaban = {}
+    for k, v in obj.items():
+        m = _KOLOM_ASPEK.match(str(k))
+        if m:
+            jawaban[int(m.group(1))] = v
+    bersarang = obj.get('jawaban') or {}
+    if not isinstance(bersarang, dict):
+        return kolom, None
+    for k, v in bersarang.items():
+        jawaban[int(k) if str(k).isdigit() else k] = v
+    return kolom, jawaban
+
+
+def _baris_json(data):
+    if isinstance(data, dict):
+        data = data.get('supervisi')
+    if not isinstance(data, list):
+        raise ValidationError("JSON harus berupa daftar supervisi (atau objek dengan kunci 'supervisi').")
+    for no, obj in enumerate(data, start=1):
+        if not isinstance(obj, dict):
+            yield no, None, None
+            continue
+        yield no, *kolom_dari_objek(obj)
+
+
+def _sumber(data, nama_berkas):
+    """Fungsi yang setiap dipanggil mengembalikan iterator baru (no, kolom, jawaban)."""
+    try:
+        teks = data.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        raise ValidationError("File harus ber-encoding UTF-8.")
+    if nama_berkas.lower().endswith('.csv'):
+        return lambda: _baris_csv(teks)
+    try:
+        isi = json.loads(teks)
+    except json.JSONDecodeError as e:
+        raise ValidationError(f"JSON tidak valid: {e}")
+    return lambda: _baris_json(isi)
+
+
+# ================== VALIDASI ==================
+class PemeriksaSupervisi:
+    """
+    Validasi baris terhadap user, format, dan aspek yang dimuat sekali di awal.
+    `user` ({username: id}) membatasi user yang boleh dirujuk; default semua user.
+    """
+
+    def __init__(self, user=None):
+        self.user = user if user is not None else dict(User.objects.values_list('username', 'id'))
+        self.format = {}
+        for f in FormatSupervisi.objects.all():
+            self.format[str(f.id)] = f
+            self.format.setdefault(f.nama.strip().lower(), f)
+        self.bobot = {}
+        self.hari_ini = timezone.localdate()
+
+    def _tanggal(self, nilai):
+        for pola in FORMAT_TANGGAL:
+            try:
+                tanggal = datetime.strptime(nilai, pola).date()
+            except ValueError:
+                continue
+            if tanggal > self.hari_ini:
+                raise ValueError(f"tanggal {nilai} ada di masa depan")
+            return tanggal
+        raise ValueError(f"tanggal '{nilai}' tidak dikenali (pakai YYYY-MM-DD atau DD/MM/YYYY)")
+
+    def periksa(self, kolom, jawaban):
+        """Kembalikan (Supervisi belum disimpan, [(aspek_id, d, td)]) atau lempar ValueError."""
+        if kolom is None:
+            raise ValueError("baris harus berupa objek")
+        if jawaban is None:
+            raise ValueError("jawaban harus berupa objek {aspek_id: D/TD}")
+        perawat_id = self.user.get(kolom['perawat'])
+        if perawat_id is None:
+            raise ValueError(f"perawat '{kolom['perawat']}' tidak ditemukan")
+        kepala_id = None
+        if kolom.get('kepala'):
+            kepala_id = self.user.get(kolom['kepala'])
+            if kepala_id is None:
+                raise ValueError(f"kepala ruangan '{kolom['kepala']}' tidak ditemukan")
+        format_supervisi = self.format.get(kolom['format'].lower())
+        if format_supervisi is None:
+            raise ValueError(f"format '{kolom['format']}' tidak ditemukan")
+        if not kolom['ruang']:
+            raise ValueError("ruang kosong")
+        for field in ('ruang', 'perawat_nama', 'kepala_nama', 'kepala_nip'):
+            if len(kolom.get(field) or '') > _PANJANG_MAKS[field]:
+                raise ValueError(f"{field} terlalu panjang")
+        try:
+            tim = int(kolom['tim'])
+        except ValueError:
+            tim = None
+        if tim not in _TIM:
+            raise ValueError(f"tim '{kolom['tim']}' tidak valid")
+        if kolom['jenjang_pk'] not in _JENJANG:
+            raise ValueError(f"jenjang PK '{kolom['jenjang_pk']}' tidak valid")
+
+        bobot = self.bobot.get(format_supervisi.id)
+        if bobot is None:
+            bobot = self.bobot[format_supervisi.id] = struktur_format(format_supervisi).bobot_aspek()
+        nilai = {}
+        for aspek_id, isi in jawaban.items():
+            isi = str(isi if isi is not None else '').strip().upper()
+            if isi not in NILAI_JAWABAN:
+                raise ValueError(f"jawaban aspek {aspek_id} '{isi}' harus D, TD, atau kosong")
+            if aspek_id not in bobot:
+                if isi:
+                    raise ValueError(f"aspek {aspek_id} bukan bagian format '{format_supervisi.nama}'")
+                continue
+            nilai[aspek_id] = NILAI_JAWABAN[isi]
+        baris_jawaban = [(a, *nilai.get(a, (False, False))) for a in bobot]
+
+        supervisi = Supervisi(
+            format_supervisi=format_supervisi,
+            perawat_id=perawat_id,
+            kepala_ruangan_id=kepala_id,
+            perawat_nama=kolom.get('perawat_nama') or None,
+            kepala_nama=kolom.get('kepala_nama') or None,
+            kepala_nip=kolom.get('kepala_nip') or None,
+            tanggal=self._tanggal(kolom['tanggal']),
+            tim=tim,
+            jenjang_pk=kolom['jenjang_pk'],
+            ruang=kolom['ruang'],
+            skor_total=skor_dari_jawaban((bobot[a], d, td) for a, d, td in baris_jawaban),
+        )
+        return supervisi, baris_jawaban
+
+    def baris_valid(self, baris, salah):
+        """Iterasi (supervisi, jawaban) baris valid; kesalahan dikumpulkan ke `salah`."""
+        for no, kolom, jawaban in baris:
+            try:
+                yield self.periksa(kolom, jawaban)
+            except ValueError as e:
+                salah.append((no, str(e)))
+
+
+# ================== TULIS ==================
+def _sql_sisip_jawaban():
+    qn = connection.ops.quote_name
+    kolom = [JawabanAspek._meta.get_field(f).column for f in ('supervisi', 'aspek', 'd', 'td')]
+    return (
+        f"INSERT INTO {qn(JawabanAspek._meta.db_table)} ({', '.join(qn(k) for k in kolom)}) "
+        f"VALUES ({', '.join(['%s'] * len(kolom))})"
+    )
+
+
+def tulis_batch(batch):
+    """
+    Tulis satu batch dalam satu transaksi. Supervisi lewat bulk_create (perlu
+    id-nya); jawaban yang jumlahnya puluhan kali lipat ditulis dengan satu
+    executemany karena membuat instance model dan mengompilasi SQL bulk_create
+    per baris justru memakan sebagian besar waktu impor. Ringkasan dashboard
+    (satu UPDATE per kelompok) dan versi cache analitik ikut diperbarui di
+    transaksi yang sama.
+    """
+    with transaction.atomic():
+        supervisi = Supervisi.objects.bulk_create([s for s, _ in batch])
+        jawaban = [
+            (s.id, aspek_id, d, td)
+            for s, (_, baris_jawaban) in zip(supervisi, batch)
+            for aspek_id, d, td in baris_jawaban
+        ]
+        with connection.cursor() as cursor:
+            cursor.executemany(_sql_sisip_jawaban(), jawaban)
+        tambah_ringkasan(supervisi)
+        tandai_jawaban_berubah()
+    return supervisi, len(jawaban)
+
+
+def impor_supervisi(data, nama_berkas='', ukuran_batch=1000, lewati_salah=False, kering=False,
+                    lapor_progres=None):
+    """
+    Impor supervisi dari isi file `data` (bytes; CSV bila `nama_berkas` berakhiran
+    .csv, selain itu JSON). Bila ada baris tidak valid, tidak ada yang ditulis dan
+    ValidationError dilempar, kecuali `lewati_salah` (baris salah dilewati dan
+    dilaporkan). `kering` hanya memvalidasi. Mengembalikan dict ringkasan hasil:
+    jumlah supervisi, jawaban, daftar (baris, pesan) kesalahan, dan durasi.
+    """
+    mulai = time.perf_counter()
+    baris = _sumber(data, nama_berkas)
+    pemeriksa = PemeriksaSupervisi()
+
+    salah = []
+    jumlah_valid = sum(1 for _ in pemeriksa.baris_valid(baris(), salah))
+    if salah and not lewati_salah:
+        pesan = [f"Baris {no}: {p}" for no, p in salah[:MAKS_PESAN]]
+        if len(salah) > MAKS_PESAN:
+            pesan.append(f"... dan {len(salah) - MAKS_PESAN} kesalahan lain.")
+        raise ValidationError(pesan)
+
+    hasil = {'supervisi': 0, 'jawaban': 0, 'salah': salah, 'valid': jumlah_valid}
+    if not kering and jumlah_valid:
+        batch = []
+
+        def tulis():
+            supervisi, n_jawaban = tulis_batch(batch)
+            hasil['supervisi'] += len(supervisi)
+            hasil['jawaban'] += n_jawaban
+            batch.clear()
+            if lapor_progres:
+                lapor_progres(hasil['supervisi'] * 100 / jumlah_valid)
+
+        for s in pemeriksa.baris_valid(baris(), []):
+            batch.append(s)
+            if len(batch) >= ukuran_batch:
+                tulis()
+        if batch:
+            tulis()
+    hasil['detik'] = time.perf_counter() - mulai
+    return hasil
@@ -0,0 +1,103 @@
+"""
+Antrian tugas latar sederhana berbasis tabel `Tugas`.
+
+Tidak butuh Redis/broker: view cukup memanggil `antrekan()`, lalu proses
+`manage.py jalankan_tugas` mengambil tugas dari database dan mengerjakannya.
+Jenis tugas baru didaftarkan dengan dekorator `@jenis_tugas('nama')`; handler
+menerima (tugas, lapor_progres) dan mengembalikan (path_file_hasil, nama_file).
+"""
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Supervisi, Tugas
+from .pdf import pdf_supervisi
+
+logger = logging.getLogger(__name__)
+
+JENIS_TUGAS = {}
+
+
+def jenis_tugas(nama):
+    def daftar(handler):
+        JENIS_TUGAS[nama] = handler
+        return handler
+    return daftar
+
+
+def antrekan(jenis, parameter, user=None):
+    """
+    Masukkan tugas ke antrian. Jika tugas yang sama milik `user` yang sama masih
+    menunggu/berjalan, tugas itu yang dikembalikan supaya klik berulang tidak
+    menumpuk antrian. Tugas user lain tidak pernah dipakai bersama: hasilnya hanya
+    boleh diunduh pembuatnya (lihat `_tugas_milik` di views).
+    """
+    if jenis not in JENIS_TUGAS:
+        raise ValueError(f"Jenis tugas tidak dikenal: {jenis}")
+    with transaction.atomic():
+        tugas = Tugas.objects.filter(
+            jenis=jenis, parameter=parameter, dibuat_oleh=user,
+            status__in=[Tugas.MENUNGGU, Tugas.BERJALAN],
+        ).first()
+        if tugas is None:
+            tugas = Tugas.objects.create(jenis=jenis, parameter=parameter, dibuat_oleh=user)
+    return tugas
+
+
+def ambil_tugas():
+    """
+    Klaim satu tugas yang menunggu. Klaim memakai UPDATE bersyarat status,
+    jadi beberapa worker bisa berjalan bersamaan tanpa mengerjakan tugas yang sama.
+    """
+    while True:
+        tugas_id = (
+            Tugas.objects.filter(status=Tugas.MENUNGGU)
+            .order_by('id').values_list('id', flat=True).first()
+        )
+        if tugas_id is None:
+            return None
+        diklaim = Tugas.objects.filter(id=tugas_id, status=Tugas.MENUNGGU).update(
+            status=Tugas.BERJALAN, mulai=timezone.now(), progres=0
+        )
+        if diklaim:
+            return Tugas.objects.get(id=tugas_id)
+
+
+def jalankan(tugas):
+    """Kerjakan satu tugas yang sudah diklaim dan simpan hasil/kesalahannya."""
+    def lapor_progres(persen):
+        Tugas.objects.filter(id=tugas.id).update(progres=max(0, min(100, int(persen))))
+
+    try:
+        hasil, nama_file = JENIS_TUGAS[tugas.jenis](tugas, lapor_progres)
+    except Exception as exc:
+        logger.exception("Tugas #%s gagal", tugas.id)
+        Tugas.objects.filter(id=tugas.id).update(
+            status=Tugas.GAGAL, pesan=str(exc) or exc.__class__.__name__, selesai=timezone.now()
+        )
+        return False
+
+    Tugas.objects.filter(id=tugas.id).update(
+        status=Tugas.SELESAI, progres=100, hasil=str(hasil), nama_file=nama_file,
+        selesai=timezone.now()
+    )
+    return True
+
+
+def kembalikan_tugas_macet(batas=timedelta(minutes=30)):
+    """Kembalikan tugas 'berjalan' yang worker-nya mati ke status menunggu."""
+    return Tugas.objects.filter(
+        status=Tugas.BERJALAN, mulai__lt=timezone.now() - batas
+    ).update(status=Tugas.MENUNGGU, progres=0)
+
+
+# ================== JENIS TUGAS ==================
+@jenis_tugas('pdf_supervisi')
+def tugas_pdf_supervisi(tugas, lapor_progres):
+    s = Supervisi.objects.select_related(
+        "format_supervisi", "perawat", "kepala_ruangan"
+    ).get(id=tugas.parameter['supervisi_id'])
+    lapor_progres(10)
+    return pdf_supervisi(s), f"supervisi_{s.id}.pdf"
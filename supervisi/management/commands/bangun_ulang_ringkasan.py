@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from supervisi.ringkasan import bangun_ulang_ringkasan, periksa_ringkasan
+
+
+class Command(BaseCommand):
+    help = (
+        "Bangun ulang tabel RingkasanSupervisi (dashboard) dari seluruh data Supervisi. "
+        "Wajib dijalankan setelah Supervisi diubah lewat QuerySet.update() atau SQL mentah "
+        "yang melewati signals."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--periksa', action='store_true',
+                            help="Hanya cek penyimpangan ringkasan tanpa menulis (gagal bila ada).")
+
+    def handle(self, *args, **opts):
+        if opts['periksa']:
+            selisih = periksa_ringkasan()
+            for kunci, tersimpan, seharusnya in selisih:
+                self.stdout.write(f"{kunci}: tersimpan {tersimpan}, seharusnya {seharusnya}")
+            if selisih:
+                raise CommandError(f"{len(selisih)} kelompok ringkasan menyimpang; jalankan tanpa --periksa.")
+            self.stdout.write(self.style.SUCCESS("Ringkasan sesuai dengan data Supervisi."))
+            return
+        jumlah = bangun_ulang_ringkasan()
+        self.stdout.write(self.style.SUCCESS(f"{jumlah} baris ringkasan dibangun ulang."))
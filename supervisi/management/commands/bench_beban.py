@@ -0,0 +1,121 @@
+import datetime
+import json
+import platform
+import tempfile
+import tracemalloc
+from itertools import cycle
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from supervisi.benchmark import database_uji, tulis_laporan, ukur
+from supervisi.models import AspekFormat, FormatSupervisi, Supervisi
+from supervisi.sintetis import buat_data_sintetis
+
+KOLOM = ['skenario', 'ulang', 'p50_ms', 'p95_ms', 'maks_ms', 'queries', 'memori_puncak_kb']
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark beban end-to-end: isi database uji dengan data sintetis lalu ukur "
+        "view utama lewat test client (p50/p95, query per request, puncak memori). "
+        "Laporan --json memuat parameter dan ukuran data supaya antar-run dapat dibandingkan."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--perawat', type=int, default=50)
+        parser.add_argument('--kepala', type=int, default=5)
+        parser.add_argument('--format', type=int, default=3)
+        parser.add_argument('--item', type=int, default=10)
+        parser.add_argument('--aspek', type=int, default=5, help="Jumlah aspek per item.")
+        parser.add_argument('--tahun', type=int, default=1)
+        parser.add_argument('--per-hari', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--ulang', type=int, default=20, help="Jumlah request per skenario.")
+        parser.add_argument('--json', action='store_true', help="Tulis laporan sebagai JSON.")
+        parser.add_argument('--keluaran', help="Simpan laporan JSON ke file ini.")
+
+    def _skenario(self):
+        """[(nama, client, fungsi pembuat request)] untuk view yang diukur."""
+        perawat = User.objects.filter(username__startswith='sintetis_perawat_').order_by('id').first()
+        kepala = User.objects.filter(is_staff=True).order_by('id').first()
+        klien_perawat, klien_kepala = Client(), Client()
+        klien_perawat.force_login(perawat)
+        klien_kepala.force_login(kepala)
+
+        format_supervisi = FormatSupervisi.objects.order_by('id').first()
+        isian = {'tim': '1', 'jenjang_pk': 'PK I', 'ruang': 'Bench', 'perawat_nama': 'Bench'}
+        aspek_ids = AspekFormat.objects.filter(
+            item_format__format_supervisi=format_supervisi
+        ).values_list('id', flat=True)
+        for i, aspek_id in enumerate(aspek_ids):
+            isian[f"{'d' if i % 3 else 'td'}_{aspek_id}"] = 'on'
+
+        # detail dan PDF bergilir ke supervisi terbaru yang berbeda supaya cache PDF tidak ikut diukur
+        terbaru = list(Supervisi.objects.order_by('-tanggal', '-id').values_list('id', flat=True)[:500])
+        detail, pdf = cycle(terbaru), cycle(terbaru)
+        return [
+            ('isi_supervisi', lambda: klien_perawat.post(reverse('isi_supervisi', args=[format_supervisi.id]), isian)),
+            ('daftar_supervisi', lambda: klien_kepala.get(reverse('daftar_supervisi'))),
+            ('admin_dashboard', lambda: klien_kepala.get(reverse('admin_dashboard'))),
+            ('detail_supervisi', lambda: klien_kepala.get(reverse('detail_supervisi', args=[next(detail)]))),
+            ('cetak_supervisi_pdf', lambda: klien_kepala.get(reverse('cetak_supervisi_pdf', args=[next(pdf)]))),
+        ]
+
+    @staticmethod
+    def _jalankan(buat_request):
+        response = buat_request()
+        assert response.status_code < 400, response.status_code
+        if response.streaming:
+            b''.join(response.streaming_content)
+        response.close()
+
+    def handle(self, *args, **opts):
+        parameter = {
+            k: opts[k] for k in ('perawat', 'kepala', 'format', 'item', 'aspek', 'tahun', 'per_hari', 'seed', 'ulang')
+        }
+        hasil = []
+        with database_uji(), tempfile.TemporaryDirectory() as folder, \
+                override_settings(MEDIA_ROOT=folder, PDF_CACHE_DIR=folder, TUGAS_ANTRIAN_AKTIF=False):
+            self.stderr.write("Membuat data sintetis...")
+            data = buat_data_sintetis(
+                jumlah_perawat=opts['perawat'], jumlah_kepala=opts['kepala'], jumlah_format=opts['format'],
+                item=opts['item'], aspek=opts['aspek'], tahun=opts['tahun'], per_hari=opts['per_hari'],
+                seed=opts['seed'],
+            )
+            for nama, buat_request in self._skenario():
+                self.stderr.write(f"Mengukur {nama}...")
+                self._jalankan(buat_request)  # pemanasan
+                statistik = ukur(lambda: self._jalankan(buat_request), opts['ulang'])
+                # tracemalloc memperlambat eksekusi, jadi memori diukur di request terpisah
+                tracemalloc.start()
+                self._jalankan(buat_request)
+                _, puncak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                hasil.append({'skenario': nama, **statistik, 'memori_puncak_kb': round(puncak / 1024)})
+            vendor = connection.vendor
+
+        laporan = {
+            'waktu': datetime.datetime.now().isoformat(timespec='seconds'),
+            'lingkungan': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': vendor,
+                'db_profil': settings.DB_PROFIL,
+            },
+            'parameter': parameter,
+            'data': data,
+            'hasil': hasil,
+        }
+        if opts['keluaran']:
+            with open(opts['keluaran'], 'w') as f:
+                json.dump(laporan, f, indent=2)
+        if opts['json']:
+            self.stdout.write(json.dumps(laporan, indent=2))
+        else:
+            tulis_laporan(self.stdout, hasil, KOLOM)
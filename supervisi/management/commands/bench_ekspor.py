@@ -0,0 +1,56 @@
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+from supervisi.benchmark import buat_user, database_uji, tulis_laporan
+from supervisi.exports import JENIS_EKSPOR, baris_ekspor, csv_stream, xlsx_stream
+from supervisi.forms import SupervisiFilterForm
+from supervisi.sintetis import buat_format_contoh, buat_supervisi_massal
+
+
+class Command(BaseCommand):
+    help = "Benchmark ekspor CSV/XLSX: baris per detik dan puncak memori Python selama stream."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--supervisi', type=int, default=2000)
+        parser.add_argument('--aspek', type=int, default=50, help="Jumlah aspek per format.")
+        parser.add_argument('--json', action='store_true', help="Tulis hasil sebagai JSON.")
+
+    def handle(self, *args, **opts):
+        hasil = []
+        with database_uji():
+            perawat = buat_user('bench_perawat')
+            format_supervisi = buat_format_contoh(-(-opts['aspek'] // 10), min(10, opts['aspek']))
+            buat_supervisi_massal(format_supervisi, perawat, opts['supervisi'])
+
+            for jenis in JENIS_EKSPOR:
+                for berkas, stream in (('csv', csv_stream), ('xlsx', xlsx_stream)):
+                    judul, baris = baris_ekspor(SupervisiFilterForm({}), jenis)
+                    jumlah_baris = 0
+
+                    def hitung(it):
+                        nonlocal jumlah_baris
+                        for b in it:
+                            jumlah_baris += 1
+                            yield b
+
+                    tracemalloc.start()
+                    mulai = time.perf_counter()
+                    ukuran = sum(len(potong) for potong in stream(judul, hitung(baris)))
+                    detik = time.perf_counter() - mulai
+                    _, puncak = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+                    hasil.append({
+                        'jenis': jenis,
+                        'berkas': berkas,
+                        'baris': jumlah_baris,
+                        'detik': round(detik, 2),
+                        'baris_per_detik': round(jumlah_baris / detik) if detik else 0,
+                        'ukuran_kb': round(ukuran / 1024),
+                        'memori_puncak_kb': round(puncak / 1024),
+                    })
+
+        tulis_laporan(self.stdout, hasil,
+                      ['jenis', 'berkas', 'baris', 'detik', 'baris_per_detik', 'ukuran_kb', 'memori_puncak_kb'],
+                      sebagai_json=opts['json'])
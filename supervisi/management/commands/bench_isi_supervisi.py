@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.urls import reverse
+
+from supervisi.benchmark import buat_user, database_uji, tulis_laporan, ukur
+from supervisi.models import AspekFormat
+from supervisi.sintetis import buat_format_contoh
+
+
+class Command(BaseCommand):
+    help = "Benchmark latensi dan jumlah query submit isi_supervisi untuk berbagai ukuran format."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--aspek', type=int, nargs='+', default=[10, 50, 100, 300],
+                            help="Jumlah aspek per format yang diuji.")
+        parser.add_argument('--aspek-per-item', type=int, default=10)
+        parser.add_argument('--ulang', type=int, default=20)
+        parser.add_argument('--json', action='store_true', help="Tulis hasil sebagai JSON.")
+
+    def handle(self, *args, **opts):
+        hasil = []
+        with database_uji():
+            perawat = buat_user('bench_perawat')
+            client = Client()
+            client.force_login(perawat)
+
+            for jumlah in opts['aspek']:
+                per_item = min(opts['aspek_per_item'], jumlah)
+                format_supervisi = buat_format_contoh(-(-jumlah // per_item), per_item)
+                data = {'tim': '1', 'jenjang_pk': 'PK I', 'ruang': 'Bench', 'perawat_nama': 'Bench'}
+                aspek_ids = AspekFormat.objects.filter(
+                    item_format__format_supervisi=format_supervisi
+                ).values_list('id', flat=True)
+                for i, aspek_id in enumerate(aspek_ids):
+                    data[f"{'d' if i % 3 else 'td'}_{aspek_id}"] = 'on'
+                url = reverse('isi_supervisi', args=[format_supervisi.id])
+
+                def submit():
+                    response = client.post(url, data)
+                    assert response.status_code == 302, response.status_code
+
+                submit()  # pemanasan
+                statistik = ukur(submit, opts['ulang'])
+                statistik['aspek'] = len(aspek_ids)
+                hasil.append(statistik)
+
+        tulis_laporan(self.stdout, hasil, ['aspek', 'ulang', 'p50_ms', 'p95_ms', 'maks_ms', 'queries'],
+                      sebagai_json=opts['json'])
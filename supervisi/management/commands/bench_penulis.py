@@ -0,0 +1,136 @@
+import multiprocessing
+import os
+import queue
+import statistics
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection
+from django.test import Client
+from django.urls import reverse
+
+from supervisi.benchmark import buat_user, database_uji, tulis_laporan
+from supervisi.models import AspekFormat
+from supervisi.sintetis import buat_format_contoh
+
+# OPTIONS SQLite bawaan Django (tanpa WAL/pragma, transaksi DEFERRED, timeout 5 detik)
+OPSI_SQLITE_BAWAAN = {}
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark throughput submit isi_supervisi oleh N penulis bersamaan pada "
+        "profil database aktif (DB_PROFIL). Untuk SQLite, profil bawaan Django "
+        "ikut diukur sebagai pembanding. Database uji berupa file sementara."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--penulis', type=int, nargs='+', default=[1, 4, 8, 16],
+                            help="Jumlah penulis bersamaan yang diuji.")
+        parser.add_argument('--per-penulis', type=int, default=25,
+                            help="Jumlah supervisi yang dikirim tiap penulis.")
+        parser.add_argument('--aspek', type=int, default=30, help="Jumlah aspek format uji.")
+        parser.add_argument('--thread', action='store_true',
+                            help="Pakai thread alih-alih proses (untuk platform tanpa fork).")
+        parser.add_argument('--json', action='store_true', help="Tulis hasil sebagai JSON.")
+
+    def _profil(self):
+        """[(nama, OPTIONS)] yang diukur; None = OPTIONS dari settings."""
+        if connection.vendor != 'sqlite':
+            return [(os.environ.get('DB_PROFIL', connection.vendor), None)]
+        return [('sqlite-bawaan', OPSI_SQLITE_BAWAAN), ('sqlite-tuned', None)]
+
+    def _jalankan(self, url, data, klien, per_penulis, pakai_thread):
+        """Kirim dari setiap klien secara bersamaan; kembalikan statistik throughput/latensi."""
+        antrian = queue.Queue() if pakai_thread else multiprocessing.get_context('fork').Queue()
+
+        def penulis(client):
+            latensi = []
+            gagal = 0
+            try:
+                for _ in range(per_penulis):
+                    mulai = time.perf_counter()
+                    try:
+                        ok = client.post(url, data).status_code == 302
+                    except OperationalError:
+                        # "database is locked"
+                        ok = False
+                    latensi.append((time.perf_counter() - mulai) * 1000)
+                    gagal += not ok
+            finally:
+                connection.close()
+                antrian.put((latensi, gagal))
+
+        if pakai_thread:
+            pekerja = [threading.Thread(target=penulis, args=(c,)) for c in klien]
+        else:
+            # proses terpisah seperti worker gunicorn: tidak dibatasi GIL dan
+            # berebut kunci file database sungguhan
+            pekerja = [multiprocessing.get_context('fork').Process(target=penulis, args=(c,)) for c in klien]
+        mulai = time.perf_counter()
+        for p in pekerja:
+            p.start()
+        laporan = [antrian.get() for _ in pekerja]
+        for p in pekerja:
+            p.join()
+        detik = time.perf_counter() - mulai
+
+        latensi = sorted(x for lat, _ in laporan for x in lat)
+        gagal = sum(g for _, g in laporan)
+        berhasil = len(latensi) - gagal
+        return {
+            'penulis': len(klien),
+            'supervisi': berhasil,
+            'gagal': gagal,
+            'detik': round(detik, 2),
+            'per_detik': round(berhasil / detik, 1),
+            'p50_ms': round(statistics.median(latensi), 1),
+            'p95_ms': round(latensi[min(len(latensi) - 1, int(len(latensi) * 0.95))], 1),
+        }
+
+    def handle(self, *args, **opts):
+        hasil = []
+        opsi_asli = connection.settings_dict['OPTIONS']
+        test_asli = connection.settings_dict['TEST'].get('NAME')
+        with tempfile.TemporaryDirectory() as folder:
+            for nama, opsi in self._profil():
+                connection.close()
+                connection.settings_dict['OPTIONS'] = opsi_asli if opsi is None else opsi
+                if connection.vendor == 'sqlite':
+                    # database memori bersama tidak mewakili penguncian file; pakai file sementara
+                    connection.settings_dict['TEST']['NAME'] = os.path.join(folder, f'{nama}.sqlite3')
+                try:
+                    with database_uji():
+                        per_item = 10
+                        format_supervisi = buat_format_contoh(-(-opts['aspek'] // per_item), per_item)
+                        url = reverse('isi_supervisi', args=[format_supervisi.id])
+                        data = {'tim': '1', 'jenjang_pk': 'PK I', 'ruang': 'Bench', 'perawat_nama': 'Bench'}
+                        aspek_ids = AspekFormat.objects.filter(
+                            item_format__format_supervisi=format_supervisi
+                        ).values_list('id', flat=True)
+                        for i, aspek_id in enumerate(aspek_ids):
+                            data[f"{'d' if i % 3 else 'td'}_{aspek_id}"] = 'on'
+
+                        klien = []
+                        for i in range(max(opts['penulis'])):
+                            client = Client()
+                            client.force_login(buat_user(f'bench_penulis_{i}'))
+                            klien.append(client)
+                        klien[0].post(url, data)  # pemanasan
+                        connection.close()
+
+                        for n in opts['penulis']:
+                            statistik = self._jalankan(url, data, klien[:n], opts['per_penulis'], opts['thread'])
+                            statistik['profil'] = nama
+                            hasil.append(statistik)
+                finally:
+                    connection.settings_dict['OPTIONS'] = opsi_asli
+                    connection.settings_dict['TEST']['NAME'] = test_asli
+
+        tulis_laporan(
+            self.stdout, hasil,
+            ['profil', 'penulis', 'supervisi', 'gagal', 'detik', 'per_detik', 'p50_ms', 'p95_ms'],
+            sebagai_json=opts['json'],
+        )
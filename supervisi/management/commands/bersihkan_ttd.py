@@ -0,0 +1,96 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from supervisi.models import Supervisi
+from supervisi.storage import penyimpanan_ttd
+from supervisi.ttd import nama_asli_thumbnail
+
+FIELD_BERKAS = ('ttd_perawat', 'ttd_kepala', 'ttd_file')
+
+
+class Command(BaseCommand):
+    help = (
+        "Hapus file di media/ttd/ (termasuk thumbnail) yang tidak lagi dirujuk "
+        "oleh Supervisi mana pun. Rujukan dicek per batch sehingga memori dan "
+        "ukuran query tetap terbatas."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Hanya tampilkan file yang akan dihapus.")
+        parser.add_argument('--batch', type=int, default=500,
+                            help="Jumlah file yang dicek per query.")
+        parser.add_argument('--maks', type=int, default=None,
+                            help="Berhenti setelah menghapus sebanyak ini file.")
+        parser.add_argument('--umur-minimal', type=int, default=3600,
+                            help="Lewati file yang lebih muda dari ini (detik), "
+                                 "supaya unggahan yang sedang disimpan tidak ikut terhapus.")
+
+    def _berkas(self, batas_waktu):
+        akar = penyimpanan_ttd.path('ttd')
+        for folder, _, files in os.walk(akar):
+            for berkas in files:
+                path = os.path.join(folder, berkas)
+                try:
+                    if os.path.getmtime(path) > batas_waktu:
+                        continue
+                except FileNotFoundError:
+                    continue
+                yield os.path.relpath(path, penyimpanan_ttd.location).replace(os.sep, '/')
+
+    def _tidak_terpakai(self, batch):
+        """Nama di `batch` yang tidak dirujuk (thumbnail dinilai dari file aslinya)."""
+        pemilik = {nama: nama_asli_thumbnail(nama) or nama for nama in batch}
+        dicari = set(pemilik.values())
+        kondisi = Q()
+        for field in FIELD_BERKAS:
+            kondisi |= Q(**{f'{field}__in': dicari})
+        terpakai = set()
+        for baris in Supervisi.objects.filter(kondisi).values_list(*FIELD_BERKAS):
+            terpakai.update(baris)
+        return [nama for nama in batch if pemilik[nama] not in terpakai]
+
+    def handle(self, *args, **opts):
+        dry_run = opts['dry_run']
+        maks = opts['maks']
+        batas_waktu = time.time() - opts['umur_minimal']
+        dihapus = ukuran = diperiksa = 0
+
+        def proses(batch):
+            nonlocal dihapus, ukuran
+            for nama in self._tidak_terpakai(batch):
+                if maks is not None and dihapus >= maks:
+                    return False
+                try:
+                    # cek umur lagi tepat sebelum menghapus: file yang disimpan ulang
+                    # sejak daftar dibuat (mtime diperbarui, lihat storage.py) dilewati
+                    if os.path.getmtime(penyimpanan_ttd.path(nama)) > batas_waktu:
+                        continue
+                    ukuran += penyimpanan_ttd.size(nama)
+                    if not dry_run:
+                        penyimpanan_ttd.delete(nama)
+                except FileNotFoundError:
+                    continue
+                dihapus += 1
+                if opts['verbosity'] > 1 or dry_run:
+                    self.stdout.write(nama)
+            return True
+
+        batch = []
+        for nama in self._berkas(batas_waktu):
+            diperiksa += 1
+            batch.append(nama)
+            if len(batch) >= opts['batch']:
+                if not proses(batch):
+                    break
+                batch = []
+        else:
+            proses(batch)
+
+        aksi = "akan dihapus" if dry_run else "dihapus"
+        self.stdout.write(self.style.SUCCESS(
+            f"{diperiksa} file diperiksa, {dihapus} file tidak terpakai {aksi} ({ukuran / 1024:.1f} KB)."
+        ))
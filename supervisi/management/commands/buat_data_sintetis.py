@@ -0,0 +1,48 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from supervisi.sintetis import buat_data_sintetis
+
+
+class Command(BaseCommand):
+    help = (
+        "Isi database aktif dengan data sintetis (akun perawat/kepala ruangan, format, "
+        "dan riwayat supervisi bertahun-tahun) untuk uji skala. Ditulis dengan bulk insert."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--perawat', type=int, default=50, help="Jumlah akun perawat.")
+        parser.add_argument('--kepala', type=int, default=5, help="Jumlah akun kepala ruangan.")
+        parser.add_argument('--format', type=int, default=3, help="Jumlah format supervisi.")
+        parser.add_argument('--item', type=int, default=10, help="Jumlah item per format.")
+        parser.add_argument('--aspek', type=int, default=5, help="Jumlah aspek per item.")
+        parser.add_argument('--tahun', type=int, default=3, help="Panjang riwayat supervisi (tahun).")
+        parser.add_argument('--per-hari', type=int, default=20, help="Rata-rata supervisi per hari.")
+        parser.add_argument('--batch', type=int, default=1000, help="Jumlah supervisi per transaksi.")
+        parser.add_argument('--seed', type=int, default=0, help="Seed acak (data sama untuk seed sama).")
+        parser.add_argument('--paksa', action='store_true',
+                            help="Tetap jalan walaupun DEBUG=False (database produksi).")
+
+    def handle(self, *args, **opts):
+        if not settings.DEBUG and not opts['paksa']:
+            raise CommandError("DEBUG=False: data sintetis akan masuk ke database produksi. Pakai --paksa bila disengaja.")
+        if opts['perawat'] < 1 or opts['format'] < 1:
+            raise CommandError("--perawat dan --format minimal 1.")
+
+        def lapor(supervisi, jawaban):
+            self.stdout.write(f"  {supervisi} supervisi, {jawaban} jawaban")
+
+        mulai = time.perf_counter()
+        hasil = buat_data_sintetis(
+            jumlah_perawat=opts['perawat'], jumlah_kepala=opts['kepala'], jumlah_format=opts['format'],
+            item=opts['item'], aspek=opts['aspek'], tahun=opts['tahun'], per_hari=opts['per_hari'],
+            ukuran_batch=opts['batch'], seed=opts['seed'], lapor_progres=lapor,
+        )
+        detik = time.perf_counter() - mulai
+        self.stdout.write(self.style.SUCCESS(
+            f"{hasil['perawat']} perawat, {hasil['kepala']} kepala ruangan, {hasil['format']} format "
+            f"({hasil['aspek_per_format']} aspek), {hasil['supervisi']} supervisi dan {hasil['jawaban']} "
+            f"jawaban dibuat dalam {detik:.1f} detik."
+        ))
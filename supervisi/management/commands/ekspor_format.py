@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from supervisi.format_io import ekspor_csv, ekspor_json
+from supervisi.models import FormatSupervisi
+
+
+class Command(BaseCommand):
+    help = "Ekspor definisi format supervisi sebagai JSON (default) atau CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument('format_id', type=int)
+        parser.add_argument('--csv', action='store_true', help="Tulis sebagai CSV.")
+        parser.add_argument('-o', '--output', help="Tulis ke file ini (default: stdout).")
+
+    def handle(self, *args, **opts):
+        try:
+            format_supervisi = FormatSupervisi.objects.get(id=opts['format_id'])
+        except FormatSupervisi.DoesNotExist:
+            raise CommandError(f"Format #{opts['format_id']} tidak ditemukan.")
+        isi = ekspor_csv(format_supervisi) if opts['csv'] else ekspor_json(format_supervisi)
+        if opts['output']:
+            with open(opts['output'], 'w', encoding='utf-8', newline='') as f:
+                f.write(isi)
+            self.stderr.write(f"Format '{format_supervisi.nama}' ditulis ke {opts['output']}.")
+        else:
+            self.stdout.write(isi, ending='')
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from supervisi.models import Supervisi
+from supervisi.scoring import hitung_ulang_skor
+
+
+class Command(BaseCommand):
+    help = "Hitung ulang skor_total supervisi dengan UPDATE massal (mesin skor di scoring.py)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', type=int, dest='format_id',
+                            help="Hanya supervisi dengan format ini.")
+        parser.add_argument('--batch', type=int, default=2000,
+                            help="Jumlah supervisi per UPDATE.")
+        bobot = parser.add_mutually_exclusive_group()
+        bobot.add_argument('--tertimbang', action='store_true', default=None,
+                           help="Pakai ItemFormat.bobot (default mengikuti SKOR_TERTIMBANG).")
+        bobot.add_argument('--tanpa-bobot', action='store_false', dest='tertimbang',
+                           help="Setiap aspek bernilai sama.")
+
+    def handle(self, *args, **opts):
+        qs = Supervisi.objects.all()
+        if opts['format_id']:
+            qs = qs.filter(format_supervisi_id=opts['format_id'])
+
+        berubah = hitung_ulang_skor(qs, tertimbang=opts['tertimbang'], ukuran_batch=opts['batch'])
+        self.stdout.write(self.style.SUCCESS(f"{berubah} skor supervisi diperbarui."))
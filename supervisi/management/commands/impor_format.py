@@ -0,0 +1,34 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from supervisi.format_io import baca_berkas, impor_format
+from supervisi.models import FormatSupervisi
+
+
+class Command(BaseCommand):
+    help = "Impor definisi format supervisi dari file JSON/CSV (lihat supervisi/format_io.py)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('berkas', help="Path file .json atau .csv.")
+        parser.add_argument('--format', type=int, dest='format_id',
+                            help="Tambahkan item ke format yang sudah ada (default: buat format baru).")
+        parser.add_argument('--nama', help="Nama format baru (default: nama di file).")
+
+    def handle(self, *args, **opts):
+        format_supervisi = None
+        if opts['format_id']:
+            try:
+                format_supervisi = FormatSupervisi.objects.get(id=opts['format_id'])
+            except FormatSupervisi.DoesNotExist:
+                raise CommandError(f"Format #{opts['format_id']} tidak ditemukan.")
+        try:
+            with open(opts['berkas'], 'rb') as f:
+                definisi = baca_berkas(f, opts['berkas'])
+            if opts['nama']:
+                definisi['nama'] = opts['nama']
+            format_supervisi, jumlah_item, jumlah_aspek = impor_format(definisi, format_supervisi)
+        except (OSError, ValidationError) as e:
+            raise CommandError(e.messages[0] if isinstance(e, ValidationError) else str(e))
+        self.stdout.write(self.style.SUCCESS(
+            f"{jumlah_item} item dan {jumlah_aspek} aspek diimpor ke format #{format_supervisi.id} '{format_supervisi.nama}'."
+        ))
@@ -0,0 +1,59 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from supervisi.impor_supervisi import impor_supervisi, templat_csv
+from supervisi.models import FormatSupervisi
+
+
+class Command(BaseCommand):
+    help = (
+        "Impor massal supervisi lama dari file CSV/JSON (lihat supervisi/impor_supervisi.py). "
+        "Semua baris divalidasi dulu, lalu ditulis per batch dengan bulk_create."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('berkas', nargs='?', help="Path file .csv atau .json.")
+        parser.add_argument('--batch', type=int, default=1000,
+                            help="Jumlah supervisi per transaksi.")
+        parser.add_argument('--lewati-salah', action='store_true',
+                            help="Lewati baris tidak valid alih-alih membatalkan impor.")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Hanya validasi, tidak menulis ke database.")
+        parser.add_argument('--templat', type=int, metavar='FORMAT_ID',
+                            help="Cetak header CSV impor untuk format ini lalu keluar.")
+
+    def handle(self, *args, **opts):
+        if opts['templat']:
+            try:
+                format_supervisi = FormatSupervisi.objects.get(id=opts['templat'])
+            except FormatSupervisi.DoesNotExist:
+                raise CommandError(f"Format #{opts['templat']} tidak ditemukan.")
+            self.stdout.write(templat_csv(format_supervisi), ending='')
+            return
+        if not opts['berkas']:
+            raise CommandError("Sebutkan file yang akan diimpor.")
+
+        try:
+            with open(opts['berkas'], 'rb') as f:
+                data = f.read()
+            hasil = impor_supervisi(
+                data, opts['berkas'], ukuran_batch=opts['batch'],
+                lewati_salah=opts['lewati_salah'], kering=opts['dry_run'],
+            )
+        except OSError as e:
+            raise CommandError(str(e))
+        except ValidationError as e:
+            raise CommandError("\n".join(e.messages))
+
+        for no, pesan in hasil['salah']:
+            self.stderr.write(f"Baris {no} dilewati: {pesan}")
+        if opts['dry_run']:
+            self.stdout.write(self.style.SUCCESS(
+                f"{hasil['valid']} baris valid, {len(hasil['salah'])} baris salah (tidak ada yang ditulis)."
+            ))
+            return
+        laju = hasil['jawaban'] / hasil['detik'] if hasil['detik'] else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"{hasil['supervisi']} supervisi dan {hasil['jawaban']} jawaban diimpor "
+            f"dalam {hasil['detik']:.2f} detik ({laju:,.0f} jawaban/detik)."
+        ))
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from supervisi.jobs import ambil_tugas, jalankan, kembalikan_tugas_macet
+
+
+class Command(BaseCommand):
+    help = "Worker antrian tugas latar (render PDF/laporan) dari tabel Tugas."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sekali', action='store_true',
+                            help="Kerjakan semua tugas yang ada lalu berhenti.")
+        parser.add_argument('--jeda', type=float, default=1.0,
+                            help="Jeda (detik) antar pengecekan antrian saat kosong.")
+
+    def handle(self, *args, **opts):
+        dikembalikan = kembalikan_tugas_macet()
+        if dikembalikan:
+            self.stdout.write(f"{dikembalikan} tugas macet dikembalikan ke antrian.")
+
+        while True:
+            close_old_connections()
+            tugas = ambil_tugas()
+            if tugas is None:
+                if opts['sekali']:
+                    return
+                time.sleep(opts['jeda'])
+                continue
+
+            berhasil = jalankan(tugas)
+            self.stdout.write(f"Tugas #{tugas.id} {tugas.jenis}: {'selesai' if berhasil else 'gagal'}")
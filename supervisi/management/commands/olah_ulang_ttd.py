@@ -0,0 +1,39 @@
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from supervisi.models import Supervisi
+from supervisi.ttd import FIELD_TTD, nama_konten, nama_thumbnail, normalisasi, simpan_thumbnail
+
+
+class Command(BaseCommand):
+    help = (
+        "Olah TTD yang diunggah sebelum ada pengolahan gambar: ubah ke PNG "
+        "untuk PDF dan buat thumbnail-nya. TTD yang sudah punya thumbnail dilewati."
+    )
+
+    def handle(self, *args, **opts):
+        ada_ttd = Q()
+        for field in FIELD_TTD:
+            ada_ttd |= Q(**{f'{field}__isnull': False}) & ~Q(**{field: ''})
+        diolah = gagal = 0
+        for s in Supervisi.objects.filter(ada_ttd).iterator(chunk_size=500):
+            berubah = []
+            for field in FIELD_TTD:
+                berkas = getattr(s, field)
+                if not berkas or berkas.storage.exists(nama_thumbnail(berkas.name)):
+                    continue
+                try:
+                    with berkas.open('rb') as f:
+                        data = normalisasi(f)
+                except (OSError, ValueError) as e:
+                    gagal += 1
+                    self.stderr.write(f"Supervisi #{s.id} {field}: {e}")
+                    continue
+                berkas.save(nama_konten(data), ContentFile(data), save=False)
+                simpan_thumbnail(berkas, data)
+                berubah.append(field)
+            if berubah:
+                s.save(update_fields=berubah + ['diubah'])
+                diolah += 1
+        self.stdout.write(self.style.SUCCESS(f"{diolah} supervisi diolah, {gagal} TTD gagal."))
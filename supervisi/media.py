@@ -0,0 +1,76 @@
+"""
+Pengiriman file media (tanda tangan) lewat view yang memerlukan login.
+
+- ETag kuat: untuk file berbasis isi (nama = hash SHA-256, lihat storage.py)
+  ETag diambil langsung dari nama file; file lama memakai ukuran + mtime.
+- Last-Modified dari mtime; permintaan bersyarat dijawab 304 hanya dengan satu stat().
+- Hanya gambar (TIPE_INLINE) yang dikirim inline; file lain dikirim sebagai
+  lampiran application/octet-stream dengan nosniff supaya unggahan .html/.svg
+  tidak dijalankan browser di origin aplikasi.
+- Isi file dapat diserahkan ke web server depan (MEDIA_OFFLOAD):
+  'x-accel-redirect' (nginx, lokasi internal MEDIA_OFFLOAD_PREFIX) atau
+  'x-sendfile' (Apache/lighttpd); default FileResponse yang di-stream.
+"""
+import mimetypes
+import os
+import re
+import stat
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+_HASH = re.compile(r'^[0-9a-f]{64}$')
+
+# file berbasis isi tidak pernah berubah; file lama bisa ditimpa sehingga harus divalidasi ulang
+CACHE_KONTEN = 'private, max-age=31536000, immutable'
+CACHE_BIASA = 'private, no-cache'
+
+# tipe yang aman ditampilkan inline; SVG sengaja tidak termasuk (bisa memuat skrip)
+TIPE_INLINE = {'image/png', 'image/jpeg', 'image/gif', 'image/webp'}
+
+
+def hash_konten(nama):
+    """Hash isi dari nama file berbasis isi, atau None untuk file lama."""
+    stem = os.path.splitext(os.path.basename(nama))[0]
+    return stem if _HASH.match(stem) else None
+
+
+def etag_berkas(nama, st):
+    nilai = hash_konten(nama) or f"{st.st_size:x}-{st.st_mtime_ns:x}"
+    return f'"{nilai}"'
+
+
+def kirim_berkas(request, nama, path):
+    """
+    Response untuk file media `nama` (relatif ke MEDIA_ROOT) di `path`.
+    Melempar FileNotFoundError bila file tidak ada.
+    """
+    st = os.stat(path)
+    if not stat.S_ISREG(st.st_mode):
+        raise FileNotFoundError(path)
+    etag = etag_berkas(nama, st)
+    response = get_conditional_response(request, etag=etag, last_modified=int(st.st_mtime))
+    if response is None:
+        offload = settings.MEDIA_OFFLOAD
+        if offload == 'x-accel-redirect':
+            response = HttpResponse()
+            response['X-Accel-Redirect'] = quote(settings.MEDIA_OFFLOAD_PREFIX.rstrip('/') + '/' + nama)
+        elif offload == 'x-sendfile':
+            response = HttpResponse()
+            response['X-Sendfile'] = path
+        else:
+            response = FileResponse(open(path, 'rb'))
+        tipe, _ = mimetypes.guess_type(nama)
+        if tipe in TIPE_INLINE:
+            response['Content-Type'] = tipe
+        else:
+            response['Content-Type'] = 'application/octet-stream'
+            response['Content-Disposition'] = f"attachment; filename*=UTF-8''{quote(os.path.basename(nama))}"
+    response['X-Content-Type-Options'] = 'nosniff'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(st.st_mtime)
+    response['Cache-Control'] = CACHE_KONTEN if hash_konten(nama) else CACHE_BIASA
+    return response
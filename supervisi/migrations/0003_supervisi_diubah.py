@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-18 12:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("supervisi", "0002_supervisi_perawat_nama"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="supervisi",
+            name="diubah",
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
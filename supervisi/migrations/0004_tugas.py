@@ -0,0 +1,74 @@
+# Generated by Django 5.1.7 on 2026-10-18 12:35
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("supervisi", "0003_supervisi_diubah"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Tugas",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("jenis", models.CharField(max_length=50)),
+                ("parameter", models.JSONField(blank=True, default=dict)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("menunggu", "Menunggu"),
+                            ("berjalan", "Berjalan"),
+                            ("selesai", "Selesai"),
+                            ("gagal", "Gagal"),
+                        ],
+                        default="menunggu",
+                        max_length=20,
+                    ),
+                ),
+                ("progres", models.PositiveSmallIntegerField(default=0)),
+                ("pesan", models.TextField(blank=True)),
+                (
+                    "hasil",
+                    models.CharField(
+                        blank=True, max_length=500, verbose_name="Path file hasil"
+                    ),
+                ),
+                ("nama_file", models.CharField(blank=True, max_length=255)),
+                ("dibuat", models.DateTimeField(auto_now_add=True)),
+                ("mulai", models.DateTimeField(blank=True, null=True)),
+                ("selesai", models.DateTimeField(blank=True, null=True)),
+                (
+                    "dibuat_oleh",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="tugas",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["status", "id"], name="supervisi_t_status_1c08e6_idx"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.7 on 2026-10-18 12:36
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def isi_total(apps, schema_editor):
+    FormatSupervisi = apps.get_model("supervisi", "FormatSupervisi")
+    for format_supervisi in FormatSupervisi.objects.annotate(
+        n_item=Count("items", distinct=True), n_aspek=Count("items__aspek")
+    ):
+        FormatSupervisi.objects.filter(pk=format_supervisi.pk).update(
+            total_item=format_supervisi.n_item, total_aspek=format_supervisi.n_aspek
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("supervisi", "0004_tugas"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="formatsupervisi",
+            name="total_aspek",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="formatsupervisi",
+            name="total_item",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(isi_total, migrations.RunPython.noop),
+    ]
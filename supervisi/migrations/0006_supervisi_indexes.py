@@ -0,0 +1,47 @@
+# Generated by Django 5.1.7 on 2026-10-18 12:37
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("supervisi", "0005_formatsupervisi_total"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="supervisi",
+            index=models.Index(
+                fields=["-tanggal", "-id"], name="supervisi_tanggal_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="supervisi",
+            index=models.Index(
+                fields=["ruang", "-tanggal", "-id"], name="supervisi_ruang_tgl_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="supervisi",
+            index=models.Index(
+                fields=["tim", "-tanggal", "-id"], name="supervisi_tim_tgl_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="supervisi",
+            index=models.Index(
+                fields=["format_supervisi", "-tanggal", "-id"],
+                name="supervisi_format_tgl_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="supervisi",
+            index=models.Index(
+                fields=["jenjang_pk", "-tanggal", "-id"],
+                name="supervisi_jenjang_tgl_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.1.7 on 2026-10-18 12:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def isi_ringkasan(apps, schema_editor):
+    Supervisi = apps.get_model("supervisi", "Supervisi")
+    RingkasanSupervisi = apps.get_model("supervisi", "RingkasanSupervisi")
+    ttd_perawat = Q(ttd_perawat__isnull=False) & ~Q(ttd_perawat="")
+    ttd_kepala = Q(ttd_kepala__isnull=False) & ~Q(ttd_kepala="")
+    baris = (
+        Supervisi.objects.order_by()
+        .values("ruang", "tim", "format_supervisi_id", "jenjang_pk")
+        .annotate(
+            jumlah=Count("id"),
+            total_skor=Sum("skor_total"),
+            jumlah_ttd_perawat=Count("id", filter=ttd_perawat),
+            jumlah_ttd_kepala=Count("id", filter=ttd_kepala),
+            jumlah_lengkap=Count("id", filter=ttd_perawat & ttd_kepala),
+        )
+    )
+    RingkasanSupervisi.objects.bulk_create([RingkasanSupervisi(**b) for b in baris])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("supervisi", "0006_supervisi_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RingkasanSupervisi",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("ruang", models.CharField(max_length=100)),
+                ("tim", models.IntegerField()),
+                ("jenjang_pk", models.CharField(max_length=20)),
+                ("jumlah", models.IntegerField(default=0)),
+                ("total_skor", models.FloatField(default=0)),
+                ("jumlah_ttd_perawat", models.IntegerField(default=0)),
+                ("jumlah_ttd_kepala", models.IntegerField(default=0)),
+                ("jumlah_lengkap", models.IntegerField(default=0)),
+                (
+                    "format_supervisi",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ringkasan",
+                        to="supervisi.formatsupervisi",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("ruang", "tim", "format_supervisi", "jenjang_pk"),
+                        name="ringkasan_supervisi_unik",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(isi_ringkasan, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.1.7 on 2026-10-18 12:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("supervisi", "0007_ringkasansupervisi"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VersiData",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("nama", models.CharField(max_length=50, unique=True)),
+                ("versi", models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="jawabanaspek",
+            index=models.Index(
+                fields=["aspek", "supervisi", "d", "td"],
+                name="jawaban_aspek_analitik_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-18 12:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("supervisi", "0008_versidata_analitik"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="formatsupervisi",
+            name="versi",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.7 on 2026-10-18 12:47
+
+import supervisi.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("supervisi", "0009_formatsupervisi_versi"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="supervisi",
+            name="ttd_kepala",
+            field=models.ImageField(
+                blank=True,
+                null=True,
+                storage=supervisi.storage.ambil_penyimpanan_ttd,
+                upload_to=supervisi.storage.lokasi_ttd,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="supervisi",
+            name="ttd_perawat",
+            field=models.ImageField(
+                blank=True,
+                null=True,
+                storage=supervisi.storage.ambil_penyimpanan_ttd,
+                upload_to=supervisi.storage.lokasi_ttd,
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.7 on 2026-10-18 12:54
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("supervisi", "0010_ttd_penyimpanan_konten"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="supervisi",
+            name="tanggal",
+            field=models.DateField(default=django.utils.timezone.localdate),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.7 on 2026-10-18 12:58
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("supervisi", "0011_supervisi_tanggal_default"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="supervisi",
+            name="kunci_idempoten",
+            field=models.CharField(
+                blank=True, editable=False, max_length=64, null=True
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="supervisi",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("kunci_idempoten__isnull", False)),
+                fields=("perawat", "kunci_idempoten"),
+                name="supervisi_kunci_idempoten_unik",
+            ),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.1.7 on 2026-10-18 13:06
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, Max, Min
+from django.db.models.functions import Cast
+
+
+def gabung_jawaban_ganda(apps, schema_editor):
+    # Jawaban ganda digabung seperti yang selama ini ditampilkan (D/TD tercentang
+    # bila salah satu duplikat tercentang); baris dengan id terkecil dipertahankan.
+    # Skor supervisi terdampak dapat dihitung ulang dengan `manage.py hitung_ulang_skor`.
+    JawabanAspek = apps.get_model("supervisi", "JawabanAspek")
+    ganda = (
+        JawabanAspek.objects.order_by()
+        .values("supervisi_id", "aspek_id")
+        .annotate(
+            jumlah=Count("id"),
+            pertama=Min("id"),
+            d_ada=Max(Cast("d", IntegerField())),
+            td_ada=Max(Cast("td", IntegerField())),
+        )
+        .filter(jumlah__gt=1)
+    )
+    for g in ganda:
+        baris = JawabanAspek.objects.filter(
+            supervisi_id=g["supervisi_id"], aspek_id=g["aspek_id"]
+        )
+        baris.exclude(id=g["pertama"]).delete()
+        baris.update(d=bool(g["d_ada"]), td=bool(g["td_ada"]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("supervisi", "0012_supervisi_kunci_idempoten"),
+    ]
+
+    operations = [
+        migrations.RunPython(gabung_jawaban_ganda, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="jawabanaspek",
+            constraint=models.UniqueConstraint(
+                fields=("supervisi", "aspek"), name="jawaban_aspek_unik"
+            ),
+        ),
+    ]
@@ -1,12 +1,59 @@
 from django.db import models
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
+from django.utils import timezone
+
+from .storage import ambil_penyimpanan_ttd, lokasi_ttd
+from .ttd import olah_ttd_baru
 
 class FormatSupervisi(models.Model):
     nama = models.CharField(max_length=255)
     deskripsi = models.TextField(blank=True, null=True)
+    # Jumlah item/aspek disimpan di sini (dijaga oleh signals) supaya halaman
+    # daftar format tidak perlu COUNT per baris.
+    total_item = models.PositiveIntegerField(default=0, editable=False)
+    total_aspek = models.PositiveIntegerField(default=0, editable=False)
+    # Dinaikkan setiap kali format, item, atau aspeknya berubah; dipakai sebagai
+    # kunci cache fragmen template yang menampilkan pohon format.
+    versi = models.PositiveIntegerField(default=0, editable=False)
 
     def jumlah_aspek(self):
-        return sum(item.aspek.count() for item in self.items.all())
+        return self.total_aspek
+
+    @classmethod
+    def hitung_ulang_jumlah(cls, qs=None):
+        """
+        Hitung ulang total_item/total_aspek untuk format di `qs` (default: semua)
+        dengan satu UPDATE (versi ikut dinaikkan). Dipanggil signals, dan wajib
+        dipanggil setelah bulk_create/bulk delete item atau aspek yang tidak
+        memicu signals.
+        """
+        qs = cls.objects.all() if qs is None else qs
+        item = (
+            ItemFormat.objects.filter(format_supervisi=OuterRef('pk'))
+            .order_by().values('format_supervisi').annotate(n=Count('id')).values('n')
+        )
+        aspek = (
+            AspekFormat.objects.filter(item_format__format_supervisi=OuterRef('pk'))
+            .order_by().values('item_format__format_supervisi').annotate(n=Count('id')).values('n')
+        )
+        return qs.update(
+            total_item=Coalesce(Subquery(item), 0),
+            total_aspek=Coalesce(Subquery(aspek), 0),
+            versi=F('versi') + 1,
+        )
+
+    @classmethod
+    def naikkan_versi(cls, qs):
+        """Tandai format di `qs` berubah sehingga fragmen template lama tidak dipakai lagi."""
+        return qs.update(versi=F('versi') + 1)
+
+    @classmethod
+    def kunci_versi(cls, qs=None):
+        """Kunci cache untuk daftar format: gabungan id dan versi setiap format (satu query)."""
+        qs = cls.objects.all() if qs is None else qs
+        return ','.join(f"{pk}.{versi}" for pk, versi in qs.order_by('pk').values_list('pk', 'versi'))
 
     def __str__(self):
         return self.nama
@@ -38,7 +85,9 @@ class Supervisi(models.Model):
     perawat_nama = models.CharField("Nama Perawat (custom)", max_length=255, blank=True, null=True)
     kepala_nama = models.CharField("Nama Kepala Ruangan (custom)", max_length=255, blank=True, null=True)
     kepala_nip  = models.CharField("NIP Kepala Ruangan (custom)", max_length=100, blank=True, null=True)
-    tanggal = models.DateField(auto_now_add=True)
+    # default (bukan auto_now_add) supaya impor data lama bisa menyimpan tanggal aslinya
+    tanggal = models.DateField(default=timezone.localdate)
+    diubah = models.DateTimeField(auto_now=True)
 
     TIM_CHOICES = [(i, f"Tim {i}") for i in range(1, 5)]
     tim = models.IntegerField(choices=TIM_CHOICES, default=1)
@@ -54,22 +103,74 @@ class Supervisi(models.Model):
     ruang = models.CharField(max_length=100, default='Imdad Hamid Lantai 2')
 
     skor_total = models.FloatField(default=0)
-    ttd_perawat = models.ImageField(upload_to='ttd/', null=True, blank=True)
-    ttd_kepala = models.ImageField(upload_to='ttd/', null=True, blank=True)
+    # TTD disimpan berbasis isi (hash) di subfolder bertingkat, lihat storage.py
+    ttd_perawat = models.ImageField(upload_to=lokasi_ttd, storage=ambil_penyimpanan_ttd, null=True, blank=True)
+    ttd_kepala = models.ImageField(upload_to=lokasi_ttd, storage=ambil_penyimpanan_ttd, null=True, blank=True)
     ttd_file = models.ImageField(upload_to='ttd/', blank=True, null=True)
+    # kunci buatan tablet untuk kiriman offline; kiriman ulang dengan kunci sama tidak menggandakan data
+    kunci_idempoten = models.CharField(max_length=64, null=True, blank=True, editable=False)
+
+    class Meta:
+        # Dipakai paginasi keyset (-tanggal, -id) dan filter daftar supervisi
+        indexes = [
+            models.Index(fields=['-tanggal', '-id'], name='supervisi_tanggal_id_idx'),
+            models.Index(fields=['ruang', '-tanggal', '-id'], name='supervisi_ruang_tgl_idx'),
+            models.Index(fields=['tim', '-tanggal', '-id'], name='supervisi_tim_tgl_idx'),
+            models.Index(fields=['format_supervisi', '-tanggal', '-id'], name='supervisi_format_tgl_idx'),
+            models.Index(fields=['jenjang_pk', '-tanggal', '-id'], name='supervisi_jenjang_tgl_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['perawat', 'kunci_idempoten'],
+                condition=models.Q(kunci_idempoten__isnull=False),
+                name='supervisi_kunci_idempoten_unik',
+            ),
+        ]
+
+    def clean(self):
+        # unggahan TTD baru harus gambar yang dapat dibaca; sekaligus diolah (lihat ttd.py)
+        olah_ttd_baru(self)
 
     def hitung_skor(self):
-        jawaban = self.jawaban_aspek.all()
-        total_dikerjakan = sum(1 for j in jawaban if j.d)
-        total_dinilai = sum(1 for j in jawaban if (j.d or j.td))
-        self.skor_total = (total_dikerjakan / total_dinilai * 100) if total_dinilai > 0 else 0
-        self.save()
+        from .scoring import hitung_ulang_skor
+        hitung_ulang_skor(Supervisi.objects.filter(pk=self.pk))
+        self.refresh_from_db(fields=['skor_total', 'diubah'])
         return self.skor_total
 
     def __str__(self):
         return f"Supervisi {self.perawat.username} - {self.format_supervisi.nama}"
 
 
+class RingkasanSupervisi(models.Model):
+    """
+    Agregat supervisi per (ruang, tim, format, jenjang PK) untuk dashboard.
+    Diperbarui bertahap oleh signals Supervisi; perubahan yang melewati signals
+    (QuerySet.update(), SQL mentah) wajib diikuti `bangun_ulang_ringkasan` (lihat
+    ringkasan.py), atau `manage.py bangun_ulang_ringkasan`.
+    """
+    ruang = models.CharField(max_length=100)
+    tim = models.IntegerField()
+    format_supervisi = models.ForeignKey(FormatSupervisi, on_delete=models.CASCADE, related_name='ringkasan')
+    jenjang_pk = models.CharField(max_length=20)
+
+    jumlah = models.IntegerField(default=0)
+    total_skor = models.FloatField(default=0)
+    jumlah_ttd_perawat = models.IntegerField(default=0)
+    jumlah_ttd_kepala = models.IntegerField(default=0)
+    jumlah_lengkap = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['ruang', 'tim', 'format_supervisi', 'jenjang_pk'],
+                name='ringkasan_supervisi_unik',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.ruang} / Tim {self.tim} / {self.jenjang_pk}: {self.jumlah}"
+
+
 class JawabanItem(models.Model):
     supervisi = models.ForeignKey(Supervisi, on_delete=models.CASCADE, related_name='jawaban')
     item = models.ForeignKey(ItemFormat, on_delete=models.CASCADE)
@@ -82,5 +183,67 @@ class JawabanAspek(models.Model):
     d = models.BooleanField(default=False)
     td = models.BooleanField(default=False)
 
+    class Meta:
+        # covering index untuk analitik per aspek (GROUP BY aspek, hitung D/TD)
+        indexes = [models.Index(fields=['aspek', 'supervisi', 'd', 'td'], name='jawaban_aspek_analitik_idx')]
+        constraints = [
+            # satu jawaban per aspek; juga jadi indeks pencarian jawaban per supervisi
+            # dan target ON CONFLICT saat koreksi jawaban (lihat services.ubah_jawaban)
+            models.UniqueConstraint(fields=['supervisi', 'aspek'], name='jawaban_aspek_unik'),
+        ]
+
     def __str__(self):
         return f"{self.aspek.nama_aspek} - {'D' if self.d else ''}{'TD' if self.td else ''}"
+
+
+class VersiData(models.Model):
+    """
+    Penanda versi bersama untuk cache lintas proses. Nilai `versi` dinaikkan
+    setiap kali data yang bersangkutan berubah (mis. 'jawaban').
+    """
+    nama = models.CharField(max_length=50, unique=True)
+    versi = models.PositiveBigIntegerField(default=0)
+
+    @classmethod
+    def ambil(cls, nama):
+        return cls.objects.filter(nama=nama).values_list('versi', flat=True).first() or 0
+
+    @classmethod
+    def naikkan(cls, nama):
+        if not cls.objects.filter(nama=nama).update(versi=models.F('versi') + 1):
+            cls.objects.get_or_create(nama=nama, defaults={'versi': 1})
+
+    def __str__(self):
+        return f"{self.nama} v{self.versi}"
+
+
+class Tugas(models.Model):
+    """Antrian tugas latar (render PDF/laporan) yang dikerjakan `manage.py jalankan_tugas`."""
+    MENUNGGU = 'menunggu'
+    BERJALAN = 'berjalan'
+    SELESAI = 'selesai'
+    GAGAL = 'gagal'
+    STATUS_CHOICES = [
+        (MENUNGGU, 'Menunggu'),
+        (BERJALAN, 'Berjalan'),
+        (SELESAI, 'Selesai'),
+        (GAGAL, 'Gagal'),
+    ]
+
+    jenis = models.CharField(max_length=50)
+    parameter = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=MENUNGGU)
+    progres = models.PositiveSmallIntegerField(default=0)
+    pesan = models.TextField(blank=True)
+    hasil = models.CharField("Path file hasil", max_length=500, blank=True)
+    nama_file = models.CharField(max_length=255, blank=True)
+    dibuat_oleh = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='tugas')
+    dibuat = models.DateTimeField(auto_now_add=True)
+    mulai = models.DateTimeField(null=True, blank=True)
+    selesai = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'id'])]
+
+    def __str__(self):
+        return f"Tugas #{self.id} {self.jenis} ({self.status})"
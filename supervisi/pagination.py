@@ -0,0 +1,94 @@
+"""
+Paginasi keyset (cursor). Halaman berikutnya diambil dengan WHERE pada kunci
+urutan baris terakhir, bukan OFFSET, sehingga biaya per halaman tetap walau
+tabel berisi ratusan ribu baris.
+"""
+import base64
+import json
+from dataclasses import dataclass
+
+from django.db.models import Q
+
+
+@dataclass
+class Halaman:
+    objek: list
+    berikutnya: str | None
+    sebelumnya: str | None
+
+    def __iter__(self):
+        return iter(self.objek)
+
+    def __len__(self):
+        return len(self.objek)
+
+
+def _nama(field):
+    return field.lstrip('-')
+
+
+def encode_cursor(obj, urutan):
+    """Cursor dari instance model atau dict hasil `.values()`."""
+    ambil = obj.get if isinstance(obj, dict) else lambda f: getattr(obj, f)
+    nilai = [str(ambil(_nama(f))) for f in urutan]
+    return base64.urlsafe_b64encode(json.dumps(nilai).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, model, urutan):
+    """Kembalikan daftar nilai kunci dari cursor, atau None jika cursor rusak."""
+    try:
+        nilai = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        if len(nilai) != len(urutan):
+            return None
+        return [model._meta.get_field(_nama(f)).to_python(v) for f, v in zip(urutan, nilai)]
+    except Exception:
+        return None
+
+
+def _setelah(urutan, nilai, maju):
+    """Q untuk baris yang berada sesudah (maju) / sebelum kunci `nilai` dalam `urutan`."""
+    q = Q()
+    for i, field in enumerate(urutan):
+        op = 'lt' if field.startswith('-') == maju else 'gt'
+        kondisi = Q(**{f"{_nama(field)}__{op}": nilai[i]})
+        for j in range(i):
+            kondisi &= Q(**{_nama(urutan[j]): nilai[j]})
+        q |= kondisi
+    # batas inklusif pada field pertama supaya index bisa dipakai sebagai range scan
+    op = 'lte' if urutan[0].startswith('-') == maju else 'gte'
+    return Q(**{f"{_nama(urutan[0])}__{op}": nilai[0]}) & q
+
+
+def paginasi_keyset(qs, urutan=('-tanggal', '-id'), setelah=None, sebelum=None, ukuran=50):
+    """
+    Ambil satu halaman dari `qs` berurutan `urutan` (field terakhir harus unik, mis. id).
+    `setelah`/`sebelum` adalah cursor dari halaman sebelumnya.
+    """
+    urutan = list(urutan)
+    model = qs.model
+    maju = True
+    if sebelum and (nilai := decode_cursor(sebelum, model, urutan)):
+        maju = False
+        balik = [f[1:] if f.startswith('-') else f"-{f}" for f in urutan]
+        qs = qs.filter(_setelah(urutan, nilai, False)).order_by(*balik)
+    elif setelah and (nilai := decode_cursor(setelah, model, urutan)):
+        qs = qs.filter(_setelah(urutan, nilai, True)).order_by(*urutan)
+    else:
+        setelah = None
+        qs = qs.order_by(*urutan)
+
+    objek = list(qs[:ukuran + 1])
+    ada_lagi = len(objek) > ukuran
+    objek = objek[:ukuran]
+
+    if maju:
+        ada_berikutnya, ada_sebelumnya = ada_lagi, bool(setelah)
+    else:
+        objek.reverse()
+        ada_berikutnya, ada_sebelumnya = True, ada_lagi
+
+    return Halaman(
+        objek=objek,
+        berikutnya=encode_cursor(objek[-1], urutan) if objek and ada_berikutnya else None,
+        sebelumnya=encode_cursor(objek[0], urutan) if objek and ada_sebelumnya else None,
+    )
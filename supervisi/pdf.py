@@ -0,0 +1,292 @@
+"""
+Render PDF hasil supervisi (ReportLab, layout seperti HTML) beserta cache-nya di disk.
+
+Pembuatan PDF dipisah menjadi dua tahap:
+- `data_pdf()` membaca semua yang dibutuhkan dari database dengan jumlah query tetap
+  dan menghasilkan dict biasa (bisa di-pickle);
+- `render_pdf()` hanya mengerjakan ReportLab dari dict tersebut, tanpa ORM.
+"""
+import os
+from io import BytesIO
+from pathlib import Path
+
+from django.conf import settings
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import cm
+from reportlab.platypus import Image, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from .services import jawaban_supervisi
+from .struktur import struktur_format_banyak
+
+
+def _nama_user(user):
+    if not user:
+        return ""
+    return user.get_full_name() or user.username
+
+
+def _susun_data(s, items, jawaban):
+    return {
+        'id': s.id,
+        'perawat': s.perawat_nama or _nama_user(s.perawat),
+        'skor_total': s.skor_total,
+        'ruang': s.ruang,
+        'tim': s.tim,
+        'jenjang_pk': s.jenjang_pk,
+        'items': [
+            (pertanyaan, [(nama_aspek,) + jawaban.get(aspek_id, (False, False))
+                          for aspek_id, nama_aspek in aspek_list])
+            for pertanyaan, aspek_list in items
+        ],
+        'ttd_perawat': s.ttd_perawat.path if s.ttd_perawat else None,
+        'ttd_kepala': s.ttd_kepala.path if s.ttd_kepala else None,
+        'kepala_nama': s.kepala_nama or _nama_user(s.kepala_ruangan),
+        'kepala_nip': s.kepala_nip or "",
+    }
+
+
+def data_pdf_banyak(supervisi_list):
+    """
+    Kumpulkan data PDF untuk banyak Supervisi sekaligus (perawat dan
+    kepala_ruangan sebaiknya sudah di-select_related). Jawaban dimuat sebagai
+    matriks {supervisi_id: {aspek_id: (d, td)}} dan struktur format dibaca dari
+    cache struktur (lihat struktur.py), jadi jumlah query tidak bergantung pada
+    jumlah aspek.
+    """
+    if not supervisi_list:
+        return []
+
+    jawaban = jawaban_supervisi([s.id for s in supervisi_list])
+    struktur = struktur_format_banyak({s.format_supervisi_id for s in supervisi_list})
+    items_format = {
+        format_id: [
+            (item.pertanyaan, [(aspek.id, aspek.nama_aspek) for aspek in item.aspek])
+            for item in f.items
+        ]
+        for format_id, f in struktur.items()
+    }
+
+    return [
+        _susun_data(s, items_format[s.format_supervisi_id], jawaban[s.id])
+        for s in supervisi_list
+    ]
+
+
+def data_pdf(s):
+    """Kumpulkan data PDF untuk satu Supervisi `s`."""
+    return data_pdf_banyak([s])[0]
+
+
+def render_pdf(data, output):
+    """Tulis dokumen PDF dari hasil `data_pdf()` ke file-like `output`."""
+    doc = SimpleDocTemplate(
+        output, pagesize=A4,
+        leftMargin=1.4*cm, rightMargin=1.4*cm,
+        topMargin=1.6*cm, bottomMargin=1.4*cm
+    )
+
+    css = getSampleStyleSheet()
+    st_title = ParagraphStyle('title', parent=css['Normal'],
+                              fontName='Times-Bold', fontSize=14, leading=18,
+                              alignment=1, spaceAfter=14, spaceBefore=2)
+    st_small = ParagraphStyle('small', parent=css['Normal'],
+                              fontName='Times-Roman', fontSize=11.5, leading=13)
+
+    elements = []
+
+    # Judul
+    elements.append(Paragraph("FORM SUPERVISI KEPERAWATAN MONITORING BALANCE CAIRAN", st_title))
+    elements.append(Spacer(1, 6))
+
+    iw = doc.width
+
+    # Info
+    perawat_display = data['perawat']
+
+    col_info_label = 0.22 * iw
+    col_info_value = 0.28 * iw
+    info_rows = [
+        [
+            Paragraph("<b>Perawat</b>", st_small),
+            Paragraph(perawat_display, st_small),
+            Paragraph("<b>Skor Total</b>", st_small),
+            Paragraph(f"{data['skor_total']:.1f}%", st_small),
+        ],
+        [
+            Paragraph("<b>Ruang</b>", st_small),
+            Paragraph(data['ruang'], st_small),
+            Paragraph("<b>Tim</b>", st_small),
+            Paragraph(f"Tim {data['tim']}", st_small),
+        ],
+        [
+            Paragraph("<b>Jenjang PK</b>", st_small),
+            Paragraph(data['jenjang_pk'], st_small),
+            "", ""
+        ],
+    ]
+    info_tbl = Table(
+        info_rows,
+        colWidths=[col_info_label, col_info_value, col_info_label, col_info_value]
+    )
+    info_tbl.setStyle(TableStyle([
+        ('FONT', (0,0), (-1,-1), 'Times-Roman', 12),
+        ('ALIGN', (0,0), (-1,-1), 'LEFT'),
+        ('VALIGN', (0,0), (-1,-1), 'TOP'),
+        ('TOPPADDING', (0,0), (-1,-1), 2),
+        ('BOTTOMPADDING', (0,0), (-1,-1), 2),
+        ('LEFTPADDING', (0,0), (-1,-1), 0),
+        ('RIGHTPADDING', (0,0), (-1,-1), 0),
+    ]))
+    elements.append(info_tbl)
+    elements.append(Spacer(1, 8))
+
+    # Tabel utama
+    col1 = 0.25 * iw
+    colD = 0.075 * iw
+    colTD = 0.075 * iw
+    col2 = iw - (col1 + colD + colTD)
+
+    rows = [
+        [Paragraph("<b>PROSEDUR</b>", st_small),
+         Paragraph("<b>ASPEK YANG DINILAI</b>", st_small),
+         Paragraph("<b>PENILAIAN</b>", st_small), ""],
+        ["", "", Paragraph("<b>D</b>", st_small), Paragraph("<b>TD</b>", st_small)]
+    ]
+
+    for pertanyaan, aspek_list in data['items']:
+        for idx, (nama_aspek, d, td) in enumerate(aspek_list):
+            jd = "✓" if d else ""
+            jtd = "✓" if td else ""
+            rows.append([
+                Paragraph(pertanyaan if idx == 0 else "", st_small),
+                Paragraph(f"{idx+1}. {nama_aspek}", st_small),
+                Paragraph(f"<para align='center'>{jd}</para>", st_small),
+                Paragraph(f"<para align='center'>{jtd}</para>", st_small),
+            ])
+
+    tbl = Table(rows, colWidths=[col1, col2, colD, colTD])
+    tbl.setStyle(TableStyle([
+        ('SPAN', (0,0), (0,1)),
+        ('SPAN', (1,0), (1,1)),
+        ('SPAN', (2,0), (3,0)),
+        ('GRID', (0,0), (-1,-1), 1, colors.black),
+        ('BOX',  (0,0), (-1,-1), 1, colors.black),
+        ('FONT', (0,0), (-1,1), 'Times-Bold', 12),
+        ('ALIGN', (0,0), (-1,1), 'CENTER'),
+        ('VALIGN', (0,0), (-1,-1), 'TOP'),
+        ('ALIGN', (2,2), (3,-1), 'CENTER'),
+        ('FONT', (0,2), (-1,-1), 'Times-Roman', 12),
+        ('LEFTPADDING', (0,0), (-1,-1), 6),
+        ('RIGHTPADDING', (0,0), (-1,-1), 6),
+        ('TOPPADDING', (0,0), (-1,-1), 5),
+        ('BOTTOMPADDING', (0,0), (-1,-1), 5),
+        ('BACKGROUND', (0,0), (-1,1), colors.whitesmoke),
+    ]))
+    elements.append(tbl)
+
+    # Spasi sebelum tanda tangan
+    elements.append(Spacer(1, 36))
+
+    # Label tanda tangan
+    col_signature = iw / 2
+    lbl = Table([["PERAWAT YANG DI SUPERVISI", "SUPERVISOR"]],
+                colWidths=[col_signature, col_signature])
+    lbl.setStyle(TableStyle([
+        ('FONT', (0,0), (-1,-1), 'Times-Bold', 12),
+        ('ALIGN', (0,0), (-1,-1), 'CENTER'),
+        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+        ('BOTTOMPADDING', (0,0), (-1,-1), 28),
+    ]))
+    elements.append(lbl)
+
+    # Gambar TTD
+    left_img = Image(data['ttd_perawat'], width=4*cm, height=2.3*cm) if data['ttd_perawat'] else Spacer(1, 2.3*cm)
+    right_img = Image(data['ttd_kepala'], width=4*cm, height=2.3*cm) if data['ttd_kepala'] else Spacer(1, 2.3*cm)
+    ttd = Table([[left_img, right_img]], colWidths=[col_signature, col_signature])
+    ttd.setStyle(TableStyle([
+        ('ALIGN', (0,0), (-1,-1), 'CENTER'),
+        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+        ('BOTTOMPADDING', (0,0), (-1,-1), 4),
+    ]))
+    elements.append(ttd)
+
+    # Nama + NIP kepala (ambil dari input admin/detail_supervisi.html jika diisi)
+    sup_name = data['kepala_nama']
+    sup_nip = data['kepala_nip']
+
+    nurse_name = perawat_display or ""
+
+    name_cells = [
+        [
+            Paragraph(
+                f"<para align='center'><u>{nurse_name}</u></para>",
+                st_small
+            ),
+            Paragraph(
+                f"<para align='center'><u>{sup_name}</u>{('<br/>NIP : ' + sup_nip) if sup_nip else ''}</para>",
+                st_small
+            )
+        ]
+    ]
+    names = Table(name_cells, colWidths=[col_signature, col_signature])
+    names.setStyle(TableStyle([
+        ('ALIGN', (0,0), (-1,-1), 'CENTER'),
+        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+        ('TOPPADDING', (0,0), (-1,-1), 8),
+        ('BOTTOMPADDING', (0,0), (-1,-1), 4),
+    ]))
+    elements.append(names)
+
+    doc.build(elements)
+
+
+def render_pdf_bytes(data):
+    """Render PDF ke bytes (dipakai oleh worker proses di ekspor massal)."""
+    buf = BytesIO()
+    render_pdf(data, buf)
+    return buf.getvalue()
+
+
+# ================== CACHE DI DISK ==================
+def _folder_cache():
+    return Path(settings.PDF_CACHE_DIR)
+
+
+def path_cache(s):
+    """
+    Lokasi file cache PDF untuk Supervisi `s`. Nama file memuat waktu perubahan
+    terakhir supervisi dan versi formatnya (naik saat nama, item, atau aspek
+    format diubah), sehingga setiap perubahan otomatis menghasilkan kunci baru.
+    `s.format_supervisi` sebaiknya sudah di-select_related.
+    """
+    return _folder_cache() / f"supervisi_{s.id}_{s.diubah:%Y%m%d%H%M%S%f}_v{s.format_supervisi.versi}.pdf"
+
+
+def hapus_cache_pdf(supervisi_id):
+    """Hapus semua file cache PDF milik sebuah supervisi."""
+    for path in _folder_cache().glob(f"supervisi_{supervisi_id}_*.pdf"):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def simpan_cache_pdf(s, isi):
+    """Simpan bytes PDF ke cache secara atomik dan kembalikan path-nya."""
+    path = path_cache(s)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    hapus_cache_pdf(s.id)
+    sementara = path.with_suffix(f".{os.getpid()}.tmp")
+    sementara.write_bytes(isi)
+    os.replace(sementara, path)
+    return path
+
+
+def pdf_supervisi(s):
+    """Kembalikan path PDF Supervisi `s`, render ulang hanya jika cache belum ada."""
+    path = path_cache(s)
+    if path.exists():
+        return path
+    return simpan_cache_pdf(s, render_pdf_bytes(data_pdf(s)))
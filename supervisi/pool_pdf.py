@@ -0,0 +1,77 @@
+"""
+Process pool untuk render PDF di ekspor massal.
+
+Pool dibuat sekali per proses web (saat ekspor pertama) dan dipakai ulang oleh
+ekspor berikutnya. Proses anak dimulai dengan start method 'spawn', bukan fork:
+anak tidak mewarisi koneksi database, thread, maupun socket worker web. Setiap
+anak menyiapkan Django sendiri lalu hanya menjalankan ReportLab dari dict
+`data_pdf_banyak` (tanpa ORM). Jumlah proses diatur settings.PDF_EXPORT_WORKERS
+(None = jumlah CPU); 1 berarti render langsung di proses pemanggil.
+
+Modul ini sengaja tidak mengimpor model di tingkat modul, karena proses anak
+mengimpornya sebelum `django.setup()` dijalankan.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+
+_pool = None
+_kunci = threading.Lock()
+
+
+def jumlah_worker_pdf():
+    return settings.PDF_EXPORT_WORKERS or os.cpu_count() or 1
+
+
+def _siapkan_proses():
+    import django
+    django.setup()
+
+
+def _render(data):
+    from .pdf import render_pdf_bytes
+    return render_pdf_bytes(data)
+
+
+def _ambil_pool(workers):
+    global _pool
+    with _kunci:
+        if _pool is not None and _pool._max_workers != workers:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_siapkan_proses,
+            )
+        return _pool
+
+
+def tutup_pool():
+    """Hentikan pool (bila ada); ekspor berikutnya membuat pool baru."""
+    global _pool
+    with _kunci:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+
+def render_banyak(daftar_data):
+    """
+    Render setiap dict data PDF menjadi bytes, urutan sama dengan `daftar_data`.
+    Lebih dari satu PDF dibagi ke proses pool; bila pool rusak (anak mati), pool
+    dibuang dan batch ini dirender di proses pemanggil.
+    """
+    workers = jumlah_worker_pdf()
+    if workers <= 1 or len(daftar_data) <= 1:
+        return [_render(data) for data in daftar_data]
+    try:
+        return list(_ambil_pool(workers).map(_render, daftar_data))
+    except BrokenProcessPool:
+        tutup_pool()
+        return [_render(data) for data in daftar_data]
@@ -0,0 +1,188 @@
+"""
+Profil per request untuk menemukan view yang lambat di produksi.
+
+`ProfilMiddleware` mengukur sebagian request (settings.PROFIL_SAMPEL): jumlah dan
+waktu SQL (lewat `connection.execute_wrapper`), waktu render template (lewat
+backend `DjangoTemplatesTerukur`), dan total waktu. Hasilnya dikirim sebagai
+header `Server-Timing` (terlihat di tab Network browser) dan disimpan di memori:
+PROFIL_JENDELA request terakhir per view untuk persentil, plus SQL terberat per
+view (teks SQL berparameter, tanpa nilai). Request yang tidak disampel hanya
+membayar dua pembacaan jam.
+
+Statistik bersifat per proses: setiap worker gunicorn menyimpan miliknya sendiri.
+Untuk response streaming hanya bagian sebelum stream dimulai yang terukur.
+"""
+import random
+import statistics
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connection
+from django.template.backends.django import DjangoTemplates
+
+# jumlah SQL berbeda yang diingat per view; yang paling ringan dibuang bila lewat
+MAKS_SQL_PER_VIEW = 50
+SQL_TERBERAT = 5
+
+_aktif = ContextVar('profil_aktif', default=None)
+_statistik = {}
+_kunci = threading.Lock()
+
+
+class _Pengukuran:
+    """Angka satu request yang sedang disampel."""
+    __slots__ = ('sql_n', 'sql_ms', 'template_ms', 'sql')
+
+    def __init__(self):
+        self.sql_n = 0
+        self.sql_ms = 0.0
+        self.template_ms = 0.0
+        self.sql = {}  # teks SQL -> [jumlah, total_ms, maks_ms]
+
+    def catat_sql(self, execute, sql, params, many, context):
+        mulai = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            ms = (time.perf_counter() - mulai) * 1000
+            self.sql_n += 1
+            self.sql_ms += ms
+            catatan = self.sql.setdefault(sql, [0, 0.0, 0.0])
+            catatan[0] += 1
+            catatan[1] += ms
+            catatan[2] = max(catatan[2], ms)
+
+
+class _StatistikView:
+    __slots__ = ('jumlah', 'sampel', 'sql')
+
+    def __init__(self, jendela):
+        self.jumlah = 0
+        self.sampel = deque(maxlen=jendela)  # (total_ms, sql_n, sql_ms, template_ms)
+        self.sql = {}
+
+
+def _catat(view, total_ms, ukur):
+    with _kunci:
+        stat = _statistik.get(view)
+        if stat is None:
+            stat = _statistik[view] = _StatistikView(settings.PROFIL_JENDELA)
+        stat.jumlah += 1
+        stat.sampel.append((total_ms, ukur.sql_n, ukur.sql_ms, ukur.template_ms))
+        for sql, (n, ms, maks) in ukur.sql.items():
+            catatan = stat.sql.setdefault(sql, [0, 0.0, 0.0])
+            catatan[0] += n
+            catatan[1] += ms
+            catatan[2] = max(catatan[2], maks)
+        if len(stat.sql) > 2 * MAKS_SQL_PER_VIEW:
+            terberat = sorted(stat.sql.items(), key=lambda kv: kv[1][1], reverse=True)[:MAKS_SQL_PER_VIEW]
+            stat.sql = dict(terberat)
+
+
+def _persentil(urut, p):
+    return urut[min(len(urut) - 1, int(len(urut) * p))]
+
+
+def ringkasan_profil():
+    """
+    Statistik per view dari jendela request terakhir, diurutkan dari p95 total
+    terlambat, masing-masing dengan SQL_TERBERAT query dengan total waktu terbesar.
+    """
+    with _kunci:
+        salinan = {view: (s.jumlah, list(s.sampel), dict(s.sql)) for view, s in _statistik.items()}
+    hasil = []
+    for view, (jumlah, sampel, sql) in salinan.items():
+        total = sorted(s[0] for s in sampel)
+        hasil.append({
+            'view': view,
+            'jumlah': jumlah,
+            'jendela': len(sampel),
+            'p50_ms': round(statistics.median(total), 1),
+            'p95_ms': round(_persentil(total, 0.95), 1),
+            'p99_ms': round(_persentil(total, 0.99), 1),
+            'maks_ms': round(total[-1], 1),
+            'sql_n': round(statistics.fmean(s[1] for s in sampel), 1),
+            'sql_ms': round(statistics.fmean(s[2] for s in sampel), 1),
+            'template_ms': round(statistics.fmean(s[3] for s in sampel), 1),
+            'sql_terberat': [
+                {
+                    'sql': teks, 'jumlah': n, 'total_ms': round(ms, 1),
+                    'rata_ms': round(ms / n, 2), 'maks_ms': round(maks, 1),
+                }
+                for teks, (n, ms, maks) in sorted(sql.items(), key=lambda kv: kv[1][1], reverse=True)[:SQL_TERBERAT]
+            ],
+        })
+    hasil.sort(key=lambda v: v['p95_ms'], reverse=True)
+    return hasil
+
+
+def kosongkan_profil():
+    with _kunci:
+        _statistik.clear()
+
+
+class ProfilMiddleware:
+    """Ukur request tersampel dan tambahkan header Server-Timing (lihat docstring modul)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mulai = time.perf_counter()
+        sampel = settings.PROFIL_SAMPEL
+        if not sampel or random.random() >= sampel:
+            response = self.get_response(request)
+            response['Server-Timing'] = f"total;dur={(time.perf_counter() - mulai) * 1000:.1f}"
+            return response
+
+        ukur = _Pengukuran()
+        token = _aktif.set(ukur)
+        try:
+            with connection.execute_wrapper(ukur.catat_sql):
+                response = self.get_response(request)
+        finally:
+            _aktif.reset(token)
+        total_ms = (time.perf_counter() - mulai) * 1000
+
+        match = request.resolver_match
+        _catat(match.view_name if match else '(tanpa view)', total_ms, ukur)
+        response['Server-Timing'] = (
+            f'sql;dur={ukur.sql_ms:.1f};desc="{ukur.sql_n} query", '
+            f'tpl;dur={ukur.template_ms:.1f};desc="template", '
+            f'total;dur={total_ms:.1f}'
+        )
+        return response
+
+
+# ================== WAKTU RENDER TEMPLATE ==================
+class _TemplateTerukur:
+    """Pembungkus template backend yang menambahkan waktu render ke request tersampel."""
+
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, nama):
+        return getattr(self.template, nama)
+
+    def render(self, context=None, request=None):
+        ukur = _aktif.get()
+        if ukur is None:
+            return self.template.render(context, request)
+        mulai = time.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            ukur.template_ms += (time.perf_counter() - mulai) * 1000
+
+
+class DjangoTemplatesTerukur(DjangoTemplates):
+    """DjangoTemplates yang waktu render-nya ikut tercatat di profil request."""
+
+    def from_string(self, template_code):
+        return _TemplateTerukur(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return _TemplateTerukur(super().get_template(template_name))
@@ -0,0 +1,193 @@
+"""
+Pemeliharaan tabel RingkasanSupervisi (agregat dashboard).
+
+Setiap supervisi menyumbang satu "kontribusi" ke baris ringkasan kelompoknya
+(ruang, tim, format, jenjang PK). Saat supervisi dibuat, diubah, atau dihapus,
+kontribusi lama dikurangkan dan kontribusi baru ditambahkan dengan UPDATE F().
+Jalur bulk menambahkan supervisi baru lewat `tambah_ringkasan` (satu UPDATE per
+kelompok) atau menghitung ulang kelompok dengan `bangun_ulang_ringkasan`.
+
+QuerySet.update(), bulk_update, dan SQL mentah tidak memicu signals. Kode yang
+mengubah kolom kelompok, skor_total, atau TTD dengan cara itu wajib memanggil
+`bangun_ulang_ringkasan(qs)` untuk supervisi yang diubah (seperti
+`scoring.hitung_ulang_skor`); perubahan manual di database diikuti
+`manage.py bangun_ulang_ringkasan`. Penyimpangan dapat dicek tanpa menulis
+apa pun dengan `periksa_ringkasan()` / `manage.py bangun_ulang_ringkasan --periksa`.
+"""
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+
+from .models import RingkasanSupervisi, Supervisi
+
+DIMENSI = ('ruang', 'tim', 'format_supervisi_id', 'jenjang_pk')
+
+_ADA_TTD_PERAWAT = Q(ttd_perawat__isnull=False) & ~Q(ttd_perawat='')
+_ADA_TTD_KEPALA = Q(ttd_kepala__isnull=False) & ~Q(ttd_kepala='')
+
+
+def kontribusi(s):
+    """Kembalikan (kunci_kelompok, nilai) sumbangan satu supervisi, dari instance atau dict."""
+    ambil = s.get if isinstance(s, dict) else lambda f: getattr(s, f)
+    ttd_perawat = bool(ambil('ttd_perawat'))
+    ttd_kepala = bool(ambil('ttd_kepala'))
+    kunci = (ambil('ruang'), int(ambil('tim')), ambil('format_supervisi_id'), ambil('jenjang_pk'))
+    nilai = {
+        'jumlah': 1,
+        'total_skor': float(ambil('skor_total') or 0),
+        'jumlah_ttd_perawat': int(ttd_perawat),
+        'jumlah_ttd_kepala': int(ttd_kepala),
+        'jumlah_lengkap': int(ttd_perawat and ttd_kepala),
+    }
+    return kunci, nilai
+
+
+def _terapkan(kunci, nilai, tanda):
+    filter_kunci = dict(zip(DIMENSI, kunci))
+    perubahan = {k: F(k) + tanda * v for k, v in nilai.items()}
+    if RingkasanSupervisi.objects.filter(**filter_kunci).update(**perubahan) or tanda < 0:
+        return
+    try:
+        with transaction.atomic():
+            RingkasanSupervisi.objects.create(**filter_kunci, **nilai)
+    except IntegrityError:
+        # baris kelompok baru saja dibuat proses lain
+        RingkasanSupervisi.objects.filter(**filter_kunci).update(**perubahan)
+
+
+def perbarui_ringkasan(lama, baru):
+    """
+    Terapkan perubahan satu supervisi ke ringkasan. `lama`/`baru` adalah hasil
+    `kontribusi()` atau None (untuk supervisi baru / terhapus).
+    """
+    if lama == baru:
+        return
+    if lama is not None:
+        _terapkan(*lama, tanda=-1)
+    if baru is not None:
+        _terapkan(*baru, tanda=1)
+
+
+def tambah_ringkasan(daftar_supervisi):
+    """
+    Tambahkan kontribusi banyak supervisi baru (mis. hasil bulk_create yang tidak
+    memicu signals) dengan satu UPDATE per kelompok, bukan satu per supervisi.
+    """
+    per_kelompok = {}
+    for s in daftar_supervisi:
+        kunci, nilai = kontribusi(s)
+        total = per_kelompok.setdefault(kunci, dict.fromkeys(nilai, 0))
+        for k, v in nilai.items():
+            total[k] += v
+    for kunci, nilai in per_kelompok.items():
+        _terapkan(kunci, nilai, 1)
+
+
+def bangun_ulang_ringkasan(qs=None):
+    """
+    Hitung ulang ringkasan dari tabel Supervisi dengan GROUP BY.
+    Jika `qs` diberikan, hanya kelompok yang memuat supervisi di `qs` yang dihitung ulang.
+    """
+    sumber = Supervisi.objects.all()
+    target = RingkasanSupervisi.objects.all()
+    if qs is not None:
+        kelompok = Q()
+        for kunci in qs.order_by().values_list(*DIMENSI).distinct():
+            kelompok |= Q(**dict(zip(DIMENSI, kunci)))
+        if not kelompok:
+            return 0
+        sumber = sumber.filter(kelompok)
+        target = target.filter(kelompok)
+
+    baris = _agregat(sumber)
+    with transaction.atomic():
+        target.delete()
+        RingkasanSupervisi.objects.bulk_create([RingkasanSupervisi(**b) for b in baris])
+    return len(baris)
+
+
+def _agregat(sumber):
+    return list(
+        sumber.order_by().values(*DIMENSI).annotate(
+            jumlah=Count('id'),
+            total_skor=Sum('skor_total'),
+            jumlah_ttd_perawat=Count('id', filter=_ADA_TTD_PERAWAT),
+            jumlah_ttd_kepala=Count('id', filter=_ADA_TTD_KEPALA),
+            jumlah_lengkap=Count('id', filter=_ADA_TTD_PERAWAT & _ADA_TTD_KEPALA),
+        )
+    )
+
+
+def periksa_ringkasan():
+    """
+    Bandingkan tabel ringkasan dengan hasil GROUP BY tabel Supervisi tanpa
+    menulis apa pun. Mengembalikan daftar (kunci_kelompok, tersimpan, seharusnya)
+    untuk setiap kelompok yang menyimpang; nilai berupa dict metrik atau None.
+    """
+    metrik = ('jumlah', 'total_skor', 'jumlah_ttd_perawat', 'jumlah_ttd_kepala', 'jumlah_lengkap')
+
+    def per_kelompok(daftar):
+        return {
+            tuple(b[d] for d in DIMENSI): {m: b[m] for m in metrik}
+            for b in daftar if b['jumlah']
+        }
+
+    tersimpan = per_kelompok(RingkasanSupervisi.objects.values(*DIMENSI, *metrik))
+    seharusnya = per_kelompok(_agregat(Supervisi.objects.all()))
+    selisih = []
+    for kunci in sorted(tersimpan.keys() | seharusnya.keys(), key=str):
+        a, b = tersimpan.get(kunci), seharusnya.get(kunci)
+        sama = a is not None and b is not None and all(
+            abs(a[m] - b[m]) < 1e-6 if m == 'total_skor' else a[m] == b[m] for m in metrik
+        )
+        if not sama:
+            selisih.append((kunci, a, b))
+    return selisih
+
+
+# ================== BACA (DASHBOARD) ==================
+def _metrik(jumlah, total_skor, lengkap, ttd_kepala):
+    return {
+        'jumlah': jumlah,
+        'rata_skor': round(total_skor / jumlah, 1) if jumlah else 0,
+        'persen_lengkap': round(lengkap / jumlah * 100, 1) if jumlah else 0,
+        'menunggu_ttd': jumlah - lengkap,
+        'menunggu_ttd_kepala': jumlah - ttd_kepala,
+    }
+
+
+def data_dashboard():
+    """
+    Baca seluruh tabel ringkasan (satu query) dan susun total serta rincian per
+    ruang, tim, format, dan jenjang PK.
+    """
+    rincian = {d: defaultdict(lambda: [0, 0.0, 0, 0]) for d in ('ruang', 'tim', 'format', 'jenjang_pk')}
+    total = [0, 0.0, 0, 0]
+    for r in RingkasanSupervisi.objects.filter(jumlah__gt=0).select_related('format_supervisi'):
+        nilai = (r.jumlah, r.total_skor, r.jumlah_lengkap, r.jumlah_ttd_kepala)
+        for dimensi, label in (
+            ('ruang', r.ruang),
+            ('tim', f"Tim {r.tim}"),
+            ('format', r.format_supervisi.nama),
+            ('jenjang_pk', r.jenjang_pk),
+        ):
+            akumulasi = rincian[dimensi][label]
+            for i, v in enumerate(nilai):
+                akumulasi[i] += v
+        for i, v in enumerate(nilai):
+            total[i] += v
+
+    kolom = {'ruang': "Ruang", 'tim': "Tim", 'format': "Format", 'jenjang_pk': "Jenjang PK"}
+    return {
+        'total': _metrik(*total),
+        'rincian': [
+            {
+                'dimensi': dimensi,
+                'judul': f"Per {kolom[dimensi]}",
+                'kolom': kolom[dimensi],
+                'baris': [dict(label=label, **_metrik(*nilai)) for label, nilai in sorted(baris.items())],
+            }
+            for dimensi, baris in rincian.items()
+        ],
+    }
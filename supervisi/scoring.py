@@ -0,0 +1,87 @@
+"""
+Mesin skor supervisi (satu-satunya tempat rumus skor).
+
+Skor = jumlah bobot aspek D / jumlah bobot aspek yang dinilai (D atau TD) x 100,
+dengan bobot diambil dari ItemFormat.bobot. Versi tanpa bobot menghitung setiap
+aspek bernilai 1 (sama dengan rumus lama bila semua bobot = 1).
+
+- `skor_dari_jawaban()` menghitung di memori, dipakai saat menyimpan jawaban baru;
+- `ekspresi_skor()` / `anotasi_skor()` menghitung dengan agregat SQL per supervisi;
+- `hitung_ulang_skor()` memperbarui skor_total banyak supervisi dengan UPDATE massal.
+"""
+from django.conf import settings
+from django.db.models import Case, F, FloatField, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Abs, Coalesce, Now, NullIf
+
+from .models import JawabanAspek, Supervisi
+from .ringkasan import bangun_ulang_ringkasan
+
+
+def _pakai_bobot(tertimbang):
+    return settings.SKOR_TERTIMBANG if tertimbang is None else tertimbang
+
+
+def skor_dari_jawaban(jawaban, tertimbang=None):
+    """Hitung skor dari iterable (bobot, d, td) tanpa menyentuh database."""
+    tertimbang = _pakai_bobot(tertimbang)
+    total_d = 0
+    total_dinilai = 0
+    for bobot, d, td in jawaban:
+        nilai = bobot if tertimbang else 1
+        if d or td:
+            total_dinilai += nilai
+            if d:
+                total_d += nilai
+    return (total_d / total_dinilai) * 100 if total_dinilai > 0 else 0
+
+
+def ekspresi_skor(tertimbang=None, supervisi_ref='pk'):
+    """
+    Ekspresi SQL skor untuk supervisi pada OuterRef(`supervisi_ref`): satu
+    subquery agregat atas JawabanAspek join ItemFormat.
+    """
+    nilai = F('aspek__item_format__bobot') if _pakai_bobot(tertimbang) else Value(1.0)
+
+    def jumlah(kondisi):
+        return Sum(Case(When(kondisi, then=nilai), default=Value(0.0), output_field=FloatField()))
+
+    skor = (
+        JawabanAspek.objects
+        .filter(supervisi=OuterRef(supervisi_ref))
+        .order_by().values('supervisi')
+        .annotate(skor=jumlah(Q(d=True)) * Value(100.0) / NullIf(jumlah(Q(d=True) | Q(td=True)), Value(0.0)))
+        .values('skor')
+    )
+    return Coalesce(Subquery(skor, output_field=FloatField()), Value(0.0))
+
+
+def anotasi_skor(qs):
+    """Tambahkan `skor_tertimbang` dan `skor_biasa` hasil hitung SQL ke queryset Supervisi."""
+    return qs.annotate(
+        skor_tertimbang=ekspresi_skor(tertimbang=True),
+        skor_biasa=ekspresi_skor(tertimbang=False),
+    )
+
+
+def hitung_ulang_skor(qs=None, tertimbang=None, ukuran_batch=2000):
+    """
+    Hitung ulang skor_total supervisi di `qs` (default: semua) per batch id.
+    Setiap batch adalah satu UPDATE dengan subquery agregat, dan hanya baris
+    yang skornya berubah yang ditulis. Ringkasan dashboard ikut dibangun ulang
+    untuk kelompok yang terdampak. Mengembalikan jumlah baris yang berubah.
+    """
+    qs = Supervisi.objects.all() if qs is None else qs
+    ids = list(qs.order_by('id').values_list('id', flat=True))
+    skor = ekspresi_skor(tertimbang)
+    berubah = 0
+    for i in range(0, len(ids), ukuran_batch):
+        berubah += (
+            Supervisi.objects
+            .filter(id__in=ids[i:i + ukuran_batch])
+            .annotate(selisih=Abs(F('skor_total') - skor))
+            .filter(selisih__gt=1e-9)
+            .update(skor_total=skor, diubah=Now())
+        )
+    if berubah:
+        bangun_ulang_ringkasan(qs)
+    return berubah
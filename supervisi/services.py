@@ -0,0 +1,202 @@
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .analitik import tandai_jawaban_berubah
+from .impor_supervisi import PemeriksaSupervisi, kolom_dari_objek, tulis_batch
+from .models import JawabanAspek, Supervisi
+from .scoring import skor_dari_jawaban
+from .struktur import struktur_format
+
+MAKS_KUNCI_IDEMPOTEN = Supervisi._meta.get_field('kunci_idempoten').max_length
+
+
+def baca_jawaban_post(post, aspek_ids):
+    """
+    Ambil pasangan (d, td) untuk setiap aspek dari data POST form isi supervisi
+    (checkbox `d_<id>` / `td_<id>`).
+    """
+    return {
+        aspek_id: (post.get(f"d_{aspek_id}") == "on", post.get(f"td_{aspek_id}") == "on")
+        for aspek_id in aspek_ids
+    }
+
+
+def buat_supervisi(format_supervisi, jawaban, bobot, **data):
+    """
+    Simpan satu supervisi beserta seluruh jawaban aspeknya secara atomik.
+
+    `jawaban` adalah dict {aspek_id: (d, td)} dan `bobot` dict {aspek_id: bobot}
+    (lihat `aspek_format`). Skor dihitung di memori sehingga baris Supervisi
+    cukup di-INSERT sekali, lalu semua JawabanAspek ditulis dengan satu bulk_create
+    dan versi cache analitik dinaikkan. Unggahan TTD di `data` divalidasi dan
+    diolah (`Supervisi.clean()`) sebelum transaksi; file yang bukan gambar
+    menggagalkan penyimpanan dengan ValidationError.
+    """
+    supervisi = Supervisi(
+        format_supervisi=format_supervisi,
+        skor_total=skor_dari_jawaban((bobot[a], d, td) for a, (d, td) in jawaban.items()),
+        **data
+    )
+    supervisi.clean()
+    with transaction.atomic():
+        supervisi.save(force_insert=True)
+        JawabanAspek.objects.bulk_create([
+            JawabanAspek(supervisi=supervisi, aspek_id=aspek_id, d=d, td=td)
+            for aspek_id, (d, td) in jawaban.items()
+        ])
+        tandai_jawaban_berubah()
+    return supervisi
+
+
+def ubah_jawaban(supervisi, jawaban, bobot):
+    """
+    Simpan koreksi jawaban supervisi yang sudah ada secara atomik.
+
+    `jawaban` dan `bobot` seperti pada `buat_supervisi`. Jawaban dibandingkan
+    dengan yang tersimpan dan hanya aspek yang berubah yang ditulis, sekaligus
+    dalam satu upsert (ON CONFLICT pada constraint unik supervisi+aspek, jadi aspek
+    yang belum punya baris ikut dibuat). Skor dihitung ulang di memori dan disimpan
+    di transaksi yang sama; ringkasan dashboard diperbarui lewat signals.
+    Mengembalikan jumlah aspek yang berubah.
+    """
+    with transaction.atomic():
+        lama = jawaban_supervisi([supervisi.id])[supervisi.id]
+        berubah = [
+            JawabanAspek(supervisi=supervisi, aspek_id=aspek_id, d=d, td=td)
+            for aspek_id, (d, td) in jawaban.items()
+            if lama.get(aspek_id, (False, False)) != (d, td)
+        ]
+        if not berubah:
+            return 0
+        JawabanAspek.objects.bulk_create(
+            berubah, update_conflicts=True, unique_fields=['supervisi', 'aspek'], update_fields=['d', 'td'],
+        )
+        supervisi.skor_total = skor_dari_jawaban((bobot[a], d, td) for a, (d, td) in jawaban.items())
+        supervisi.save(update_fields=['skor_total', 'diubah'])
+        tandai_jawaban_berubah()
+    return len(berubah)
+
+
+def _kolom_kiriman(user, item):
+    """Kolom baris kiriman tablet; perawat selalu user yang login."""
+    kolom, jawaban = kolom_dari_objek(item)
+    kolom.update(perawat=user.username, kepala='')
+    kolom['format'] = str(item.get('format_id') or kolom['format'])
+    kolom['tanggal'] = kolom['tanggal'] or timezone.localdate().isoformat()
+    kolom['ruang'] = kolom['ruang'] or Supervisi._meta.get_field('ruang').default
+    kolom['perawat_nama'] = kolom['perawat_nama'] or user.get_full_name().strip() or user.username
+    return kolom, jawaban
+
+
+def simpan_kiriman(user, daftar):
+    """
+    Simpan sekumpulan supervisi kiriman tablet (mode offline) milik `user`.
+
+    Setiap item membawa `kunci` idempoten buatan tablet. Kunci yang sudah
+    tersimpan tidak ditulis ulang (cukup satu query), jadi kiriman ulang aman
+    dan murah. Item baru divalidasi seperti impor JSON (lihat impor_supervisi.py)
+    lalu ditulis dalam satu transaksi: bulk_create Supervisi, executemany
+    jawaban, ringkasan per kelompok, dan versi cache analitik.
+
+    Mengembalikan satu dict per item, urut seperti `daftar`, dengan `status`
+    'dibuat', 'sudah_ada', atau 'gagal'.
+    """
+    hasil = [None] * len(daftar)
+    posisi = {}
+    for i, item in enumerate(daftar):
+        kunci = str(item.get('kunci') or '').strip() if isinstance(item, dict) else ''
+        if not kunci or len(kunci) > MAKS_KUNCI_IDEMPOTEN:
+            hasil[i] = {
+                'kunci': kunci or None, 'status': 'gagal',
+                'pesan': f"kunci idempoten wajib diisi (maks. {MAKS_KUNCI_IDEMPOTEN} karakter)",
+            }
+            continue
+        posisi.setdefault(kunci, []).append(i)
+
+    def catat(kunci, status, supervisi_id=None, skor=None, pesan=None):
+        for urutan, i in enumerate(posisi.pop(kunci)):
+            if status == 'gagal':
+                hasil[i] = {'kunci': kunci, 'status': status, 'pesan': pesan}
+            else:
+                # kunci ganda dalam satu kiriman: item pertama yang dibuat, sisanya sudah ada
+                hasil[i] = {
+                    'kunci': kunci, 'status': status if urutan == 0 else 'sudah_ada',
+                    'id': supervisi_id, 'skor_total': skor,
+                }
+
+    pemeriksa = None
+    for percobaan in range(2):
+        for kunci, supervisi_id, skor in (
+            Supervisi.objects.filter(perawat=user, kunci_idempoten__in=list(posisi))
+            .values_list('kunci_idempoten', 'id', 'skor_total')
+        ):
+            catat(kunci, 'sudah_ada', supervisi_id, skor)
+        if not posisi:
+            break
+
+        pemeriksa = pemeriksa or PemeriksaSupervisi(user={user.username: user.id})
+        batch = []
+        for kunci in list(posisi):
+            try:
+                supervisi, jawaban = pemeriksa.periksa(*_kolom_kiriman(user, daftar[posisi[kunci][0]]))
+            except ValueError as e:
+                catat(kunci, 'gagal', pesan=str(e))
+                continue
+            supervisi.kunci_idempoten = kunci
+            batch.append((supervisi, jawaban))
+        if not batch:
+            break
+
+        try:
+            tersimpan, _ = tulis_batch(batch)
+        except IntegrityError:
+            # kiriman yang sama sedang disimpan permintaan lain; ulangi sekali,
+            # kunci yang kini sudah tersimpan akan terbaca sebagai 'sudah_ada'
+            if percobaan:
+                raise
+            continue
+        for s in tersimpan:
+            catat(s.kunci_idempoten, 'dibuat', s.id, s.skor_total)
+        break
+    return hasil
+
+
+def aspek_format(format_supervisi):
+    """
+    Dict {aspek_id: bobot item} sebuah format, urut seperti tampilan form
+    (dibaca dari cache struktur format).
+    """
+    return struktur_format(format_supervisi).bobot_aspek()
+
+
+def jawaban_supervisi(supervisi_ids):
+    """
+    Matriks jawaban {supervisi_id: {aspek_id: (d, td)}} dalam satu query
+    (satu baris per aspek dijamin constraint `jawaban_aspek_unik`).
+    """
+    jawaban = defaultdict(dict)
+    for supervisi_id, aspek_id, d, td in (
+        JawabanAspek.objects
+        .filter(supervisi_id__in=supervisi_ids)
+        .values_list('supervisi_id', 'aspek_id', 'd', 'td')
+    ):
+        jawaban[supervisi_id][aspek_id] = (d, td)
+    return jawaban
+
+
+def grid_jawaban(struktur, jawaban):
+    """
+    Susun tabel hasil supervisi: satu entri per item berisi baris aspek beserta
+    jawaban D/TD-nya. `jawaban` adalah dict {aspek_id: (d, td)}; aspek yang tidak
+    punya jawaban tampil kosong.
+    """
+    grid = []
+    for item in struktur.items:
+        baris = []
+        for aspek in item.aspek:
+            d, td = jawaban.get(aspek.id, (False, False))
+            baris.append({'id': aspek.id, 'nama_aspek': aspek.nama_aspek, 'd': d, 'td': td})
+        grid.append({'pertanyaan': item.pertanyaan, 'aspek': baris})
+    return grid
@@ -0,0 +1,136 @@
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from .analitik import tandai_jawaban_berubah
+from .models import AspekFormat, FormatSupervisi, ItemFormat, Supervisi
+from .pdf import hapus_cache_pdf
+from .ringkasan import DIMENSI, kontribusi, perbarui_ringkasan
+from .ttd import olah_ttd_baru, simpan_thumbnail
+
+
+@receiver(post_delete, sender=Supervisi)
+def hapus_cache_pdf_supervisi(sender, instance, **kwargs):
+    """Buang PDF yang sudah di-cache ketika supervisi dihapus (termasuk cascade)."""
+    hapus_cache_pdf(instance.id)
+
+
+# ================== TANDA TANGAN ==================
+@receiver(pre_save, sender=Supervisi)
+def konversi_ttd_baru(sender, instance, **kwargs):
+    """
+    Ganti unggahan TTD baru dengan PNG hasil olahan. Validasinya ada di
+    `Supervisi.clean()`; unggahan yang sudah diolah di sana tidak diolah ulang.
+    """
+    olah_ttd_baru(instance)
+
+
+@receiver(post_save, sender=Supervisi)
+def simpan_thumbnail_ttd(sender, instance, **kwargs):
+    for field, (_, data) in getattr(instance, '_ttd_baru', {}).items():
+        simpan_thumbnail(getattr(instance, field), data)
+    instance._ttd_baru = {}
+
+
+# ================== RINGKASAN DASHBOARD ==================
+@receiver(pre_save, sender=Supervisi)
+def ingat_kontribusi_lama(sender, instance, **kwargs):
+    instance._kontribusi_lama = None
+    if not instance._state.adding:
+        lama = (
+            Supervisi.objects.filter(pk=instance.pk)
+            .values(*DIMENSI, 'skor_total', 'ttd_perawat', 'ttd_kepala')
+            .first()
+        )
+        instance._kontribusi_lama = kontribusi(lama) if lama else None
+
+
+@receiver(post_save, sender=Supervisi)
+def perbarui_ringkasan_simpan(sender, instance, **kwargs):
+    perbarui_ringkasan(getattr(instance, '_kontribusi_lama', None), kontribusi(instance))
+
+
+@receiver(post_delete, sender=Supervisi)
+def perbarui_ringkasan_hapus(sender, instance, origin=None, **kwargs):
+    # ikut terhapus bersama formatnya: baris ringkasan format itu juga terhapus (cascade)
+    if isinstance(origin, FormatSupervisi):
+        return
+    perbarui_ringkasan(kontribusi(instance), None)
+
+
+# ================== JUMLAH ITEM/ASPEK FORMAT ==================
+# Saat format atau item dihapus, semua item/aspek di bawahnya ikut terhapus (cascade)
+# dan memicu post_delete satu per satu. Handler baris-baris itu dilewati; penghapusan
+# asalnya (`origin`) yang menghitung ulang jumlah dan menandai versi sekali saja.
+def _ikut_terhapus(instance, origin, *model_asal):
+    return origin is not instance and isinstance(origin, model_asal)
+
+
+@receiver(post_init, sender=ItemFormat)
+def ingat_format_item(sender, instance, **kwargs):
+    instance._format_awal_id = instance.format_supervisi_id
+
+
+@receiver(post_save, sender=ItemFormat)
+@receiver(post_delete, sender=ItemFormat)
+def hitung_ulang_jumlah_item(sender, instance, created=False, origin=None, **kwargs):
+    if _ikut_terhapus(instance, origin, FormatSupervisi):
+        return
+    format_awal_id = getattr(instance, '_format_awal_id', None)
+    if kwargs.get('signal') is post_save and not created and format_awal_id == instance.format_supervisi_id:
+        return
+    format_ids = {instance.format_supervisi_id, format_awal_id}
+    FormatSupervisi.hitung_ulang_jumlah(FormatSupervisi.objects.filter(id__in=format_ids - {None}))
+    instance._format_awal_id = instance.format_supervisi_id
+
+
+@receiver(post_save, sender=AspekFormat)
+@receiver(post_delete, sender=AspekFormat)
+def hitung_ulang_jumlah_aspek(sender, instance, created=False, origin=None, **kwargs):
+    # perubahan nama/centang aspek tidak mengubah jumlah
+    if kwargs.get('signal') is post_save and not created:
+        return
+    if _ikut_terhapus(instance, origin, FormatSupervisi, ItemFormat):
+        return
+    FormatSupervisi.hitung_ulang_jumlah(FormatSupervisi.objects.filter(items__id=instance.item_format_id))
+
+
+# ================== VERSI FORMAT (CACHE FRAGMEN) ==================
+# Jumlah item/aspek di atas sudah menaikkan versi saat jumlahnya berubah; handler
+# di bawah menangkap perubahan isi (nama, pertanyaan, bobot, centang) sisanya.
+@receiver(post_save, sender=FormatSupervisi)
+def naikkan_versi_format(sender, instance, **kwargs):
+    FormatSupervisi.naikkan_versi(FormatSupervisi.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=ItemFormat)
+def naikkan_versi_item(sender, instance, created=False, **kwargs):
+    if not created:
+        FormatSupervisi.naikkan_versi(FormatSupervisi.objects.filter(pk=instance.format_supervisi_id))
+
+
+@receiver(post_save, sender=AspekFormat)
+def naikkan_versi_aspek(sender, instance, created=False, **kwargs):
+    if not created:
+        FormatSupervisi.naikkan_versi(FormatSupervisi.objects.filter(items__id=instance.item_format_id))
+
+
+# ================== CACHE ANALITIK ASPEK ==================
+@receiver(post_save, sender=Supervisi)
+def jawaban_berubah_simpan(sender, instance, created=False, **kwargs):
+    # jawaban supervisi baru ditandai oleh services.buat_supervisi setelah bulk_create;
+    # di sini cukup perubahan kolom yang dipakai filter/pengelompokan analitik
+    lama = getattr(instance, '_kontribusi_lama', None)
+    if not created and (lama is None or lama[0] != kontribusi(instance)[0]):
+        tandai_jawaban_berubah()
+
+
+@receiver(post_delete, sender=FormatSupervisi)
+@receiver(post_delete, sender=Supervisi)
+@receiver(post_save, sender=ItemFormat)
+@receiver(post_delete, sender=ItemFormat)
+@receiver(post_save, sender=AspekFormat)
+@receiver(post_delete, sender=AspekFormat)
+def jawaban_berubah(sender, instance, origin=None, **kwargs):
+    if _ikut_terhapus(instance, origin, FormatSupervisi, ItemFormat):
+        return
+    tandai_jawaban_berubah()
@@ -0,0 +1,198 @@
+"""
+Pembangkit data sintetis untuk uji skala dan benchmark beban.
+
+Membuat akun perawat dan kepala ruangan (dengan grup yang sama seperti halaman
+Kelola Akun), format N item x M aspek, tanda tangan coretan untuk setiap kepala
+ruangan, lalu riwayat supervisi bertahun-tahun beserta jawaban setiap aspek. Semua ditulis massal: akun dan keanggotaan grup
+dengan bulk_create, supervisi dan jawaban lewat `tulis_batch` impor (bulk_create +
+executemany, ringkasan dashboard ikut diperbarui per batch). Setiap supervisi
+dibuat oleh `supervisi_acak`, yang juga dipakai `buat_supervisi_massal` untuk
+data benchmark dan uji.
+"""
+import datetime
+import random
+from io import BytesIO
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group, User
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from PIL import Image, ImageDraw
+
+from .impor_supervisi import tulis_batch
+from .models import AspekFormat, FormatSupervisi, ItemFormat, Supervisi
+from .scoring import skor_dari_jawaban
+from .storage import lokasi_ttd, penyimpanan_ttd
+from .struktur import struktur_format
+from .ttd import nama_konten, nama_thumbnail, normalisasi, thumbnail
+
+RUANG = ('Imdad Hamid Lantai 2', 'Imdad Hamid Lantai 3', 'ICU', 'IGD', 'Bougenville', 'Anggrek')
+JENJANG = [kode for kode, _ in Supervisi.JENJANG_CHOICES]
+
+
+def buat_akun_massal(awalan, jumlah, staff=False, password='rahasia123'):
+    """
+    Buat `jumlah` akun bernama `<awalan><n>` beserta grupnya dengan dua bulk_create.
+    Password di-hash sekali untuk semua akun. Penomoran melanjutkan nomor terbesar
+    akun `<awalan><angka>` yang sudah ada (bukan jumlahnya, yang bisa berlubang
+    karena akun dihapus), jadi perintah aman dijalankan berulang.
+    """
+    mulai = max((
+        int(nomor) for nomor in (
+            username[len(awalan):]
+            for username in User.objects.filter(username__startswith=awalan).values_list('username', flat=True)
+        ) if nomor.isdigit()
+    ), default=0)
+    sandi = make_password(password)
+    users = User.objects.bulk_create([
+        User(username=f"{awalan}{mulai + i + 1}", password=sandi, is_staff=staff)
+        for i in range(jumlah)
+    ])
+    group, _ = Group.objects.get_or_create(name="Kepala Ruangan" if staff else "Perawat")
+    User.groups.through.objects.bulk_create([User.groups.through(user_id=u.id, group_id=group.id) for u in users])
+    return users
+
+
+def buat_format_contoh(jumlah_item, aspek_per_item, nama=None):
+    """Buat satu FormatSupervisi berisi jumlah_item x aspek_per_item aspek."""
+    format_supervisi = FormatSupervisi.objects.create(
+        nama=nama or f"Format {jumlah_item}x{aspek_per_item}"
+    )
+    items = ItemFormat.objects.bulk_create([
+        ItemFormat(format_supervisi=format_supervisi, pertanyaan=f"Prosedur {i + 1}")
+        for i in range(jumlah_item)
+    ])
+    AspekFormat.objects.bulk_create([
+        AspekFormat(item_format=item, nama_aspek=f"Aspek {i + 1}.{j + 1}")
+        for i, item in enumerate(items)
+        for j in range(aspek_per_item)
+    ])
+    FormatSupervisi.hitung_ulang_jumlah(FormatSupervisi.objects.filter(id=format_supervisi.id))
+    format_supervisi.refresh_from_db()
+    return format_supervisi
+
+
+def buat_ttd_sintetis(rng):
+    """
+    Simpan satu tanda tangan coretan acak (PNG olahan dan thumbnail-nya, seperti
+    unggahan lewat form) di penyimpanan TTD dan kembalikan namanya.
+    """
+    img = Image.new('L', (600, 200), 255)
+    ImageDraw.Draw(img).line([(x, rng.randint(40, 160)) for x in range(40, 561, 40)], fill=0, width=5)
+    berkas = BytesIO()
+    img.save(berkas, 'PNG')
+    data = normalisasi(berkas)
+    nama = penyimpanan_ttd.save(lokasi_ttd(None, nama_konten(data)), ContentFile(data))
+    penyimpanan_ttd.save(nama_thumbnail(nama), ContentFile(thumbnail(data)))
+    return nama
+
+
+def _jawaban_acak(rng, aspek_ids, kepatuhan):
+    """(aspek_id, d, td) untuk setiap aspek: D sesuai peluang `kepatuhan`, sesekali tidak dijawab."""
+    baris = []
+    for aspek_id in aspek_ids:
+        acak = rng.random()
+        if acak < 0.05:
+            baris.append((aspek_id, False, False))
+        else:
+            d = acak < 0.05 + 0.95 * kepatuhan
+            baris.append((aspek_id, d, not d))
+    return baris
+
+
+def supervisi_acak(rng, format_supervisi, bobot, perawat, kepatuhan, tanggal, kepala_ruangan=None,
+                   ttd_kepala=None):
+    """
+    Satu pasangan (Supervisi belum tersimpan, jawaban) untuk `tulis_batch`: jawaban
+    acak sesuai `kepatuhan` perawat, skor dihitung dari `bobot` {aspek_id: bobot},
+    tim/jenjang/ruang dipilih dari pilihan yang valid. `ttd_kepala` adalah nama
+    file TTD yang sudah tersimpan (lihat `buat_ttd_sintetis`).
+    """
+    jawaban = _jawaban_acak(rng, bobot, kepatuhan)
+    return Supervisi(
+        format_supervisi=format_supervisi, perawat=perawat, perawat_nama=perawat.username,
+        kepala_ruangan=kepala_ruangan, kepala_nama=kepala_ruangan.username if kepala_ruangan else None,
+        ttd_kepala=ttd_kepala,
+        tanggal=tanggal, tim=rng.randint(1, 4), jenjang_pk=rng.choice(JENJANG), ruang=rng.choice(RUANG),
+        skor_total=skor_dari_jawaban((bobot[a], d, td) for a, d, td in jawaban),
+    ), jawaban
+
+
+def buat_supervisi_massal(format_supervisi, perawat, jumlah, ukuran_batch=500, seed=0):
+    """
+    Isi `jumlah` supervisi hari ini milik `perawat` beserta jawaban setiap aspek
+    format, ditulis per batch lewat `tulis_batch`. Untuk data benchmark dan uji.
+    Mengembalikan jumlah jawaban yang ditulis.
+    """
+    rng = random.Random(seed)
+    # bobot dibaca langsung (bukan dari cache struktur) supaya selalu sesuai isi database
+    bobot = dict(
+        AspekFormat.objects.filter(item_format__format_supervisi=format_supervisi)
+        .order_by('item_format_id', 'id').values_list('id', 'item_format__bobot')
+    )
+    hari_ini = timezone.localdate()
+    total = 0
+    for mulai in range(0, jumlah, ukuran_batch):
+        _, n = tulis_batch([
+            supervisi_acak(rng, format_supervisi, bobot, perawat, 0.8, hari_ini)
+            for _ in range(mulai, min(mulai + ukuran_batch, jumlah))
+        ])
+        total += n
+    return total
+
+
+def buat_data_sintetis(jumlah_perawat=50, jumlah_kepala=5, jumlah_format=3, item=10, aspek=5, tahun=3, per_hari=20,
+                       ukuran_batch=1000, seed=0, lapor_progres=None):
+    """
+    Isi database dengan data sintetis. Setiap hari selama `tahun` tahun terakhir
+    mendapat rata-rata `per_hari` supervisi oleh perawat acak (masing-masing dengan
+    tingkat kepatuhan sendiri); sekitar 80% sudah ditandatangani kepala ruangan
+    (berisi kepala dan file TTD-nya), sisanya belum.
+    `seed` membuat data dapat diulang persis. `lapor_progres(supervisi, jawaban)`
+    dipanggil setelah setiap batch. Mengembalikan dict jumlah data yang dibuat.
+    """
+    rng = random.Random(seed)
+    daftar_perawat = buat_akun_massal('sintetis_perawat_', jumlah_perawat)
+    daftar_kepala = buat_akun_massal('sintetis_kepala_', jumlah_kepala, staff=True)
+    daftar_format = []
+    for i in range(jumlah_format):
+        format_supervisi = buat_format_contoh(item, aspek, nama=f"Format Sintetis {i + 1} ({item}x{aspek})")
+        daftar_format.append((format_supervisi, struktur_format(format_supervisi).bobot_aspek()))
+    kepatuhan = {p.id: rng.uniform(0.6, 0.98) for p in daftar_perawat}
+    ttd_kepala = {k.id: buat_ttd_sintetis(rng) for k in daftar_kepala}
+
+    jumlah_supervisi = jumlah_jawaban = 0
+    batch = []
+
+    def tulis():
+        nonlocal jumlah_supervisi, jumlah_jawaban, batch
+        tersimpan, jawaban = tulis_batch(batch)
+        jumlah_supervisi += len(tersimpan)
+        jumlah_jawaban += jawaban
+        batch = []
+        if lapor_progres:
+            lapor_progres(jumlah_supervisi, jumlah_jawaban)
+
+    hari_ini = timezone.localdate()
+    for hari in range(365 * tahun, -1, -1):
+        tanggal = hari_ini - datetime.timedelta(days=hari)
+        for _ in range(rng.randint(0, 2 * per_hari)):
+            p = rng.choice(daftar_perawat)
+            format_supervisi, bobot = rng.choice(daftar_format)
+            kepala_ruangan = rng.choice(daftar_kepala) if daftar_kepala and rng.random() < 0.8 else None
+            batch.append(supervisi_acak(
+                rng, format_supervisi, bobot, p, kepatuhan[p.id], tanggal,
+                kepala_ruangan, ttd_kepala[kepala_ruangan.id] if kepala_ruangan else None,
+            ))
+            if len(batch) >= ukuran_batch:
+                tulis()
+    if batch:
+        tulis()
+    return {
+        'perawat': len(daftar_perawat),
+        'kepala': len(daftar_kepala),
+        'format': len(daftar_format),
+        'aspek_per_format': item * aspek,
+        'supervisi': jumlah_supervisi,
+        'jawaban': jumlah_jawaban,
+    }
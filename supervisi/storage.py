@@ -0,0 +1,41 @@
+"""
+Penyimpanan tanda tangan berbasis isi (content-addressed).
+
+Nama file TTD adalah hash SHA-256 isinya (diberikan oleh `ttd.olah_unggahan`),
+dan disimpan di subfolder bertingkat `ttd/ab/cd/<hash>.png` supaya satu folder
+tidak berisi puluhan ribu file. File dengan isi sama otomatis berbagi satu file
+fisik; karena itu file tidak dihapus saat supervisi dihapus, melainkan lewat
+`manage.py bersihkan_ttd`. Penyimpanan ulang file yang sudah ada memperbarui mtime-nya,
+sehingga GC (yang melewati file muda) tidak menghapus file yang baru dirujuk lagi.
+"""
+import os
+
+from django.core.files.storage import FileSystemStorage
+
+
+class PenyimpananKonten(FileSystemStorage):
+    """FileSystemStorage yang tidak menulis ulang file bila nama (hash) sudah ada."""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('allow_overwrite', True)
+        super().__init__(**kwargs)
+
+    def _save(self, name, content):
+        try:
+            os.utime(self.path(name))
+        except FileNotFoundError:
+            return super()._save(name, content)
+        return name
+
+
+penyimpanan_ttd = PenyimpananKonten()
+
+
+def ambil_penyimpanan_ttd():
+    return penyimpanan_ttd
+
+
+def lokasi_ttd(instance, filename):
+    """upload_to TTD: `ttd/<2 huruf hash>/<2 huruf berikutnya>/<nama file>`."""
+    nama = os.path.basename(filename)
+    return os.path.join('ttd', nama[:2], nama[2:4], nama)
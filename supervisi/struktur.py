@@ -0,0 +1,141 @@
+"""
+Cache struktur format (FormatSupervisi -> ItemFormat -> AspekFormat) di memori proses.
+
+Struktur disimpan sebagai dataclass beku (tidak bisa diubah) dalam cache LRU per
+proses. Setiap kali dibaca, salinan di cache dicocokkan dengan FormatSupervisi.versi
+di database (dinaikkan signals pada setiap perubahan format/item/aspek), sehingga
+perubahan yang dibuat di satu worker langsung berlaku di worker lain.
+"""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from django.conf import settings
+
+from .models import AspekFormat, FormatSupervisi, ItemFormat
+
+
+@dataclass(frozen=True, slots=True)
+class StrukturAspek:
+    id: int
+    nama_aspek: str
+    d: bool
+    td: bool
+
+
+@dataclass(frozen=True, slots=True)
+class StrukturItem:
+    id: int
+    pertanyaan: str
+    bobot: float
+    aspek: tuple
+
+
+@dataclass(frozen=True, slots=True)
+class StrukturFormat:
+    id: int
+    versi: int
+    nama: str
+    items: tuple
+
+    def bobot_aspek(self):
+        """Dict {aspek_id: bobot item}, urut seperti tampilan form."""
+        return {aspek.id: item.bobot for item in self.items for aspek in item.aspek}
+
+
+class _CacheLRU:
+    def __init__(self, ukuran):
+        self.ukuran = ukuran
+        self._data = OrderedDict()
+        self._kunci = threading.Lock()
+
+    def ambil(self, format_id, versi):
+        with self._kunci:
+            struktur = self._data.get(format_id)
+            if struktur is None or struktur.versi != versi:
+                return None
+            self._data.move_to_end(format_id)
+            return struktur
+
+    def simpan(self, struktur):
+        with self._kunci:
+            self._data[struktur.id] = struktur
+            self._data.move_to_end(struktur.id)
+            while len(self._data) > self.ukuran:
+                self._data.popitem(last=False)
+
+    def kosongkan(self):
+        with self._kunci:
+            self._data.clear()
+
+
+_cache = _CacheLRU(settings.STRUKTUR_FORMAT_CACHE)
+
+
+def _muat(format_info):
+    """Bangun struktur untuk {format_id: (versi, nama)} dengan dua query (item dan aspek)."""
+    aspek_item = {}
+    for aspek in (
+        AspekFormat.objects
+        .filter(item_format__format_supervisi_id__in=format_info)
+        .order_by('id')
+        .values_list('item_format_id', 'id', 'nama_aspek', 'd', 'td')
+    ):
+        aspek_item.setdefault(aspek[0], []).append(StrukturAspek(*aspek[1:]))
+
+    items_format = {format_id: [] for format_id in format_info}
+    for format_id, item_id, pertanyaan, bobot in (
+        ItemFormat.objects
+        .filter(format_supervisi_id__in=format_info)
+        .order_by('id')
+        .values_list('format_supervisi_id', 'id', 'pertanyaan', 'bobot')
+    ):
+        items_format[format_id].append(
+            StrukturItem(item_id, pertanyaan, bobot, tuple(aspek_item.get(item_id, ())))
+        )
+
+    return {
+        format_id: StrukturFormat(format_id, versi, nama, tuple(items_format[format_id]))
+        for format_id, (versi, nama) in format_info.items()
+    }
+
+
+def struktur_format_banyak(format_ids):
+    """
+    Kembalikan {format_id: StrukturFormat}. Versi semua format dicek dengan satu
+    query; yang belum ada atau sudah usang dimuat ulang sekaligus.
+    """
+    hasil = {}
+    perlu_muat = {}
+    for format_id, versi, nama in (
+        FormatSupervisi.objects.filter(id__in=set(format_ids)).values_list('id', 'versi', 'nama')
+    ):
+        struktur = _cache.ambil(format_id, versi)
+        if struktur is None:
+            perlu_muat[format_id] = (versi, nama)
+        else:
+            hasil[format_id] = struktur
+    if perlu_muat:
+        for struktur in _muat(perlu_muat).values():
+            _cache.simpan(struktur)
+            hasil[struktur.id] = struktur
+    return hasil
+
+
+def struktur_format(format_supervisi):
+    """
+    Struktur satu format. Bila diberi instance FormatSupervisi yang baru dibaca,
+    versinya dipakai langsung tanpa query tambahan.
+    """
+    if isinstance(format_supervisi, FormatSupervisi):
+        f = format_supervisi
+        struktur = _cache.ambil(f.id, f.versi)
+        if struktur is None:
+            struktur = _muat({f.id: (f.versi, f.nama)})[f.id]
+            _cache.simpan(struktur)
+        return struktur
+    return struktur_format_banyak([format_supervisi]).get(format_supervisi)
+
+
+def kosongkan_cache():
+    _cache.kosongkan()
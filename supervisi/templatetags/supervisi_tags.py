@@ -1,5 +1,7 @@
 from django import template
 
+from ..ttd import url_thumbnail
+
 register = template.Library()
 
 @register.filter
@@ -7,8 +9,9 @@ def sum_aspek(items):
     """
     Mengembalikan jumlah total aspek dari semua item.
     Misal: jumlah semua aspek dari semua item dalam format supervisi.
+    Memakai hasil prefetch `aspek` jika ada, jadi tidak ada COUNT per item.
     """
-    return sum(item.aspek.count() for item in items)
+    return sum(len(item.aspek.all()) for item in items)
 # supervis
 @register.filter(name='add_class')
 def add_class(field, css):
@@ -26,4 +29,10 @@ def avg_skor(supervisi_list):
     """Menghitung rata-rata skor supervisi"""
     if not supervisi_list:
         return 0
-    return round(sum(s.skor_total for s in supervisi_list) / len(supervisi_list), 2)
\ No newline at end of file
+    return round(sum(s.skor_total for s in supervisi_list) / len(supervisi_list), 2)
+
+
+@register.filter
+def ttd_thumb(fieldfile):
+    """URL thumbnail kecil tanda tangan (lihat ttd.py)."""
+    return url_thumbnail(fieldfile)
@@ -1,3 +1,1491 @@
-from django.test import TestCase
+import csv
+import datetime
+import io
+import json
+import os
+import tempfile
+import time
+import zipfile
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F, Sum
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+
+from . import impor_supervisi as impor_modul
+from . import pdf as pdf_modul
+from . import pool_pdf
+from . import struktur as struktur_modul
+from . import ttd as ttd_modul
+from . import urls
+from .analitik import VERSI_JAWABAN, analitik_aspek, tandai_jawaban_berubah
+from .benchmark import buat_user, ukur
+from .exports import baris_ekspor, csv_stream, zip_pdf_supervisi
+from .format_io import baca_berkas, baca_csv, baca_json, definisi_format, ekspor_csv, ekspor_json, impor_format
+from .forms import SupervisiFilterForm
+from .impor_supervisi import impor_supervisi, templat_csv
+from .management.commands.bersihkan_ttd import Command as BersihkanTtd
+from .models import AspekFormat, FormatSupervisi, ItemFormat, JawabanAspek, RingkasanSupervisi, Supervisi, Tugas, VersiData
+from .media import CACHE_BIASA, CACHE_KONTEN
+from .pagination import paginasi_keyset
+from .pdf import path_cache
+from .profil import kosongkan_profil, ringkasan_profil
+from .ringkasan import bangun_ulang_ringkasan, data_dashboard, periksa_ringkasan
+from .scoring import hitung_ulang_skor, skor_dari_jawaban
+from .services import buat_supervisi, jawaban_supervisi, ubah_jawaban
+from .sintetis import JENJANG, buat_akun_massal, buat_data_sintetis, buat_format_contoh, buat_supervisi_massal
+from .storage import penyimpanan_ttd
+from .struktur import kosongkan_cache, struktur_format
+from .ttd import nama_thumbnail
+
+# batas longgar supaya tidak rapuh di mesin CI yang lambat; regresi N+1 jauh melewatinya
+BATAS_LATENSI_MS = 500
+
+
+class FolderSementaraMixin:
+    """Berkas TTD dan cache PDF ditulis ke folder sementara per kelas uji."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.folder = tempfile.TemporaryDirectory()
+        cls.pengaturan = override_settings(
+            MEDIA_ROOT=cls.folder.name, PDF_CACHE_DIR=cls.folder.name, TUGAS_ANTRIAN_AKTIF=False,
+        )
+        cls.pengaturan.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.pengaturan.disable()
+        cls.folder.cleanup()
+
+
+class ApiTest(TestCase):
+    """API JSON baca-saja (api.py): isi, paginasi cursor, hak akses, jumlah query, latensi."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = buat_user('karu', staff=True)
+        cls.perawat = buat_user('ners1')
+        cls.perawat_lain = buat_user('ners2')
+        cls.format = buat_format_contoh(4, 5)
+        cls.format_lain = buat_format_contoh(2, 3)
+        buat_supervisi_massal(cls.format, cls.perawat, 60)
+        buat_supervisi_massal(cls.format_lain, cls.perawat_lain, 5)
+
+    def setUp(self):
+        # id format terulang antar test (rollback), jadi cache struktur per proses dikosongkan
+        kosongkan_cache()
+        self.client.force_login(self.admin)
+
+    def ambil(self, nama, *args, **params):
+        return self.client.get(reverse(nama, args=args), params)
+
+    def telusuri(self, url):
+        """Ikuti `berikutnya` sampai habis; kembalikan semua baris."""
+        hasil = []
+        while url:
+            data = self.client.get(url).json()
+            hasil.extend(data['hasil'])
+            url = data['berikutnya']
+        return hasil
+
+    # ---------- supervisi ----------
+    def test_anonim_dapat_401_json(self):
+        self.client.logout()
+        response = self.ambil('api_daftar_supervisi')
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('error', response.json())
+
+    def test_hanya_get(self):
+        response = self.client.post(reverse('api_daftar_supervisi'))
+        self.assertEqual(response.status_code, 405)
+
+    def test_field_terpilih(self):
+        data = self.ambil('api_daftar_supervisi', fields='id,skor_total', batas=3).json()
+        self.assertEqual(len(data['hasil']), 3)
+        for baris in data['hasil']:
+            self.assertEqual(set(baris), {'id', 'skor_total'})
+
+    def test_field_tidak_dikenal(self):
+        response = self.ambil('api_daftar_supervisi', fields='id,rahasia')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('ruang', response.json()['field_tersedia'])
+
+    def test_filter_tidak_valid(self):
+        response = self.ambil('api_daftar_supervisi', tanggal_dari='bukan-tanggal')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('tanggal_dari', response.json()['errors'])
+
+    def test_cursor_menelusuri_semua_tanpa_duplikat(self):
+        hasil = self.telusuri(reverse('api_daftar_supervisi') + '?fields=id&batas=7')
+        harapan = list(Supervisi.objects.order_by('-tanggal', '-id').values_list('id', flat=True))
+        self.assertEqual([b['id'] for b in hasil], harapan)
+
+    def test_cursor_sebelumnya(self):
+        pertama = self.ambil('api_daftar_supervisi', fields='id', batas=10).json()
+        kedua = self.client.get(pertama['berikutnya']).json()
+        kembali = self.client.get(kedua['sebelumnya']).json()
+        self.assertEqual(kembali['hasil'], pertama['hasil'])
+        self.assertIsNone(pertama['sebelumnya'])
+
+    def test_filter_diteruskan_ke_halaman_berikutnya(self):
+        url = reverse('api_daftar_supervisi') + f'?fields=id,format_id&batas=2&format_supervisi={self.format_lain.id}'
+        hasil = self.telusuri(url)
+        self.assertEqual(len(hasil), 5)
+        self.assertEqual({b['format_id'] for b in hasil}, {self.format_lain.id})
+
+    def test_jawaban_opsional(self):
+        tanpa = self.ambil('api_daftar_supervisi', batas=1).json()['hasil'][0]
+        self.assertNotIn('jawaban', tanpa)
+        dengan = self.ambil('api_daftar_supervisi', batas=1, jawaban=1).json()['hasil'][0]
+        harapan = [
+            {'aspek_id': a, 'd': d, 'td': td}
+            for a, d, td in JawabanAspek.objects.filter(supervisi_id=dengan['id'])
+            .order_by('aspek_id').values_list('aspek_id', 'd', 'td')
+        ]
+        self.assertEqual(dengan['jawaban'], harapan)
+
+    def test_perawat_hanya_melihat_miliknya(self):
+        self.client.force_login(self.perawat_lain)
+        hasil = self.telusuri(reverse('api_daftar_supervisi') + '?fields=id,perawat')
+        self.assertEqual(len(hasil), 5)
+        self.assertEqual({b['perawat'] for b in hasil}, {'ners2'})
+        milik_lain = Supervisi.objects.filter(perawat=self.perawat).first()
+        self.assertEqual(self.ambil('api_detail_supervisi', milik_lain.id).status_code, 404)
+
+    def test_detail(self):
+        s = Supervisi.objects.filter(perawat=self.perawat).first()
+        data = self.ambil('api_detail_supervisi', s.id, jawaban=1).json()
+        self.assertEqual(data['id'], s.id)
+        self.assertEqual(data['perawat'], 'ners1')
+        self.assertEqual(data['format_nama'], self.format.nama)
+        self.assertEqual(len(data['jawaban']), 20)
+
+    def test_query_tetap_berapa_pun_ukuran_halaman(self):
+        # session + user + halaman + jawaban
+        for batas in (5, 50, 200):
+            with self.subTest(batas=batas), self.assertNumQueries(4):
+                self.ambil('api_daftar_supervisi', batas=batas, jawaban=1)
+
+    def test_query_detail(self):
+        s = Supervisi.objects.first()
+        with self.assertNumQueries(4):
+            self.ambil('api_detail_supervisi', s.id, jawaban=1)
+
+    def test_latensi_halaman_penuh(self):
+        statistik = ukur(lambda: self.ambil('api_daftar_supervisi', batas=200, jawaban=1), 5)
+        self.assertLess(statistik['p95_ms'], BATAS_LATENSI_MS, statistik)
+
+    # ---------- format ----------
+    def test_format_daftar_dan_struktur(self):
+        data = self.ambil('api_daftar_format', struktur=1).json()
+        self.assertEqual([f['id'] for f in data['hasil']], [self.format.id, self.format_lain.id])
+        pertama = data['hasil'][0]
+        self.assertEqual(pertama['total_aspek'], 20)
+        self.assertEqual(len(pertama['items']), 4)
+        self.assertEqual(len(pertama['items'][0]['aspek']), 5)
+
+    def test_format_query_tetap(self):
+        # session + user + halaman + cek versi struktur (+ item & aspek bila cache kosong)
+        kosongkan_cache()
+        with self.assertNumQueries(6):
+            self.ambil('api_daftar_format', struktur=1)
+        with self.assertNumQueries(4):
+            self.ambil('api_daftar_format', struktur=1)
+        with self.assertNumQueries(3):
+            self.ambil('api_daftar_format')
+
+    def test_format_detail(self):
+        data = self.ambil('api_detail_format', self.format_lain.id, fields='nama').json()
+        self.assertEqual(data, {'nama': self.format_lain.nama})
+        self.assertEqual(self.ambil('api_detail_format', 999999).status_code, 404)
+
+    def test_format_latensi(self):
+        statistik = ukur(lambda: self.ambil('api_daftar_format', struktur=1), 5)
+        self.assertLess(statistik['p95_ms'], BATAS_LATENSI_MS, statistik)
+
+
+class StrukturCacheTest(TestCase):
+    """Cache struktur format per proses: LRU terbatas, dicocokkan dengan FormatSupervisi.versi di database."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.format = [buat_format_contoh(2, 2, nama=f"Format {i}") for i in range(3)]
+
+    def setUp(self):
+        kosongkan_cache()
+
+    def muat(self, format_supervisi, dimuat_ulang):
+        # cek versi (1 query), ditambah item dan aspek bila struktur dimuat ulang
+        with self.assertNumQueries(3 if dimuat_ulang else 1):
+            return struktur_format(format_supervisi.id)
+
+    def test_lru_membuang_format_terlama(self):
+        with mock.patch.object(struktur_modul, '_cache', struktur_modul._CacheLRU(2)):
+            pertama, kedua, ketiga = self.format
+            self.muat(pertama, True)
+            self.muat(kedua, True)
+            self.muat(pertama, False)  # pertama kini yang terakhir dipakai
+            self.muat(ketiga, True)  # cache penuh: kedua dibuang
+            self.assertEqual(list(struktur_modul._cache._data), [pertama.id, ketiga.id])
+            self.muat(pertama, False)
+            self.muat(kedua, True)
+            self.muat(ketiga, True)  # giliran ketiga yang terbuang oleh kedua
+
+    def test_perubahan_dari_proses_lain_memuat_ulang(self):
+        f = self.format[0]
+        lama = self.muat(f, True)
+        # worker lain mengubah aspek lalu menaikkan versi; cache proses ini tidak mendapat signal
+        aspek_id = lama.items[0].aspek[0].id
+        AspekFormat.objects.filter(id=aspek_id).update(nama_aspek='Aspek dari worker lain')
+        self.muat(f, False)  # versi belum naik: salinan lama masih dipakai
+        FormatSupervisi.objects.filter(id=f.id).update(versi=F('versi') + 1)
+        baru = self.muat(f, True)
+        self.assertEqual(baru.versi, lama.versi + 1)
+        self.assertEqual(baru.items[0].aspek[0].nama_aspek, 'Aspek dari worker lain')
+        self.assertNotEqual(lama.items[0].aspek[0].nama_aspek, 'Aspek dari worker lain')
+        self.assertIs(self.muat(f, False), baru)
+        # instance yang baru dibaca membawa versinya sendiri: tanpa query tambahan
+        instance = FormatSupervisi.objects.get(id=f.id)
+        with self.assertNumQueries(0):
+            self.assertIs(struktur_format(instance), baru)
+
+
+class KirimSupervisiTest(TestCase):
+    """Kiriman offline tablet (api/supervisi/kirim/): idempoten, per item, query tetap."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.perawat = buat_user('ners1')
+        cls.format = buat_format_contoh(3, 4)
+        cls.aspek = list(AspekFormat.objects.filter(item_format__format_supervisi=cls.format).values_list('id', flat=True))
+
+    def setUp(self):
+        kosongkan_cache()
+        self.client.force_login(self.perawat)
+
+    def item(self, kunci, **data):
+        item = {
+            'kunci': kunci, 'format_id': self.format.id, 'tanggal': '2024-05-01',
+            'tim': 2, 'jenjang_pk': 'PK II', 'ruang': 'ICU',
+            'jawaban': {str(a): ('D' if i % 4 else 'TD') for i, a in enumerate(self.aspek)},
+        }
+        item.update(data)
+        return item
+
+    def kirim(self, daftar, client=None):
+        return (client or self.client).post(
+            reverse('api_kirim_supervisi'), json.dumps({'supervisi': daftar}), content_type='application/json',
+        )
+
+    def test_simpan_batch(self):
+        data = self.kirim([self.item(f'k{i}') for i in range(3)]).json()
+        self.assertEqual((data['dibuat'], data['sudah_ada'], data['gagal']), (3, 0, 0))
+        s = Supervisi.objects.get(id=data['hasil'][0]['id'])
+        self.assertEqual(str(s.tanggal), '2024-05-01')
+        self.assertEqual(s.perawat, self.perawat)
+        self.assertEqual(s.jawaban_aspek.count(), len(self.aspek))
+        self.assertAlmostEqual(s.skor_total, 75.0)
+        self.assertEqual(s.hitung_skor(), data['hasil'][0]['skor_total'])
+        ringkasan = RingkasanSupervisi.objects.get(ruang='ICU', tim=2, format_supervisi=self.format)
+        self.assertEqual(ringkasan.jumlah, 3)
+
+    def test_kirim_ulang_tidak_menggandakan(self):
+        daftar = [self.item(f'k{i}') for i in range(5)]
+        pertama = self.kirim(daftar).json()
+        with self.assertNumQueries(3):  # session + user + cek kunci
+            kedua = self.kirim(daftar).json()
+        self.assertEqual(kedua['sudah_ada'], 5)
+        self.assertEqual([h['id'] for h in kedua['hasil']], [h['id'] for h in pertama['hasil']])
+        self.assertEqual(Supervisi.objects.count(), 5)
+        self.assertEqual(RingkasanSupervisi.objects.get().jumlah, 5)
+
+    def test_kunci_ganda_dalam_satu_kiriman(self):
+        data = self.kirim([self.item('sama'), self.item('sama')]).json()
+        self.assertEqual([h['status'] for h in data['hasil']], ['dibuat', 'sudah_ada'])
+        self.assertEqual(data['hasil'][0]['id'], data['hasil'][1]['id'])
+        self.assertEqual(Supervisi.objects.count(), 1)
+
+    def test_item_salah_tidak_menggagalkan_yang_lain(self):
+        data = self.kirim([
+            self.item('ok'),
+            self.item('aspek', jawaban={'999999': 'D'}),
+            self.item('tim', tim=9),
+            {'format_id': self.format.id},
+        ]).json()
+        self.assertEqual([h['status'] for h in data['hasil']], ['dibuat', 'gagal', 'gagal', 'gagal'])
+        self.assertEqual(Supervisi.objects.count(), 1)
+
+    def test_kunci_per_perawat(self):
+        self.kirim([self.item('k1')])
+        lain = Client()
+        lain.force_login(buat_user('ners2'))
+        data = self.kirim([self.item('k1')], client=lain).json()
+        self.assertEqual(data['dibuat'], 1)
+        self.assertEqual(Supervisi.objects.count(), 2)
+
+    def test_query_tetap_berapa_pun_ukuran_batch(self):
+        self.kirim([self.item('pemanasan')])
+        jumlah = []
+        for n in (2, 20):
+            with CaptureQueriesContext(connection) as ctx:
+                self.kirim([self.item(f'{n}-{i}') for i in range(n)])
+            jumlah.append(len(ctx))
+        self.assertEqual(jumlah[0], jumlah[1])
+
+    def test_body_tidak_valid(self):
+        response = self.client.post(reverse('api_kirim_supervisi'), 'bukan json', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.kirim([]).status_code, 400)
+        self.assertEqual(self.client.get(reverse('api_kirim_supervisi')).status_code, 405)
+
+    def test_perlu_login_dan_csrf(self):
+        self.client.logout()
+        self.assertEqual(self.kirim([self.item('k1')]).status_code, 401)
+        ketat = Client(enforce_csrf_checks=True)
+        ketat.force_login(self.perawat)
+        self.assertEqual(self.kirim([self.item('k1')], client=ketat).status_code, 403)
+
+
+class UbahJawabanTest(TestCase):
+    """Koreksi jawaban di halaman detail: hanya aspek berubah yang ditulis, skor ikut dihitung ulang."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = buat_user('karu', staff=True)
+        cls.perawat = buat_user('ners1')
+        cls.format = buat_format_contoh(2, 3)
+        kosongkan_cache()
+        cls.bobot = struktur_format(cls.format).bobot_aspek()
+        cls.aspek = list(cls.bobot)
+        cls.supervisi = buat_supervisi(
+            cls.format, {a: (True, False) for a in cls.aspek}, cls.bobot,
+            perawat=cls.perawat, ruang='ICU', tim=1, jenjang_pk='PK I',
+        )
+
+    def setUp(self):
+        kosongkan_cache()
+        self.client.force_login(self.admin)
+
+    def jawaban(self, **ubah):
+        jawaban = {a: (True, False) for a in self.aspek}
+        jawaban.update({self.aspek[int(i[1:])]: v for i, v in ubah.items()})
+        return jawaban
+
+    def test_hanya_aspek_berubah_ditulis(self):
+        id_lama = dict(JawabanAspek.objects.values_list('aspek_id', 'id'))
+        with CaptureQueriesContext(connection) as ctx:
+            jumlah = ubah_jawaban(self.supervisi, self.jawaban(a0=(False, True), a1=(False, False)), self.bobot)
+        self.assertEqual(jumlah, 2)
+        self.assertEqual(sum(sql['sql'].startswith('INSERT INTO "supervisi_jawabanaspek"') for sql in ctx), 1)
+        self.assertEqual(dict(JawabanAspek.objects.values_list('aspek_id', 'id')), id_lama)
+        self.assertEqual(
+            jawaban_supervisi([self.supervisi.id])[self.supervisi.id],
+            self.jawaban(a0=(False, True), a1=(False, False)),
+        )
+
+    def test_skor_dan_ringkasan_dihitung_ulang(self):
+        ubah_jawaban(self.supervisi, self.jawaban(a0=(False, True)), self.bobot)
+        self.supervisi.refresh_from_db()
+        self.assertAlmostEqual(self.supervisi.skor_total, 500 / 6)
+        self.assertAlmostEqual(self.supervisi.hitung_skor(), self.supervisi.skor_total)
+        self.assertAlmostEqual(RingkasanSupervisi.objects.get().total_skor, 500 / 6)
+
+    def test_tanpa_perubahan_tidak_menulis(self):
+        diubah = self.supervisi.diubah
+        self.assertEqual(ubah_jawaban(self.supervisi, self.jawaban(), self.bobot), 0)
+        self.supervisi.refresh_from_db()
+        self.assertEqual(self.supervisi.diubah, diubah)
+
+    def test_aspek_tanpa_baris_dibuat(self):
+        JawabanAspek.objects.filter(aspek_id=self.aspek[0]).delete()
+        self.assertEqual(ubah_jawaban(self.supervisi, self.jawaban(), self.bobot), 1)
+        self.assertEqual(JawabanAspek.objects.count(), len(self.aspek))
+
+    def test_jawaban_ganda_ditolak(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            JawabanAspek.objects.create(supervisi=self.supervisi, aspek_id=self.aspek[0], d=True)
+
+    def test_hanya_kepala_ruangan_boleh_mengubah(self):
+        url = reverse('detail_supervisi', args=[self.supervisi.id])
+        data = {f'td_{a}': 'on' for a in self.aspek}
+        data['simpan_jawaban'] = '1'
+        for user in (None, self.perawat):
+            with self.subTest(user=user):
+                self.client.logout()
+                if user:
+                    self.client.force_login(user)
+                self.assertEqual(self.client.get(url).status_code, 302)
+                response = self.client.post(url, data)
+                self.assertEqual(response.status_code, 302)
+                self.assertTrue(response['Location'].startswith(reverse('login')))
+        self.supervisi.refresh_from_db()
+        self.assertEqual(self.supervisi.skor_total, 100.0)
+        self.assertEqual(JawabanAspek.objects.filter(td=True).count(), 0)
+
+    def test_simpan_dari_halaman_detail(self):
+        data = {f'd_{a}': 'on' for a in self.aspek[1:]}
+        data.update({f'td_{self.aspek[0]}': 'on', 'simpan_jawaban': '1'})
+        response = self.client.post(reverse('detail_supervisi', args=[self.supervisi.id]), data)
+        self.assertRedirects(response, reverse('detail_supervisi', args=[self.supervisi.id]))
+        self.supervisi.refresh_from_db()
+        self.assertAlmostEqual(self.supervisi.skor_total, 500 / 6)
+
+
+class AnalitikCacheTest(TestCase):
+    """Cache analitik aspek: dipakai ulang selama VersiData 'jawaban' tetap, usang begitu jawaban berubah."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.perawat = buat_user('ners1')
+        cls.format = buat_format_contoh(1, 2)
+        kosongkan_cache()
+        cls.bobot = struktur_format(cls.format).bobot_aspek()
+        cls.aspek = list(cls.bobot)
+        cls.supervisi = buat_supervisi(
+            cls.format, {a: (True, False) for a in cls.aspek}, cls.bobot,
+            perawat=cls.perawat, ruang='ICU', tim=1, jenjang_pk='PK I',
+        )
+
+    def setUp(self):
+        cache.clear()
+        kosongkan_cache()
+
+    def analitik(self, **filter_data):
+        form = SupervisiFilterForm(filter_data)
+        self.assertTrue(form.is_valid())
+        return {b['aspek_id']: (b['jumlah_d'], b['jumlah_td']) for b in analitik_aspek(form)}
+
+    def test_hasil_di_cache_sampai_jawaban_berubah(self):
+        self.assertEqual(self.analitik(), {a: (1, 0) for a in self.aspek})
+        with self.assertNumQueries(1):  # hanya membaca VersiData
+            self.analitik()
+
+        ubah_jawaban(self.supervisi, {self.aspek[0]: (False, True), self.aspek[1]: (True, False)}, self.bobot)
+        self.assertEqual(self.analitik(), {self.aspek[0]: (0, 1), self.aspek[1]: (1, 0)})
+
+        # pindah ruang mengubah hasil filter per ruang
+        self.assertEqual(self.analitik(ruang='IGD'), {})
+        self.supervisi.ruang = 'IGD'
+        self.supervisi.save()
+        self.assertEqual(self.analitik(ruang='IGD'), {self.aspek[0]: (0, 1), self.aspek[1]: (1, 0)})
+
+        self.supervisi.delete()
+        self.assertEqual(self.analitik(), {})
+
+    def test_versi_naik_saat_struktur_format_berubah(self):
+        versi = VersiData.ambil(VERSI_JAWABAN)
+        AspekFormat.objects.filter(id=self.aspek[0]).get().save()
+        self.assertEqual(VersiData.ambil(VERSI_JAWABAN), versi + 1)
+        self.format.items.get().delete()
+        self.assertEqual(VersiData.ambil(VERSI_JAWABAN), versi + 2)
+
+
+class RingkasanSignalTest(TestCase):
+    """Tabel ringkasan dashboard dipelihara signals: setiap perubahan sama dengan hasil bangun ulang penuh."""
+
+    KOLOM = ('ruang', 'tim', 'format_supervisi_id', 'jenjang_pk',
+             'jumlah', 'total_skor', 'jumlah_ttd_perawat', 'jumlah_ttd_kepala', 'jumlah_lengkap')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.perawat = buat_user('ners1')
+        cls.format = buat_format_contoh(1, 2)
+        cls.format_lain = buat_format_contoh(1, 1, nama='Format Lain')
+
+    def buat(self, **data):
+        data = {'ruang': 'ICU', 'tim': 1, 'jenjang_pk': 'PK I', 'skor_total': 50.0, **data}
+        return Supervisi.objects.create(format_supervisi=data.pop('format', self.format), perawat=self.perawat, **data)
+
+    def ringkasan(self):
+        return list(RingkasanSupervisi.objects.filter(jumlah__gt=0).order_by(*self.KOLOM[:4]).values_list(*self.KOLOM))
+
+    def assertSamaDenganBangunUlang(self):
+        bertahap = self.ringkasan()
+        bangun_ulang_ringkasan()
+        self.assertEqual(bertahap, self.ringkasan())
+
+    def test_buat_ubah_hapus(self):
+        a = self.buat()
+        b = self.buat(skor_total=100.0, ttd_perawat='ttd/aa/bb/a.png')
+        self.buat(ruang='IGD', tim=2, format=self.format_lain)
+        self.assertSamaDenganBangunUlang()
+
+        b.ttd_kepala = 'ttd/aa/bb/b.png'
+        b.skor_total = 80.0
+        b.save()
+        self.assertSamaDenganBangunUlang()
+
+        # pindah kelompok: dikurangkan dari kelompok lama, ditambahkan ke kelompok baru
+        a.ruang, a.jenjang_pk = 'IGD', 'PK III'
+        a.save()
+        self.assertSamaDenganBangunUlang()
+
+        b.delete()
+        self.assertSamaDenganBangunUlang()
+        dashboard = data_dashboard()
+        self.assertEqual(dashboard['total']['jumlah'], 2)
+        self.assertEqual(dashboard['total']['menunggu_ttd'], 2)
+
+    def test_jalur_massal_repo_tidak_menyimpang(self):
+        # jalur yang melewati signals milik repo sendiri: impor/sintetis, ubah jawaban, hitung ulang skor
+        buat_supervisi_massal(self.format, self.perawat, 12, ukuran_batch=5)
+        s = Supervisi.objects.first()
+        kosongkan_cache()
+        bobot = struktur_format(self.format).bobot_aspek()
+        ubah_jawaban(s, {a: (False, True) for a in bobot}, bobot)
+        self.assertEqual(periksa_ringkasan(), [])
+        for lain in Supervisi.objects.exclude(id=s.id)[:4]:
+            lain.skor_total = 0  # lewat save(): ringkasan tetap sesuai
+            lain.save()
+        self.assertEqual(periksa_ringkasan(), [])
+        self.assertGreater(hitung_ulang_skor(), 0)  # UPDATE massal tanpa signals
+        self.assertEqual(periksa_ringkasan(), [])
+
+    def test_update_langsung_terdeteksi_dan_diperbaiki(self):
+        a = self.buat()
+        self.buat(ruang='IGD')
+        Supervisi.objects.filter(id=a.id).update(ruang='Anggrek', skor_total=10.0)
+        selisih = periksa_ringkasan()
+        self.assertEqual(
+            [(kunci[0], tersimpan and tersimpan['jumlah'], seharusnya and seharusnya['jumlah'])
+             for kunci, tersimpan, seharusnya in selisih],
+            [('Anggrek', None, 1), ('ICU', 1, None)],
+        )
+        with self.assertRaises(CommandError):
+            call_command('bangun_ulang_ringkasan', '--periksa', stdout=io.StringIO())
+        # bangun ulang per qs hanya mencakup kelompok baru; kelompok lama ('ICU') perlu bangun ulang penuh
+        bangun_ulang_ringkasan(Supervisi.objects.filter(id=a.id))
+        self.assertEqual([kunci[0] for kunci, _, _ in periksa_ringkasan()], ['ICU'])
+        call_command('bangun_ulang_ringkasan', stdout=io.StringIO())
+        self.assertEqual(periksa_ringkasan(), [])
+        call_command('bangun_ulang_ringkasan', '--periksa', stdout=io.StringIO())
+
+    def test_hapus_akun_perawat(self):
+        for ruang in ('ICU', 'IGD', 'ICU'):
+            self.buat(ruang=ruang)
+        self.perawat.delete()
+        self.assertEqual(self.ringkasan(), [])
+        self.assertSamaDenganBangunUlang()
+
+
+class HitungUlangSkorTest(TestCase):
+    """Hitung ulang skor massal: memakai bobot item, hanya menulis yang berubah, ringkasan ikut dibangun ulang."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.perawat = buat_user('ners1')
+        cls.format = buat_format_contoh(2, 2)
+        item_ringan, item_berat = cls.format.items.order_by('id')
+        ItemFormat.objects.filter(id=item_berat.id).update(bobot=3)
+        aspek = list(AspekFormat.objects.order_by('item_format_id', 'id').values_list('id', flat=True))
+        # D pada item ringan, TD pada item berat: tertimbang 2/8, tanpa bobot 2/4
+        cls.supervisi = buat_supervisi(
+            cls.format, {a: (i < 2, i >= 2) for i, a in enumerate(aspek)}, dict.fromkeys(aspek, 1.0),
+            perawat=cls.perawat, ruang='ICU', tim=1, jenjang_pk='PK I',
+        )
+
+    def skor(self):
+        self.supervisi.refresh_from_db()
+        return self.supervisi.skor_total
+
+    def test_tertimbang_dan_tanpa_bobot(self):
+        self.assertAlmostEqual(self.skor(), 50.0)
+        self.assertEqual(hitung_ulang_skor(tertimbang=True), 1)
+        self.assertAlmostEqual(self.skor(), 25.0)
+        self.assertEqual(hitung_ulang_skor(tertimbang=True), 0)
+        self.assertEqual(hitung_ulang_skor(tertimbang=False), 1)
+        self.assertAlmostEqual(self.skor(), 50.0)
+
+    def test_bawaan_tanpa_bobot_seperti_skor_lama(self):
+        # SKOR_TERTIMBANG bawaan False: skor yang sudah tersimpan tetap pada skala lama
+        self.assertFalse(settings.SKOR_TERTIMBANG)
+        self.assertEqual(hitung_ulang_skor(), 0)
+        self.assertAlmostEqual(self.skor(), 50.0)
+        with override_settings(SKOR_TERTIMBANG=True):
+            self.assertEqual(hitung_ulang_skor(), 1)
+        self.assertAlmostEqual(self.skor(), 25.0)
+
+    def test_perintah_memperbarui_ringkasan(self):
+        call_command('hitung_ulang_skor', '--tertimbang', '--format', str(self.format.id), stdout=io.StringIO())
+        self.assertAlmostEqual(self.skor(), 25.0)
+        self.assertAlmostEqual(RingkasanSupervisi.objects.get().total_skor, 25.0)
+
+    def test_skor_sql_sama_dengan_skor_di_memori(self):
+        buat_supervisi_massal(self.format, self.perawat, 20, seed=3)
+        Supervisi.objects.update(skor_total=-1)
+        self.assertEqual(hitung_ulang_skor(tertimbang=True), 21)
+        bobot = dict(AspekFormat.objects.values_list('id', 'item_format__bobot'))
+        for supervisi_id, jawaban in jawaban_supervisi(list(Supervisi.objects.values_list('id', flat=True))).items():
+            harapan = skor_dari_jawaban(((bobot[a], d, td) for a, (d, td) in jawaban.items()), tertimbang=True)
+            self.assertAlmostEqual(Supervisi.objects.get(id=supervisi_id).skor_total, harapan)
+
+
+class ImporSupervisiTest(TestCase):
+    """Impor massal supervisi: jawaban, skor, ringkasan dashboard, dan versi analitik per batch."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.perawat = buat_user('ners1')
+        cls.format = buat_format_contoh(2, 2)
+        kosongkan_cache()
+        cls.aspek = list(struktur_format(cls.format).bobot_aspek())
+
+    def setUp(self):
+        kosongkan_cache()
+
+    def csv(self, jumlah):
+        baris = [templat_csv(self.format).strip()]
+        for i in range(jumlah):
+            jawaban = ['D' if (i + j) % 3 else 'TD' for j in range(len(self.aspek))]
+            baris.append(','.join([
+                'ners1', str(self.format.id), f'2025-01-{i + 1:02d}', 'ICU' if i % 2 else 'IGD', '1', 'PK I',
+                '', '', '', '', *jawaban,
+            ]))
+        return '\n'.join(baris).encode()
+
+    def ringkasan(self):
+        return list(RingkasanSupervisi.objects.order_by('ruang').values(
+            'ruang', 'jumlah', 'total_skor', 'jumlah_ttd_perawat', 'jumlah_ttd_kepala', 'jumlah_lengkap',
+        ))
+
+    def test_jawaban_skor_dan_ringkasan_tertulis(self):
+        versi = VersiData.ambil(VERSI_JAWABAN)
+        hasil = impor_supervisi(self.csv(5), 'impor.csv', ukuran_batch=2)
+        self.assertEqual((hasil['supervisi'], hasil['jawaban']), (5, 5 * len(self.aspek)))
+        for s in Supervisi.objects.all():
+            self.assertAlmostEqual(s.skor_total, s.hitung_skor())
+        self.assertEqual(jawaban_supervisi([Supervisi.objects.order_by('id').first().id]).popitem()[1], {
+            a: (j % 3 != 0, j % 3 == 0) for j, a in enumerate(self.aspek)
+        })
+        self.assertEqual(VersiData.ambil(VERSI_JAWABAN), versi + 3)
+        diperbarui = self.ringkasan()
+        bangun_ulang_ringkasan()
+        self.assertEqual(diperbarui, self.ringkasan())
+        self.assertEqual(sum(r['jumlah'] for r in diperbarui), 5)
+
+    def test_batch_tersimpan_tetap_terhitung_bila_impor_gagal(self):
+        asli = impor_modul.tulis_batch
+        panggilan = []
+
+        def gagal_di_batch_kedua(batch):
+            panggilan.append(len(batch))
+            if len(panggilan) == 2:
+                raise IntegrityError('simulasi')
+            return asli(batch)
+
+        with mock.patch.object(impor_modul, 'tulis_batch', gagal_di_batch_kedua), self.assertRaises(IntegrityError):
+            impor_supervisi(self.csv(5), 'impor.csv', ukuran_batch=2)
+        self.assertEqual(Supervisi.objects.count(), 2)
+        self.assertEqual(sum(r['jumlah'] for r in self.ringkasan()), 2)
+
+
+class SintetisTest(FolderSementaraMixin, TestCase):
+    """Pembangkit data sintetis: nilai sesuai pilihan model, skor konsisten, ringkasan ikut terisi."""
+
+    def setUp(self):
+        kosongkan_cache()
+
+    def test_supervisi_massal_valid(self):
+        perawat = buat_user('ners1')
+        format_supervisi = buat_format_contoh(2, 3)
+        self.assertEqual(buat_supervisi_massal(format_supervisi, perawat, 7, ukuran_batch=3), 7 * 6)
+        for s in Supervisi.objects.all():
+            s.full_clean()
+            self.assertAlmostEqual(s.skor_total, s.hitung_skor())
+        self.assertEqual(sum(RingkasanSupervisi.objects.values_list('jumlah', flat=True)), 7)
+
+    def test_data_sintetis_dan_ringkasannya(self):
+        hasil = buat_data_sintetis(jumlah_perawat=3, jumlah_kepala=1, jumlah_format=2, item=2, aspek=2,
+                                   tahun=0, per_hari=20, ukuran_batch=7)
+        self.assertEqual(hasil['supervisi'], Supervisi.objects.count())
+        self.assertEqual(hasil['jawaban'], JawabanAspek.objects.count())
+        self.assertEqual(set(Supervisi.objects.values_list('jenjang_pk', flat=True)) - set(JENJANG), set())
+        kolom = ('ruang', 'tim', 'format_supervisi_id', 'jenjang_pk', 'jumlah', 'total_skor', 'jumlah_ttd_kepala')
+        diperbarui = list(RingkasanSupervisi.objects.order_by(*kolom[:4]).values_list(*kolom))
+        bangun_ulang_ringkasan()
+        self.assertEqual(diperbarui, list(RingkasanSupervisi.objects.order_by(*kolom[:4]).values_list(*kolom)))
+
+    def test_sebagian_supervisi_ditandatangani_kepala(self):
+        buat_data_sintetis(jumlah_perawat=2, jumlah_kepala=2, jumlah_format=1, item=1, aspek=2,
+                           tahun=0, per_hari=30, ukuran_batch=50)
+        bertanda = Supervisi.objects.exclude(ttd_kepala__isnull=True).exclude(ttd_kepala='')
+        self.assertEqual(list(bertanda.order_by('id')), list(Supervisi.objects.filter(kepala_ruangan__isnull=False)))
+        self.assertTrue(0 < bertanda.count() < Supervisi.objects.count())
+        nama_ttd = set(bertanda.values_list('ttd_kepala', flat=True))
+        self.assertEqual(len(nama_ttd), 2)  # satu TTD per kepala ruangan
+        for nama in nama_ttd:
+            self.assertTrue(penyimpanan_ttd.exists(nama))
+            self.assertTrue(penyimpanan_ttd.exists(nama_thumbnail(nama)))
+        total = RingkasanSupervisi.objects.aggregate(n=Sum('jumlah_ttd_kepala'))['n']
+        self.assertEqual(total, bertanda.count())
+
+    def test_akun_melanjutkan_nomor_terbesar(self):
+        for username in ('sintetis_perawat_1', 'sintetis_perawat_3', 'sintetis_perawat_admin'):
+            User.objects.create_user(username)
+        users = buat_akun_massal('sintetis_perawat_', 2)
+        self.assertEqual([u.username for u in users], ['sintetis_perawat_4', 'sintetis_perawat_5'])
+        self.assertEqual(len(buat_akun_massal('sintetis_perawat_', 1)), 1)
+
+
+class JumlahFormatTest(TestCase):
+    """Jumlah item/aspek dan versi format dipelihara signals; penghapusan cascade tidak bekerja per baris."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.perawat = buat_user('ners1')
+        tandai_jawaban_berubah()
+
+    def hapus(self, obj):
+        with CaptureQueriesContext(connection) as ctx:
+            obj.delete()
+        perintah = [q['sql'] for q in ctx.captured_queries]
+        return {
+            tabel: sum(sql.startswith(f'UPDATE "supervisi_{tabel}"') for sql in perintah)
+            for tabel in ('formatsupervisi', 'versidata', 'ringkasansupervisi')
+        }
+
+    def test_hapus_format_tanpa_kerja_per_baris(self):
+        for item, aspek, jumlah in ((2, 2, 2), (6, 4, 6)):
+            with self.subTest(ukuran=(item, aspek, jumlah)):
+                format_supervisi = buat_format_contoh(item, aspek)
+                buat_supervisi_massal(format_supervisi, self.perawat, jumlah)
+                versi = VersiData.ambil(VERSI_JAWABAN)
+                self.assertEqual(self.hapus(format_supervisi),
+                                 {'formatsupervisi': 0, 'versidata': 1, 'ringkasansupervisi': 0})
+                self.assertEqual(VersiData.ambil(VERSI_JAWABAN), versi + 1)
+                self.assertFalse(RingkasanSupervisi.objects.exists())
+                self.assertFalse(Supervisi.objects.exists())
+
+    def test_hapus_item_menghitung_ulang_sekali(self):
+        format_supervisi = buat_format_contoh(3, 4)
+        versi_format = format_supervisi.versi
+        versi = VersiData.ambil(VERSI_JAWABAN)
+        self.assertEqual(self.hapus(format_supervisi.items.first()),
+                         {'formatsupervisi': 1, 'versidata': 1, 'ringkasansupervisi': 0})
+        format_supervisi.refresh_from_db()
+        self.assertEqual((format_supervisi.total_item, format_supervisi.total_aspek), (2, 8))
+        self.assertEqual(format_supervisi.versi, versi_format + 1)
+        self.assertEqual(VersiData.ambil(VERSI_JAWABAN), versi + 1)
+
+    def test_aspek_baru_dan_dihapus_memperbarui_jumlah(self):
+        format_supervisi = buat_format_contoh(1, 2)
+        aspek = AspekFormat.objects.create(item_format=format_supervisi.items.get(), nama_aspek='Baru')
+        format_supervisi.refresh_from_db()
+        self.assertEqual(format_supervisi.total_aspek, 3)
+        aspek.delete()
+        format_supervisi.refresh_from_db()
+        self.assertEqual(format_supervisi.total_aspek, 2)
+
+
+class VersiFormatTest(TestCase):
+    """FormatSupervisi.versi naik pada setiap perubahan isi format, jadi cache fragmen halaman ikut usang."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = buat_user('kepala1', staff=True)
+        cls.perawat = buat_user('ners1')
+        cls.format = buat_format_contoh(1, 2)
+
+    def setUp(self):
+        cache.clear()
+        kosongkan_cache()
+
+    def versi(self):
+        self.format.refresh_from_db()
+        return self.format.versi
+
+    def test_versi_naik_saat_isi_format_diubah(self):
+        item = self.format.items.get()
+        aspek = item.aspek.first()
+        for obj, field, nilai in ((self.format, 'nama', 'Format Baru'), (item, 'pertanyaan', 'Prosedur Baru'),
+                                  (aspek, 'nama_aspek', 'Aspek Baru')):
+            with self.subTest(field=field):
+                versi, kunci = self.versi(), FormatSupervisi.kunci_versi()
+                setattr(obj, field, nilai)
+                obj.save()
+                self.assertEqual(self.versi(), versi + 1)
+                self.assertNotEqual(FormatSupervisi.kunci_versi(), kunci)
+
+    def test_fragmen_cache_memakai_isi_terbaru(self):
+        aspek = AspekFormat.objects.filter(item_format__format_supervisi=self.format).first()
+        halaman = (
+            (self.perawat, reverse('isi_supervisi', args=[self.format.id])),
+            (self.admin, reverse('kelola_format')),
+        )
+        for user, url in halaman:
+            with self.subTest(url=url):
+                self.client.force_login(user)
+                lama = aspek.nama_aspek
+                self.assertContains(self.client.get(url), lama)
+                aspek.nama_aspek = f'{lama} diubah'
+                aspek.save()
+                response = self.client.get(url)
+                self.assertContains(response, aspek.nama_aspek)
+                self.assertNotContains(response, f'>{lama}<')
+
+
+class FormatIoTest(TestCase):
+    """Impor/ekspor definisi format (format_io.py): bolak-balik JSON/CSV dan penolakan isi yang salah."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.format = buat_format_contoh(3, 2, nama='Format Asal')
+
+    def setUp(self):
+        kosongkan_cache()
+
+    def test_bolak_balik_json_dan_csv(self):
+        asal = definisi_format(self.format)
+        for nama, teks in (('json', ekspor_json(self.format)), ('csv', ekspor_csv(self.format))):
+            with self.subTest(nama=nama):
+                definisi = baca_berkas(teks.encode(), f'format.{nama}')
+                definisi['nama'] = f'Salinan {nama}'
+                salinan, jumlah_item, jumlah_aspek = impor_format(definisi)
+                self.assertEqual((jumlah_item, jumlah_aspek), (3, 6))
+                self.assertEqual((salinan.total_item, salinan.total_aspek), (3, 6))
+                self.assertEqual(definisi_format(salinan)['items'], asal['items'])
+
+    def test_isi_salah_ditolak(self):
+        def definisi(**item):
+            return json.dumps({'nama': 'F', 'items': [{'pertanyaan': 'P', **item}]})
+
+        kasus = {
+            'aspek bukan objek': definisi(aspek=['cuci tangan']),
+            'aspek bukan daftar': definisi(aspek='cuci tangan'),
+            'bobot NaN': definisi(bobot=float('nan')),
+            'bobot tak hingga': definisi(bobot='inf'),
+            'nama terlalu panjang': json.dumps({'nama': 'F' * 256, 'items': [{'pertanyaan': 'P'}]}),
+        }
+        for nama, teks in kasus.items():
+            with self.subTest(nama), self.assertRaises(ValidationError):
+                baca_json(teks)
+        with self.assertRaises(ValidationError):
+            baca_csv('prosedur,bobot,aspek\nP,nan,A\n')
+
+
+class EksporTest(FolderSementaraMixin, TestCase):
+    """Ekspor massal: arsip ZIP berisi PDF setiap supervisi, CSV jawaban sama dengan isi database."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.perawat = buat_user('ners1')
+        buat_supervisi_massal(buat_format_contoh(2, 2), cls.perawat, 3)
+
+    def filter_kosong(self):
+        form = SupervisiFilterForm({})
+        self.assertTrue(form.is_valid())
+        return form
+
+    def tanpa_render_di_proses_ini(self):
+        # proses anak pool (spawn) tidak terpengaruh patch ini
+        return mock.patch('supervisi.pdf.render_pdf_bytes', side_effect=AssertionError)
+
+    @override_settings(PDF_EXPORT_WORKERS=1)
+    def test_zip_berisi_pdf_setiap_supervisi(self):
+        supervisi = list(Supervisi.objects.order_by('tanggal', 'id'))
+        isi = b''.join(zip_pdf_supervisi(Supervisi.objects.all(), ukuran_batch=2))
+        with zipfile.ZipFile(io.BytesIO(isi)) as arsip:
+            self.assertEqual(arsip.namelist(), [f"{s.tanggal:%Y-%m-%d}_supervisi_{s.id}.pdf" for s in supervisi])
+            pdf = [arsip.read(nama) for nama in arsip.namelist()]
+        self.assertTrue(all(p.startswith(b'%PDF-') for p in pdf))
+        self.assertTrue(all(path_cache(s).exists() for s in supervisi))
+        # unduhan berikutnya dilayani dari cache tanpa render ulang
+        with self.tanpa_render_di_proses_ini():
+            self.assertEqual(b''.join(zip_pdf_supervisi(Supervisi.objects.all())), isi)
+
+    @override_settings(PDF_EXPORT_WORKERS=2)
+    def test_pdf_dirender_di_process_pool(self):
+        self.addCleanup(pool_pdf.tutup_pool)
+        with self.tanpa_render_di_proses_ini():
+            isi = b''.join(zip_pdf_supervisi(Supervisi.objects.all()))
+        proses = pool_pdf._pool._processes
+        self.assertEqual(len(proses), 2)
+        self.assertNotIn(os.getpid(), proses)
+        with zipfile.ZipFile(io.BytesIO(isi)) as arsip:
+            self.assertEqual(len(arsip.namelist()), 3)
+            self.assertTrue(all(arsip.read(nama).startswith(b'%PDF-') for nama in arsip.namelist()))
+
+    def test_csv_jawaban_sama_dengan_database(self):
+        judul, baris = baris_ekspor(self.filter_kosong(), 'jawaban')
+        teks = ''.join(csv_stream(judul, baris)).lstrip('\ufeff')
+        hasil = {}
+        for b in csv.DictReader(io.StringIO(teks)):
+            hasil.setdefault(int(b['ID Supervisi']), {})[int(b['ID Aspek'])] = (b['D'] == '1', b['TD'] == '1')
+        self.assertEqual(hasil, jawaban_supervisi(list(Supervisi.objects.values_list('id', flat=True))))
+
+
+class CachePdfTest(FolderSementaraMixin, TestCase):
+    """Cache PDF di disk: dipakai ulang selama supervisi dan formatnya tidak berubah."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.format = buat_format_contoh(1, 2)
+        buat_supervisi_massal(cls.format, buat_user('ners1'), 1)
+
+    def setUp(self):
+        kosongkan_cache()
+
+    def supervisi(self):
+        return Supervisi.objects.select_related('format_supervisi', 'perawat', 'kepala_ruangan').get()
+
+    def render(self):
+        with mock.patch('supervisi.pdf.render_pdf_bytes', wraps=pdf_modul.render_pdf_bytes) as render:
+            path = pdf_modul.pdf_supervisi(self.supervisi())
+        return path, render.call_count
+
+    def test_perubahan_format_membuat_kunci_baru(self):
+        path, n = self.render()
+        self.assertEqual(n, 1)
+        self.assertEqual(self.render(), (path, 0))
+        perubahan = [
+            lambda: FormatSupervisi.objects.filter(id=self.format.id).get().save(),  # mis. nama diganti
+            lambda: AspekFormat.objects.first().save(),
+            lambda: Supervisi.objects.get().save(),
+        ]
+        for ubah in perubahan:
+            ubah()
+            path_baru, n = self.render()
+            self.assertNotEqual(path_baru, path)
+            self.assertEqual(n, 1)
+            self.assertFalse(path.exists())  # file lama ikut dibuang saat PDF baru disimpan
+            path = path_baru
+
+
+class AksesBerkasTest(FolderSementaraMixin, TestCase):
+    """Media TTD dan PDF: hanya gambar dikirim inline, PDF hanya untuk admin atau pemiliknya."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = buat_user('karu', staff=True)
+        cls.perawat = buat_user('ners1')
+        cls.perawat_lain = buat_user('ners2')
+        buat_supervisi_massal(buat_format_contoh(1, 2), cls.perawat, 1)
+        cls.supervisi = Supervisi.objects.get()
+
+    def ambil_media(self, nama, isi):
+        with open(os.path.join(settings.MEDIA_ROOT, nama), 'wb') as f:
+            f.write(isi)
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('media', args=[nama]))
+        b''.join(response.streaming_content)
+        response.close()
+        return response
+
+    def test_gambar_dikirim_inline(self):
+        response = self.ambil_media('ttd.png', b'\x89PNG\r\n\x1a\n')
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertEqual(response['X-Content-Type-Options'], 'nosniff')
+        self.assertFalse(response.get('Content-Disposition', '').startswith('attachment'))
+
+    def test_selain_gambar_dikirim_sebagai_lampiran(self):
+        for nama in ('ttd.html', 'ttd.svg', 'tanpa_ekstensi'):
+            with self.subTest(nama=nama):
+                response = self.ambil_media(nama, b'<svg onload="alert(1)"/>')
+                self.assertEqual(response['Content-Type'], 'application/octet-stream')
+                self.assertEqual(response['X-Content-Type-Options'], 'nosniff')
+                self.assertTrue(response['Content-Disposition'].startswith('attachment;'))
+
+    def test_permintaan_bersyarat_dijawab_304(self):
+        berbasis_isi = f"{'ab' * 32}.png"
+        for nama, cache_control in (('lama.png', CACHE_BIASA), (berbasis_isi, CACHE_KONTEN)):
+            with self.subTest(nama=nama):
+                response = self.ambil_media(nama, _png())
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response['Cache-Control'], cache_control)
+                if nama == berbasis_isi:
+                    self.assertEqual(response['ETag'], f'"{"ab" * 32}"')
+                url = reverse('media', args=[nama])
+                for header in ({'If-None-Match': response['ETag']}, {'If-Modified-Since': response['Last-Modified']}):
+                    ulang = self.client.get(url, headers=header)
+                    self.assertEqual(ulang.status_code, 304)
+                    self.assertEqual(ulang.content, b'')
+                    self.assertEqual(ulang['ETag'], response['ETag'])
+                # isi berubah (ukuran lain): ETag lama tidak lagi cocok
+                if nama == 'lama.png':
+                    with open(os.path.join(settings.MEDIA_ROOT, nama), 'ab') as f:
+                        f.write(b'tambahan')
+                    ubah = self.client.get(url, headers={'If-None-Match': response['ETag']})
+                    self.assertEqual(ubah.status_code, 200)
+                    self.assertNotEqual(ubah['ETag'], response['ETag'])
+                    ubah.close()
+
+    def test_media_offload_ke_web_server(self):
+        os.makedirs(os.path.join(settings.MEDIA_ROOT, 'arsip'), exist_ok=True)
+        nama = 'arsip/tanda tangan.png'
+        path = os.path.join(settings.MEDIA_ROOT, nama)
+        with open(path, 'wb') as f:
+            f.write(_png())
+        self.client.force_login(self.admin)
+        for offload, header, nilai in (
+            ('x-accel-redirect', 'X-Accel-Redirect', '/_media/arsip/tanda%20tangan.png'),
+            ('x-sendfile', 'X-Sendfile', path),
+        ):
+            with self.subTest(offload=offload), override_settings(MEDIA_OFFLOAD=offload, MEDIA_OFFLOAD_PREFIX='/_media/'):
+                response = self.client.get(reverse('media', args=[nama]))
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response[header], nilai)
+                self.assertEqual(response.content, b'')
+                self.assertEqual(response['Content-Type'], 'image/png')
+                self.assertIn('ETag', response)
+
+    def test_unggahan_ttd_bukan_gambar_ditolak(self):
+        from PIL import Image
+
+        url = reverse('detail_supervisi', args=[self.supervisi.id])
+        self.client.force_login(self.admin)
+        berkas = [
+            ('ttd.html', b'<script>alert(1)</script>', None),
+            ('ttd.png', _png(), 100),  # melewati 2x MAX_IMAGE_PIXELS: DecompressionBombError
+        ]
+        for nama, isi, maks_piksel in berkas:
+            with self.subTest(nama=nama), mock.patch.object(Image, 'MAX_IMAGE_PIXELS', maks_piksel):
+                response = self.client.post(url, {
+                    'upload_ttd_perawat': '1', 'ttd_perawat': SimpleUploadedFile(nama, isi),
+                }, follow=True)
+                self.assertContains(response, 'File TTD harus berupa gambar')
+        self.supervisi.refresh_from_db()
+        self.assertFalse(self.supervisi.ttd_perawat)
+        self.assertFalse(os.path.exists(os.path.join(settings.MEDIA_ROOT, 'ttd')))
+
+    def test_pdf_hanya_untuk_admin_atau_pemilik(self):
+        url = reverse('cetak_supervisi_pdf', args=[self.supervisi.id])
+        for user, status in ((self.perawat_lain, 404), (self.perawat, 200), (self.admin, 200)):
+            with self.subTest(user=user.username):
+                self.client.force_login(user)
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, status)
+                if status == 200:
+                    self.assertEqual(b''.join(response.streaming_content)[:5], b'%PDF-')
+                response.close()
+
+
+class AntrianTugasTest(FolderSementaraMixin, TestCase):
+    """Antrian tugas latar: klik berulang memakai tugas yang sama, tetapi tidak lintas user."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = buat_user('karu', staff=True)
+        cls.perawat = buat_user('ners1')
+        buat_supervisi_massal(buat_format_contoh(1, 2), cls.perawat, 1)
+        cls.supervisi = Supervisi.objects.get()
+
+    def minta_pdf(self, user):
+        self.client.force_login(user)
+        with override_settings(TUGAS_ANTRIAN_AKTIF=True):
+            response = self.client.get(reverse('cetak_supervisi_pdf', args=[self.supervisi.id]))
+        self.assertEqual(response.status_code, 302)
+        return Tugas.objects.get(id=resolve(response.url).kwargs['tugas_id'])
+
+    def test_tugas_dipakai_ulang_hanya_oleh_pembuatnya(self):
+        tugas_perawat = self.minta_pdf(self.perawat)
+        self.assertEqual(self.minta_pdf(self.perawat), tugas_perawat)
+        tugas_admin = self.minta_pdf(self.admin)
+        self.assertNotEqual(tugas_admin, tugas_perawat)
+        self.assertEqual(tugas_admin.dibuat_oleh, self.admin)
+        self.client.force_login(self.perawat)
+        self.assertEqual(self.client.get(reverse('status_tugas', args=[tugas_admin.id])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('status_tugas', args=[tugas_perawat.id])).status_code, 200)
+
+
+class OlahTtdTest(FolderSementaraMixin, TestCase):
+    """Unggahan TTD diolah menjadi PNG grayscale terpangkas dengan thumbnail; file rusak jadi error form."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = buat_user('karu', staff=True)
+        buat_supervisi_massal(buat_format_contoh(1, 1), buat_user('ners1'), 1)
+        cls.supervisi = Supervisi.objects.get()
+
+    def foto_ttd(self):
+        # foto berwarna besar: latar krem dengan margin lebar, goresan biru di tengah
+        from PIL import Image, ImageDraw
+        img = Image.new('RGB', (3000, 2000), (245, 240, 225))
+        ImageDraw.Draw(img).line([(900, 1000), (1500, 950), (2100, 1050)], fill=(20, 30, 160), width=12)
+        berkas = io.BytesIO()
+        img.save(berkas, 'JPEG')
+        return SimpleUploadedFile('foto.jpg', berkas.getvalue(), content_type='image/jpeg')
+
+    def test_unggahan_diolah_menjadi_png_grayscale_terpangkas(self):
+        from PIL import Image
+
+        self.client.force_login(self.admin)
+        self.client.post(reverse('detail_supervisi', args=[self.supervisi.id]),
+                         {'upload_ttd_perawat': '1', 'ttd_perawat': self.foto_ttd()})
+        self.supervisi.refresh_from_db()
+        nama = self.supervisi.ttd_perawat.name
+        self.assertRegex(os.path.basename(nama), r'^[0-9a-f]{64}\.png$')
+        with Image.open(penyimpanan_ttd.path(nama)) as img:
+            self.assertEqual((img.format, img.mode), ('PNG', 'L'))
+            lebar, tinggi = img.size
+            self.assertLessEqual(lebar, settings.TTD_UKURAN_PDF[0])
+            self.assertLessEqual(tinggi, settings.TTD_UKURAN_PDF[1])
+            # margin dipangkas: tinggal pita goresan selebar ~1200 x ~110 piksel
+            self.assertLess(tinggi, lebar / 4)
+            self.assertEqual(img.getpixel((0, 0)), 255)
+            self.assertLess(min(img.getdata()), 128)
+        thumb = nama_thumbnail(nama)
+        self.assertTrue(penyimpanan_ttd.exists(thumb))
+        with Image.open(penyimpanan_ttd.path(thumb)) as img:
+            self.assertEqual(img.format, 'PNG')
+            self.assertLessEqual(img.width, settings.TTD_UKURAN_THUMB[0])
+            self.assertLessEqual(img.height, settings.TTD_UKURAN_THUMB[1])
+
+    def test_file_rusak_jadi_error_form_bukan_500(self):
+        # seperti form admin: ModelForm memanggil Supervisi.clean() lewat full_clean()
+        from django.forms import modelform_factory
+
+        Form = modelform_factory(Supervisi, fields=['ttd_perawat'])
+        with mock.patch('supervisi.ttd.normalisasi', side_effect=OSError('image file is truncated')):
+            form = Form({}, {'ttd_perawat': SimpleUploadedFile('ttd.png', _png())}, instance=self.supervisi)
+            self.assertFalse(form.is_valid())
+        self.assertIn('File TTD harus berupa gambar', form.errors['ttd_perawat'][0])
+        self.supervisi.refresh_from_db()
+        self.assertFalse(self.supervisi.ttd_perawat)
+
+    def test_clean_lalu_save_tidak_mengolah_dua_kali(self):
+        self.supervisi.ttd_kepala = SimpleUploadedFile('ttd.png', _png('black'))
+        with mock.patch('supervisi.ttd.normalisasi', wraps=ttd_modul.normalisasi) as normalisasi:
+            self.supervisi.full_clean()
+            self.supervisi.save()
+        self.assertEqual(normalisasi.call_count, 1)
+        self.assertTrue(penyimpanan_ttd.exists(nama_thumbnail(self.supervisi.ttd_kepala.name)))
+
+
+class PenyimpananTtdTest(FolderSementaraMixin, TestCase):
+    """TTD berbasis isi: file dengan isi sama dipakai bersama, GC hanya menghapus yang tidak dirujuk."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.perawat = buat_user('ners1')
+        cls.format = buat_format_contoh(1, 1)
+
+    def simpan_ttd(self, isi):
+        s = Supervisi.objects.create(format_supervisi=self.format, perawat=self.perawat, skor_total=0,
+                                     ttd_perawat=ContentFile(isi, name='ttd.png'))
+        return s, penyimpanan_ttd.path(s.ttd_perawat.name)
+
+    def tuakan(self, *paths):
+        lama = time.time() - 7200
+        for path in paths:
+            os.utime(path, (lama, lama))
+
+    def bersihkan(self):
+        call_command('bersihkan_ttd', stdout=io.StringIO())
+
+    def test_isi_sama_berbagi_file_dan_memperbarui_mtime(self):
+        s1, path = self.simpan_ttd(_png())
+        self.tuakan(path)
+        s2, path2 = self.simpan_ttd(_png())
+        self.assertEqual(s1.ttd_perawat.name, s2.ttd_perawat.name)
+        self.assertEqual(path, path2)
+        self.assertGreater(os.path.getmtime(path), time.time() - 60)
+
+    def test_gc_hanya_menghapus_file_tidak_terpakai(self):
+        s1, dipakai = self.simpan_ttd(_png())
+        s2, yatim = self.simpan_ttd(_png('black'))
+        Supervisi.objects.filter(id=s2.id).update(ttd_perawat=None)
+        thumb = penyimpanan_ttd.path(nama_thumbnail(s1.ttd_perawat.name))
+        self.tuakan(dipakai, yatim, thumb)
+        self.bersihkan()
+        self.assertTrue(os.path.exists(dipakai))
+        self.assertTrue(os.path.exists(thumb))
+        self.assertFalse(os.path.exists(yatim))
+
+    def test_gc_melewati_file_yang_dirujuk_ulang_saat_berjalan(self):
+        s, path = self.simpan_ttd(_png())
+        Supervisi.objects.filter(id=s.id).update(ttd_perawat=None)
+        self.tuakan(path, penyimpanan_ttd.path(nama_thumbnail(s.ttd_perawat.name)))
+        asli = BersihkanTtd._tidak_terpakai
+
+        def rujuk_ulang(perintah, batch):
+            tidak_terpakai = asli(perintah, batch)
+            self.simpan_ttd(_png())  # unggahan baru dengan isi sama setelah rujukan dicek
+            return tidak_terpakai
+
+        with mock.patch.object(BersihkanTtd, '_tidak_terpakai', rujuk_ulang):
+            self.bersihkan()
+        self.assertTrue(os.path.exists(path))
+
+
+class PaginasiKeysetTest(TestCase):
+    """Daftar supervisi berpaginasi keyset: halaman tidak tumpang tindih, kolom ID stabil antar halaman."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = buat_user('karu', staff=True)
+        buat_supervisi_massal(buat_format_contoh(1, 1), buat_user('ners1'), 7)
+        # beberapa supervisi bertanggal sama supaya urutan id ikut diuji
+        for i, s in enumerate(Supervisi.objects.order_by('id')):
+            Supervisi.objects.filter(id=s.id).update(tanggal=datetime.date(2025, 1, 1 + i // 2))
+        cls.urut = list(Supervisi.objects.order_by('-tanggal', '-id').values_list('id', flat=True))
+
+    def test_maju_dan_mundur_mencakup_semua_tanpa_ganda(self):
+        halaman, setelah = [], None
+        while True:
+            h = paginasi_keyset(Supervisi.objects.all(), setelah=setelah, ukuran=3)
+            halaman.append([s.id for s in h.objek])
+            if not h.berikutnya:
+                break
+            setelah = h.berikutnya
+        self.assertEqual([i for ids in halaman for i in ids], self.urut)
+        self.assertEqual([len(ids) for ids in halaman], [3, 3, 1])
+        kembali = paginasi_keyset(Supervisi.objects.all(), sebelum=h.sebelumnya, ukuran=3)
+        self.assertEqual([s.id for s in kembali.objek], halaman[1])
+        self.assertIsNone(paginasi_keyset(Supervisi.objects.all(), setelah='rusak', ukuran=3).sebelumnya)
+
+    def test_kolom_id_stabil_di_halaman_berikutnya(self):
+        self.client.force_login(self.admin)
+        with mock.patch('supervisi.views.UKURAN_HALAMAN_SUPERVISI', 3):
+            pertama = self.client.get(reverse('daftar_supervisi'))
+            kedua = self.client.get(reverse('daftar_supervisi'), {'setelah': pertama.context['halaman'].berikutnya})
+        self.assertEqual([s.id for s in kedua.context['halaman'].objek], self.urut[3:6])
+        for supervisi_id in self.urut[3:6]:
+            self.assertContains(kedua, f'<span class="id-pill">#{supervisi_id}</span>', html=True)
+
+
+class ProfilTest(TestCase):
+    """Middleware profil: header Server-Timing, statistik per view, sampling, halaman Performa."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = buat_user('karu', staff=True)
+        cls.perawat = buat_user('ners1')
+        buat_format_contoh(2, 3)
+
+    def setUp(self):
+        kosongkan_profil()
+        self.addCleanup(kosongkan_profil)
+        self.client.force_login(self.admin)
+
+    def test_request_tersampel_tercatat(self):
+        with override_settings(PROFIL_SAMPEL=1), CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('kelola_format'))
+        waktu = response['Server-Timing']
+        self.assertIn('sql;dur=', waktu)
+        self.assertIn(f'desc="{len(ctx)} query"', waktu)
+        self.assertIn('tpl;dur=', waktu)
+        [stat] = ringkasan_profil()
+        self.assertEqual((stat['view'], stat['jumlah'], stat['sql_n']), ('kelola_format', 1, len(ctx)))
+        self.assertGreater(stat['template_ms'], 0)
+        self.assertLessEqual(len(stat['sql_terberat']), 5)
+
+    def test_tanpa_sampel_hanya_total(self):
+        with override_settings(PROFIL_SAMPEL=0):
+            response = self.client.get(reverse('kelola_format'))
+        self.assertTrue(response['Server-Timing'].startswith('total;dur='))
+        self.assertEqual(ringkasan_profil(), [])
+
+    def test_jendela_persentil(self):
+        with override_settings(PROFIL_SAMPEL=1, PROFIL_JENDELA=3):
+            for _ in range(5):
+                self.client.get(reverse('api_daftar_format'))
+        [stat] = ringkasan_profil()
+        self.assertEqual((stat['jumlah'], stat['jendela']), (5, 3))
+        self.assertLessEqual(stat['p50_ms'], stat['p95_ms'])
+
+    def test_halaman_performa(self):
+        with override_settings(PROFIL_SAMPEL=1):
+            self.client.get(reverse('kelola_format'))
+            response = self.client.get(reverse('performa'))
+        self.assertContains(response, 'kelola_format')
+        with override_settings(PROFIL_SAMPEL=0):
+            self.client.post(reverse('performa'))
+        self.assertEqual(ringkasan_profil(), [])
+        self.client.force_login(self.perawat)
+        self.assertEqual(self.client.get(reverse('performa')).status_code, 302)
+
+
+def _png(warna='white'):
+    from PIL import Image
+    berkas = io.BytesIO()
+    Image.new('RGB', (40, 20), warna).save(berkas, 'PNG')
+    return berkas.getvalue()
+
+
+class AnggaranQueryTest(TestCase):
+    """
+    Anggaran query setiap URL di supervisi/urls.py, diukur dengan cache kosong pada
+    data kecil lalu pada data yang jauh lebih besar. Jumlah query harus di bawah
+    anggaran dan sama di kedua ukuran: view yang query-nya ikut tumbuh (N+1) gagal
+    dengan daftar SQL yang dijalankannya.
+    """
+    SKALA = (1, 5)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = buat_user('karu', staff=True)
+        cls.perawat = buat_user('ners')
+        cls.sasaran = cls.tambah_data(cls.SKALA[0])
+
+    @classmethod
+    def tambah_data(cls, skala):
+        """
+        Tambah data sebanding `skala`: format, akun, dan supervisi (milik perawat
+        uji maupun perawat lain). Kembalikan objek sasaran baru yang lebih besar untuk
+        URL ber-id (format skala*2 item, supervisi dengan TTD, tugas selesai).
+        """
+        format_sasaran = buat_format_contoh(2 * skala, 3, nama=f"Format Uji {skala}")
+        for i in range(skala):
+            perawat_lain = buat_user(f'ners_{skala}_{i}')
+            buat_user(f'karu_{skala}_{i}', staff=True)
+            buat_supervisi_massal(buat_format_contoh(2, 2, nama=f"Format {skala}.{i}"), perawat_lain, 5)
+        buat_supervisi_massal(format_sasaran, cls.perawat, 10 * skala)
+        bangun_ulang_ringkasan()
+
+        supervisi = Supervisi(
+            format_supervisi=format_sasaran, perawat=cls.perawat, kepala_ruangan=cls.admin,
+            perawat_nama='Ners Uji', ruang=f"Ruang Uji {skala}",
+            ttd_perawat=ContentFile(_png(), name='ttd.png'),
+        )
+        supervisi.save()
+        aspek = AspekFormat.objects.filter(item_format__format_supervisi=format_sasaran)
+        JawabanAspek.objects.bulk_create([
+            JawabanAspek(supervisi=supervisi, aspek=a, d=i % 2 == 0, td=i % 2 == 1) for i, a in enumerate(aspek)
+        ])
+        tandai_jawaban_berubah()
+
+        hasil = os.path.join(settings.PDF_CACHE_DIR, f'tugas_{skala}.pdf')
+        with open(hasil, 'wb') as berkas:
+            berkas.write(b'%PDF-1.4')
+        tugas = Tugas.objects.create(
+            jenis='pdf_supervisi', parameter={'supervisi_id': supervisi.id}, status=Tugas.SELESAI,
+            hasil=hasil, nama_file='supervisi.pdf', dibuat_oleh=cls.perawat,
+        )
+
+        return dict(
+            skala=skala, format=format_sasaran, supervisi=supervisi, tugas=tugas,
+            item=format_sasaran.items.first(), akun=User.objects.latest('id'),
+            aspek=list(aspek.values_list('id', flat=True)),
+        )
+
+    def daftar_kasus(self):
+        """[(nama URL, peran, argumen URL, metode, data, anggaran query)] untuk data sasaran saat ini."""
+        s = self.sasaran
+        # ruang baru per skala: kelompok ringkasan selalu dibuat, jumlah query sama di kedua skala
+        ruang_baru = f"Ruang Isian {s['skala']}"
+        isian = {'tim': '2', 'jenjang_pk': 'PK II', 'ruang': ruang_baru, 'perawat_nama': 'Ners Uji'}
+        isian.update({f"{'d' if i % 3 else 'td'}_{a}": 'on' for i, a in enumerate(s['aspek'])})
+        kiriman = json.dumps({'supervisi': [{
+            'kunci': f"anggaran-{s['skala']}", 'format_id': s['format'].id, 'tim': 1, 'jenjang_pk': 'PK I',
+            'ruang': ruang_baru, 'jawaban': {str(a): 'D' for a in s['aspek']},
+        }]})
+        # ekspor PDF dibaca per batch; filter ke ruang sasaran supaya isinya sama di kedua skala
+        hanya_sasaran = {'ruang': s['supervisi'].ruang}
+        sup, fmt, item, akun, tugas = (s[k].id for k in ('supervisi', 'format', 'item', 'akun', 'tugas'))
+        return [
+            ('home', 'perawat', [], 'get', None, 2),
+            ('register', 'anonim', [], 'get', None, 0),
+            ('login', 'anonim', [], 'get', None, 0),
+            ('logout', 'perawat', [], 'get', None, 4),
+            ('cetak_supervisi_pdf', 'admin', [sup], 'get', None, 7),
+            ('status_tugas', 'perawat', [tugas], 'get', None, 3),
+            ('status_tugas_json', 'perawat', [tugas], 'get', None, 3),
+            ('unduh_tugas', 'perawat', [tugas], 'get', None, 3),
+            ('ringkasan_saya', 'perawat', [], 'get', None, 4),
+            ('daftar_format_supervisi', 'perawat', [], 'get', None, 4),
+            ('tambah_format_supervisi', 'admin', [], 'get', None, 2),
+            ('tambah_item_format', 'admin', [fmt], 'get', None, 3),
+            ('isi_supervisi', 'perawat', [fmt], 'get', None, 5),
+            ('isi_supervisi', 'perawat', [fmt], 'post', isian, 14),
+            ('admin_dashboard', 'admin', [], 'get', None, 4),
+            ('daftar_supervisi', 'admin', [], 'get', None, 4),
+            ('ekspor_pdf_zip', 'admin', [], 'get', hanya_sasaran, 4),
+            ('ekspor_data_supervisi', 'admin', [], 'get', {'jenis': 'jawaban'}, 3),
+            ('impor_supervisi', 'admin', [], 'get', None, 3),
+            ('templat_impor_supervisi', 'admin', [], 'get', {'format': fmt}, 5),
+            ('analitik_aspek', 'admin', [], 'get', None, 5),
+            ('analitik_aspek_json', 'admin', [], 'get', None, 4),
+            ('performa', 'admin', [], 'get', None, 2),
+            ('detail_supervisi', 'admin', [sup], 'get', None, 6),
+            ('detail_supervisi', 'admin', [sup], 'post', dict(isian, simpan_jawaban='1'), 14),
+            ('hapus_supervisi', 'admin', [sup], 'get', None, 3),
+            ('kelola_akun', 'admin', [], 'get', None, 6),
+            ('tambah_akun', 'admin', [], 'get', None, 2),
+            ('edit_akun', 'admin', [akun], 'get', None, 6),
+            ('hapus_akun', 'admin', [akun], 'get', None, 5),
+            ('kelola_format', 'admin', [], 'get', None, 6),
+            ('impor_format', 'admin', [], 'get', None, 3),
+            ('ekspor_format', 'admin', [fmt], 'get', None, 5),
+            ('edit_item_format', 'admin', [item], 'get', None, 4),
+            ('hapus_item_format', 'admin', [item], 'get', None, 3),
+            ('edit_format', 'admin', [fmt], 'get', None, 3),
+            ('hapus_format', 'admin', [fmt], 'get', None, 3),
+            ('api_daftar_supervisi', 'perawat', [], 'get', {'jawaban': 1}, 4),
+            ('api_kirim_supervisi', 'perawat', [], 'post', kiriman, 15),
+            ('api_detail_supervisi', 'perawat', [sup], 'get', {'jawaban': 1}, 4),
+            ('api_daftar_format', 'perawat', [], 'get', {'struktur': 1}, 6),
+            ('api_detail_format', 'perawat', [fmt], 'get', {'struktur': 1}, 6),
+            ('media', 'perawat', [s['supervisi'].ttd_perawat.name], 'get', None, 3),
+        ]
+
+    @classmethod
+    def setUpClass(cls):
+        # berkas TTD, cache PDF, dan hasil tugas ditulis ke folder sementara
+        cls.folder = tempfile.TemporaryDirectory()
+        cls.pengaturan = override_settings(
+            MEDIA_ROOT=cls.folder.name, PDF_CACHE_DIR=cls.folder.name, TUGAS_ANTRIAN_AKTIF=False,
+        )
+        cls.pengaturan.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.pengaturan.disable()
+        cls.folder.cleanup()
+
+    def ukur(self, nama, peran, args, metode, data):
+        """Jalankan satu permintaan dengan cache kosong; kembalikan (status, daftar SQL)."""
+        client = Client()
+        if peran != 'anonim':
+            client.force_login(self.admin if peran == 'admin' else self.perawat)
+        cache.clear()
+        kosongkan_cache()
+        url = reverse(nama, args=args)
+        with CaptureQueriesContext(connection) as ctx:
+            if metode == 'post' and isinstance(data, str):
+                response = client.post(url, data, content_type='application/json')
+            else:
+                response = getattr(client, metode)(url, data)
+            if response.streaming:
+                b''.join(response.streaming_content)
+        response.close()
+        return response.status_code, [q['sql'] for q in ctx.captured_queries]
+
+    def test_semua_url_punya_anggaran(self):
+        terdaftar = {p.name for p in urls.urlpatterns}
+        self.assertEqual(terdaftar - {k[0] for k in self.daftar_kasus()}, set())
+
+    def test_query_tetap_berapa_pun_ukuran_data(self):
+        hasil = {}
+        for skala in self.SKALA:
+            if skala != self.sasaran['skala']:
+                self.sasaran = self.tambah_data(skala)
+            for nama, peran, args, metode, data, anggaran in self.daftar_kasus():
+                hasil.setdefault((nama, metode), []).append((anggaran, *self.ukur(nama, peran, args, metode, data)))
+
+        for (nama, metode), ukuran in hasil.items():
+            with self.subTest(url=nama, metode=metode):
+                anggaran = ukuran[0][0]
+                for status, _ in (u[1:] for u in ukuran):
+                    self.assertLess(status, 400, f"{nama} {metode.upper()} gagal dengan status {status}")
+                jumlah = [len(sql) for _, _, sql in ukuran]
+                terbanyak = max(ukuran, key=lambda u: len(u[2]))[2]
+                if max(jumlah) > anggaran or len(set(jumlah)) > 1:
+                    self.fail(
+                        f"{nama} {metode.upper()}: {' -> '.join(map(str, jumlah))} query "
+                        f"pada skala {self.SKALA} (anggaran {anggaran}):\n"
+                        + "\n".join(f"{i}. {sql}" for i, sql in enumerate(terbanyak, 1))
+                    )
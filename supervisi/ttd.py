@@ -0,0 +1,154 @@
+"""
+Pengolahan gambar tanda tangan (Pillow).
+
+Unggahan TTD (sering berupa foto ponsel berukuran megabyte) diolah sekali saat
+disimpan menjadi PNG grayscale yang sudah dipangkas dan dibatasi ukurannya; file
+inilah yang disimpan di field dan dipakai PDF. Di sampingnya dibuat thumbnail
+kecil untuk halaman web, dengan nama yang sama di `<folder>/thumb/`.
+"""
+import hashlib
+import logging
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+FIELD_TTD = ('ttd_perawat', 'ttd_kepala')
+
+# piksel lebih terang dari ini dianggap latar (kertas) dan diputihkan
+AMBANG_LATAR = 200
+MARGIN_PANGKAS = 8
+
+
+def _png(img):
+    out = BytesIO()
+    img.save(out, format='PNG', optimize=True)
+    return out.getvalue()
+
+
+def normalisasi(berkas):
+    """
+    Kembalikan bytes PNG tanda tangan yang sudah dinormalisasi: orientasi EXIF
+    diterapkan, transparansi diratakan ke putih, grayscale dengan latar putih,
+    dipangkas ke goresan, dan diperkecil hingga TTD_UKURAN_PDF.
+    """
+    with Image.open(berkas) as img:
+        img = ImageOps.exif_transpose(img)
+        if img.mode in ('RGBA', 'LA', 'P'):
+            img = img.convert('RGBA')
+            latar = Image.new('RGBA', img.size, 'white')
+            latar.alpha_composite(img)
+            img = latar
+        abu = ImageOps.autocontrast(img.convert('L'), cutoff=1)
+
+    abu = abu.point(lambda p: 255 if p > AMBANG_LATAR else p)
+    kotak = ImageOps.invert(abu).getbbox()
+    if kotak:
+        kiri, atas, kanan, bawah = kotak
+        abu = abu.crop((
+            max(kiri - MARGIN_PANGKAS, 0),
+            max(atas - MARGIN_PANGKAS, 0),
+            min(kanan + MARGIN_PANGKAS, abu.width),
+            min(bawah + MARGIN_PANGKAS, abu.height),
+        ))
+    abu.thumbnail(settings.TTD_UKURAN_PDF, Image.LANCZOS)
+    return _png(abu)
+
+
+def thumbnail(data_png):
+    """Thumbnail web (TTD_UKURAN_THUMB) dari PNG hasil `normalisasi()`."""
+    with Image.open(BytesIO(data_png)) as img:
+        img.thumbnail(settings.TTD_UKURAN_THUMB, Image.LANCZOS)
+        return _png(img)
+
+
+def nama_thumbnail(nama):
+    folder, berkas = os.path.split(nama)
+    return os.path.join(folder, 'thumb', berkas)
+
+
+def nama_konten(data, ext='.png'):
+    """Nama file berbasis isi: hash SHA-256 + ekstensi (lihat storage.py)."""
+    return hashlib.sha256(data).hexdigest() + ext
+
+
+def olah_unggahan(fieldfile):
+    """
+    Ganti file unggahan yang belum disimpan di `fieldfile` dengan PNG hasil
+    normalisasi bernama hash isinya dan kembalikan bytes PNG-nya. File yang tidak
+    dapat dibaca sebagai gambar (termasuk decompression bomb) ditolak dengan
+    ValidationError, jadi tidak ada isi mentah yang ikut tersimpan.
+    """
+    fieldfile.seek(0)
+    try:
+        data = normalisasi(fieldfile)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, ValueError) as e:
+        logger.warning("TTD %s ditolak: %s", fieldfile.name, e)
+        raise ValidationError("File TTD harus berupa gambar (PNG/JPG) yang dapat dibaca.")
+    setattr(fieldfile.instance, fieldfile.field.attname, ContentFile(data, name=nama_konten(data)))
+    return data
+
+
+def olah_ttd_baru(instance):
+    """
+    Validasi dan olah setiap unggahan TTD baru (belum tersimpan) milik Supervisi
+    `instance` dengan `olah_unggahan`. Dipanggil `Supervisi.clean()` (form admin,
+    view) sebelum save; signal pre_save memanggilnya lagi hanya untuk mengonversi
+    unggahan yang belum diolah. Hasil diingat di `instance._ttd_baru`
+    {field: (nama, bytes PNG)} supaya file tidak diolah dua kali dan thumbnail
+    ditulis dari bytes yang sama. Kesalahan dilaporkan per field.
+    """
+    olahan = instance.__dict__.setdefault('_ttd_baru', {})
+    salah = {}
+    for field in FIELD_TTD:
+        berkas = getattr(instance, field)
+        if not berkas or berkas._committed:
+            continue
+        if field in olahan and olahan[field][0] == berkas.name:
+            continue
+        try:
+            data = olah_unggahan(berkas)
+        except ValidationError as e:
+            salah[field] = e
+        else:
+            olahan[field] = (getattr(instance, field).name, data)
+    if salah:
+        raise ValidationError(salah)
+    return olahan
+
+
+def simpan_thumbnail(fieldfile, data_png=None):
+    """
+    Tulis thumbnail untuk file TTD yang sudah tersimpan di storage. Nama file
+    berbasis isi, jadi thumbnail yang sudah ada tidak perlu dibuat ulang.
+    """
+    nama = nama_thumbnail(fieldfile.name)
+    if fieldfile.storage.exists(nama):
+        return
+    if data_png is None:
+        with fieldfile.storage.open(fieldfile.name) as f:
+            data_png = f.read()
+    fieldfile.storage.save(nama, ContentFile(thumbnail(data_png)))
+
+
+def nama_asli_thumbnail(nama):
+    """Kebalikan `nama_thumbnail`: nama file TTD pemilik thumbnail, atau None."""
+    folder, berkas = os.path.split(nama)
+    if os.path.basename(folder) != 'thumb':
+        return None
+    return os.path.join(os.path.dirname(folder), berkas)
+
+
+def url_thumbnail(fieldfile):
+    """URL thumbnail TTD; file asli dipakai bila thumbnail belum ada (unggahan lama)."""
+    if not fieldfile:
+        return ''
+    nama = nama_thumbnail(fieldfile.name)
+    if fieldfile.storage.exists(nama):
+        return fieldfile.storage.url(nama)
+    return fieldfile.url
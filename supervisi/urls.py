@@ -1,7 +1,6 @@
 from django.urls import path
-from . import views
+from . import api, views
 from django.conf import settings
-from django.conf.urls.static import static
 
 urlpatterns = [
     path('', views.home, name='home'),
@@ -9,6 +8,9 @@ urlpatterns = [
     path('login/', views.user_login, name='login'),
     path('logout/', views.user_logout, name='logout'),
     path('admin/supervisi/<int:supervisi_id>/pdf/', views.cetak_supervisi_pdf, name='cetak_supervisi_pdf'),
+    path('tugas/<int:tugas_id>/', views.status_tugas, name='status_tugas'),
+    path('tugas/<int:tugas_id>/status/', views.status_tugas_json, name='status_tugas_json'),
+    path('tugas/<int:tugas_id>/unduh/', views.unduh_tugas, name='unduh_tugas'),
 
     # Perawat
     path('ringkasan/', views.ringkasan_saya, name='ringkasan_saya'),
@@ -20,6 +22,13 @@ urlpatterns = [
     # Admin
     path('admin/dashboard/', views.admin_dashboard, name='admin_dashboard'),
     path('admin/supervisi/', views.daftar_supervisi, name='daftar_supervisi'),
+    path('admin/supervisi/ekspor/pdf/', views.ekspor_pdf_zip, name='ekspor_pdf_zip'),
+    path('admin/supervisi/ekspor/data/', views.ekspor_data_supervisi, name='ekspor_data_supervisi'),
+    path('admin/supervisi/impor/', views.impor_supervisi_view, name='impor_supervisi'),
+    path('admin/supervisi/impor/templat/', views.templat_impor_supervisi, name='templat_impor_supervisi'),
+    path('admin/analitik/aspek/', views.analitik_aspek_view, name='analitik_aspek'),
+    path('admin/analitik/aspek.json', views.analitik_aspek_json, name='analitik_aspek_json'),
+    path('admin/performa/', views.performa, name='performa'),
     path('admin/supervisi/<int:supervisi_id>/', views.detail_supervisi, name='detail_supervisi'),
     path('supervisi/<int:pk>/hapus/', views.hapus_supervisi, name='hapus_supervisi'),
     path('admin/akun/', views.kelola_akun, name='kelola_akun'),
@@ -27,12 +36,23 @@ urlpatterns = [
     path('admin/akun/<int:user_id>/edit/', views.edit_akun, name='edit_akun'),
     path('admin/akun/<int:user_id>/hapus/', views.hapus_akun, name='hapus_akun'),
     path('admin/format/', views.kelola_format, name='kelola_format'),
+    path('admin/format/impor/', views.impor_format_view, name='impor_format'),
+    path('admin/format/<int:pk>/ekspor/', views.ekspor_format_view, name='ekspor_format'),
     path('admin/format/item/<int:item_id>/edit/', views.edit_item_format, name='edit_item_format'),
     path('admin/format/item/<int:item_id>/hapus/', views.hapus_item_format, name='hapus_item_format'),
     path('format/<int:pk>/edit/', views.edit_format, name='edit_format'),
     path('format/<int:pk>/hapus/', views.hapus_format, name='hapus_format'),
 
+    # API JSON baca-saja (lihat api.py)
+    path('api/supervisi/', api.daftar_supervisi, name='api_daftar_supervisi'),
+    path('api/supervisi/kirim/', api.kirim_supervisi, name='api_kirim_supervisi'),
+    path('api/supervisi/<int:supervisi_id>/', api.detail_supervisi, name='api_detail_supervisi'),
+    path('api/format/', api.daftar_format, name='api_daftar_format'),
+    path('api/format/<int:format_id>/', api.detail_format, name='api_detail_format'),
+
 ]
 
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+# media (TTD) selalu dilayani lewat view yang memerlukan login, juga saat DEBUG
+urlpatterns += [
+    path(settings.MEDIA_URL.lstrip('/') + '<path:nama>', views.media_terproteksi, name='media'),
+]
@@ -1,5 +1,21 @@
+import os
+
 from django.shortcuts import render, redirect, get_object_or_404
-from .models import FormatSupervisi, ItemFormat, Supervisi, AspekFormat, JawabanAspek
+from .models import FormatSupervisi, ItemFormat, Supervisi, AspekFormat, Tugas
+from .services import baca_jawaban_post, buat_supervisi, grid_jawaban, jawaban_supervisi, ubah_jawaban
+from .struktur import struktur_format
+from .pdf import hapus_cache_pdf, path_cache, pdf_supervisi
+from .jobs import antrekan
+from .pagination import paginasi_keyset
+from .ringkasan import data_dashboard
+from .analitik import KELOMPOK, analitik_aspek
+from .profil import kosongkan_profil, ringkasan_profil
+from .scoring import hitung_ulang_skor
+from .format_io import definisi_dari_post, ekspor_csv, ekspor_json, impor_format
+from .impor_supervisi import impor_supervisi, templat_csv
+from .exports import JENIS_EKSPOR, baris_ekspor, csv_stream, xlsx_stream, zip_pdf_supervisi
+from .media import kirim_berkas
+from .ttd import nama_asli_thumbnail
 from .forms import (
     JawabanForm,
     FormatSupervisiForm,
@@ -8,20 +24,26 @@ from .forms import (
     RegisterForm,
     AkunForm,
     AkunUpdateForm,
+    SupervisiFilterForm,
+    ImporFormatForm,
+    ImporSupervisiForm,
 )
 from django import forms
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth.models import User, Group
 from django.contrib.auth import authenticate, login, logout
 from django.contrib import messages
-from django.http import HttpResponse
-from django.db.models import Avg
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.core.exceptions import SuspiciousFileOperation, ValidationError
+from django.core.files.storage import default_storage
+from django.db.models import Avg, Q
+from django.views.decorators.http import require_safe
 from django.forms import inlineformset_factory
-from reportlab.lib.pagesizes import A4
-from reportlab.lib import colors
-from reportlab.lib.units import cm
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Table, TableStyle, Spacer, Image
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+
+
+UKURAN_HALAMAN_SUPERVISI = 50
 
 
 # ================== HELPERS (ROLE) ==================
@@ -85,59 +107,223 @@ def detail_supervisi_admin(request, supervisi_id):
     return render(request, 'admin/detail_supervisi.html', {'supervisi': supervisi})
 
 
+@login_required
+@user_passes_test(admin_required)
 def admin_dashboard(request):
-    total_supervisi = Supervisi.objects.count()
-    supervisi_terakhir = Supervisi.objects.order_by('-tanggal')[:10]
+    """
+    Dashboard kepala ruangan. Angka agregat dibaca dari RingkasanSupervisi yang
+    diperbarui bertahap, jadi jumlah query tetap berapa pun banyaknya supervisi.
+    """
+    ringkasan = data_dashboard()
+    supervisi_terakhir = (
+        Supervisi.objects
+        .select_related('perawat', 'format_supervisi')
+        .only(
+            'id', 'tanggal', 'tim', 'jenjang_pk', 'ruang', 'skor_total', 'ttd_perawat', 'ttd_kepala',
+            'perawat__username', 'format_supervisi__nama',
+        )
+        .order_by('-tanggal', '-id')[:10]
+    )
     return render(request, 'admin/dashboard.html', {
-        'total_supervisi': total_supervisi,
+        'total_supervisi': ringkasan['total']['jumlah'],
+        'ringkasan': ringkasan,
         'supervisi_terakhir': supervisi_terakhir,
     })
 
 
 @user_passes_test(admin_required)
 def daftar_supervisi(request):
-    supervisi = Supervisi.objects.all().order_by('-tanggal')
-    return render(request, 'admin/daftar_supervisi.html', {'supervisi': supervisi})
+    """
+    Daftar supervisi dengan filter dan paginasi keyset (cursor) per tanggal/id.
+    Hanya kolom yang ditampilkan yang dimuat.
+    """
+    filter_form = SupervisiFilterForm(request.GET)
+    qs = filter_form.filter(
+        Supervisi.objects
+        .select_related('perawat', 'format_supervisi')
+        .only(
+            'id', 'tanggal', 'skor_total', 'ttd_perawat', 'ttd_kepala',
+            'perawat__username', 'format_supervisi__nama',
+        )
+    )
+    halaman = paginasi_keyset(
+        qs,
+        setelah=request.GET.get('setelah'),
+        sebelum=request.GET.get('sebelum'),
+        ukuran=UKURAN_HALAMAN_SUPERVISI,
+    )
+    return render(request, 'admin/daftar_supervisi.html', {
+        'supervisi': halaman,
+        'halaman': halaman,
+        'filter_form': filter_form,
+    })
 
 
+@login_required
+@user_passes_test(admin_required)
+def ekspor_pdf_zip(request):
+    """
+    Ekspor PDF banyak supervisi sekaligus sebagai satu arsip ZIP.
+    Filter sama dengan daftar supervisi; arsip di-stream selama PDF dirender.
+    """
+    filter_form = SupervisiFilterForm(request.GET)
+    if not filter_form.is_valid():
+        messages.error(request, "Filter ekspor tidak valid.")
+        return redirect('daftar_supervisi')
+
+    qs = filter_form.filter(Supervisi.objects.all())
+    response = StreamingHttpResponse(zip_pdf_supervisi(qs), content_type='application/zip')
+    response['Content-Disposition'] = 'attachment; filename="supervisi_pdf.zip"'
+    return response
+
+
+@login_required
+@user_passes_test(admin_required)
+def ekspor_data_supervisi(request):
+    """
+    Ekspor data supervisi (CSV/XLSX) dengan filter yang sama seperti daftar supervisi.
+    `jenis=ringkasan` satu baris per supervisi, `jenis=jawaban` satu baris per jawaban aspek.
+    Baris dibaca per potongan dan langsung di-stream, jadi memori tetap kecil.
+    """
+    filter_form = SupervisiFilterForm(request.GET)
+    jenis = request.GET.get('jenis', 'ringkasan')
+    berkas = request.GET.get('berkas', 'csv')
+    if not filter_form.is_valid() or jenis not in JENIS_EKSPOR or berkas not in ('csv', 'xlsx'):
+        messages.error(request, "Parameter ekspor tidak valid.")
+        return redirect('daftar_supervisi')
+
+    judul, baris = baris_ekspor(filter_form, jenis)
+    if berkas == 'xlsx':
+        response = StreamingHttpResponse(
+            xlsx_stream(judul, baris, nama_sheet=jenis.capitalize()),
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        )
+    else:
+        response = StreamingHttpResponse(csv_stream(judul, baris), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="supervisi_{jenis}.{berkas}"'
+    return response
+
+
+@login_required
+@user_passes_test(admin_required)
+def analitik_aspek_view(request):
+    """
+    Analitik kepatuhan per aspek (persentase D / TD / tidak dijawab), dengan
+    filter yang sama seperti daftar supervisi dan rincian opsional per kelompok.
+    """
+    filter_form = SupervisiFilterForm(request.GET)
+    kelompok = request.GET.get('kelompok') or None
+    baris = analitik_aspek(filter_form, kelompok)
+    return render(request, 'admin/analitik_aspek.html', {
+        'baris': baris,
+        'filter_form': filter_form,
+        'kelompok': kelompok if kelompok in KELOMPOK else '',
+        'pilihan_kelompok': [(k, v[0]) for k, v in KELOMPOK.items()],
+    })
+
+
+@login_required
+@user_passes_test(admin_required)
+def analitik_aspek_json(request):
+    filter_form = SupervisiFilterForm(request.GET)
+    if not filter_form.is_valid():
+        return JsonResponse({'errors': filter_form.errors}, status=400)
+    kelompok = request.GET.get('kelompok') or None
+    return JsonResponse({
+        'kelompok': kelompok if kelompok in KELOMPOK else None,
+        'hasil': analitik_aspek(filter_form, kelompok),
+    })
+
+
+@login_required
+@user_passes_test(admin_required)
+def performa(request):
+    """
+    Statistik profil request per view di proses ini (lihat profil.py), view
+    dengan p95 terlambat di atas beserta query terberatnya.
+    """
+    if request.method == 'POST':
+        kosongkan_profil()
+        messages.success(request, "Statistik performa dikosongkan.")
+        return redirect('performa')
+    return render(request, 'admin/performa.html', {
+        'statistik': ringkasan_profil(),
+        'sampel_persen': round(settings.PROFIL_SAMPEL * 100, 1),
+        'jendela': settings.PROFIL_JENDELA,
+        'pid': os.getpid(),
+    })
+
+
+@login_required
+@user_passes_test(admin_required)
 def detail_supervisi(request, supervisi_id):
     """
     Halaman detail hasil supervisi (Admin):
     - Upload TTD Perawat / Kepala
     - Edit Nama Kepala Ruangan & NIP (baru)
+    - Koreksi jawaban D/TD di tempat (hanya aspek yang berubah yang ditulis)
     """
-    supervisi = get_object_or_404(Supervisi, id=supervisi_id)
+    supervisi = get_object_or_404(Supervisi.objects.select_related('perawat', 'format_supervisi'), id=supervisi_id)
+    struktur = struktur_format(supervisi.format_supervisi)
 
     if request.method == "POST":
+        if 'simpan_jawaban' in request.POST:
+            bobot = struktur.bobot_aspek()
+            jumlah = ubah_jawaban(supervisi, baca_jawaban_post(request.POST, bobot), bobot)
+            if jumlah:
+                hapus_cache_pdf(supervisi.id)
+                messages.success(request, f"{jumlah} jawaban aspek diperbarui. Skor menjadi {supervisi.skor_total:.1f}%.")
+            else:
+                messages.info(request, "Tidak ada jawaban yang berubah.")
+            return redirect('detail_supervisi', supervisi_id=supervisi.id)
+
         # Simpan info kepala ruangan (nama & NIP)
         if 'save_kepala_info' in request.POST:
             supervisi.kepala_nama = request.POST.get('kepala_nama', '').strip() or None
             supervisi.kepala_nip = request.POST.get('kepala_nip', '').strip() or None
             supervisi.save()
+            hapus_cache_pdf(supervisi.id)
             messages.success(request, "Informasi Kepala Ruangan berhasil disimpan.")
             return redirect('detail_supervisi', supervisi_id=supervisi.id)
 
         # Upload TTD Perawat
         if 'upload_ttd_perawat' in request.POST:
             supervisi.ttd_perawat = request.FILES.get('ttd_perawat')
+            try:
+                supervisi.clean()
+            except ValidationError as e:
+                messages.error(request, e.messages[0])
+                return redirect('detail_supervisi', supervisi_id=supervisi.id)
             supervisi.save()
+            hapus_cache_pdf(supervisi.id)
             messages.success(request, "TTD Perawat berhasil diupload.")
             return redirect('detail_supervisi', supervisi_id=supervisi.id)
 
         # Upload TTD Kepala
         if 'upload_ttd_kepala' in request.POST:
             supervisi.ttd_kepala = request.FILES.get('ttd_kepala')
+            try:
+                supervisi.clean()
+            except ValidationError as e:
+                messages.error(request, e.messages[0])
+                return redirect('detail_supervisi', supervisi_id=supervisi.id)
             supervisi.save()
+            hapus_cache_pdf(supervisi.id)
             messages.success(request, "TTD Kepala Ruangan berhasil diupload.")
             return redirect('detail_supervisi', supervisi_id=supervisi.id)
 
-    return render(request, 'admin/detail_supervisi.html', {'supervisi': supervisi})
+    # tabel hasil disusun sekali: struktur format dari cache + jawaban per aspek (satu query)
+    grid = grid_jawaban(struktur, jawaban_supervisi([supervisi.id])[supervisi.id])
+    return render(request, 'admin/detail_supervisi.html', {
+        'supervisi': supervisi,
+        'grid': grid,
+    })
 
 
 @login_required
 @user_passes_test(admin_required)
 def hapus_supervisi(request, pk):
-    supervisi_obj = get_object_or_404(Supervisi, pk=pk)
+    supervisi_obj = get_object_or_404(Supervisi.objects.select_related('perawat', 'format_supervisi'), pk=pk)
     if request.method == "POST":
         supervisi_obj.delete()
         messages.success(request, "Data supervisi berhasil dihapus.")
@@ -266,9 +452,11 @@ def hapus_akun(request, user_id):
 
 @user_passes_test(admin_required)
 def kelola_format(request):
+    # queryset dibiarkan lazy: hanya dievaluasi bila fragmen cache-nya kosong
     formats = FormatSupervisi.objects.all().prefetch_related('items__aspek')
     context = {
         'formats': formats,
+        'versi_format': FormatSupervisi.kunci_versi(),
         'current': 'kelola_format',
     }
     return render(request, 'admin/kelola_format.html', context)
@@ -304,7 +492,10 @@ def hapus_format(request, pk):
 @login_required
 def daftar_format_supervisi(request):
     formats = FormatSupervisi.objects.all()
-    return render(request, "supervisi/format_list.html", {"formats": formats})
+    return render(request, "supervisi/format_list.html", {
+        "formats": formats,
+        "versi_format": FormatSupervisi.kunci_versi(),
+    })
 
 
 @login_required
@@ -313,7 +504,7 @@ def isi_supervisi(request, format_id):
     Isi supervisi (Perawat). TTD Perawat opsional.
     """
     format_supervisi = get_object_or_404(FormatSupervisi, id=format_id)
-    items = format_supervisi.items.prefetch_related('aspek')
+    struktur = struktur_format(format_supervisi)
 
     if request.method == 'POST':
         tim = request.POST.get('tim')
@@ -323,38 +514,22 @@ def isi_supervisi(request, format_id):
         if not perawat_nama:
             perawat_nama = request.user.get_full_name().strip() if request.user.get_full_name() else request.user.username
 
-        supervisi = Supervisi.objects.create(
-            format_supervisi=format_supervisi,
-            perawat=request.user,
-            perawat_nama=perawat_nama,
-            tim=tim,
-            jenjang_pk=jenjang_pk,
-            ruang=ruang,
-            ttd_perawat=request.FILES.get('ttd_perawat')  # opsional
-        )
-
-        total_d = 0
-        total_item = 0
-
-        for item in items:
-            for aspek in item.aspek.all():
-                d = request.POST.get(f"d_{aspek.id}") == "on"
-                td = request.POST.get(f"td_{aspek.id}") == "on"
-
-                if d or td:
-                    total_item += 1
-                    if d:
-                        total_d += 1
-
-                JawabanAspek.objects.create(
-                    supervisi=supervisi,
-                    aspek=aspek,
-                    d=d,
-                    td=td
-                )
-
-        supervisi.skor_total = (total_d / total_item) * 100 if total_item > 0 else 0
-        supervisi.save()
+        bobot = struktur.bobot_aspek()
+        try:
+            buat_supervisi(
+                format_supervisi,
+                baca_jawaban_post(request.POST, bobot),
+                bobot,
+                perawat=request.user,
+                perawat_nama=perawat_nama,
+                tim=tim,
+                jenjang_pk=jenjang_pk,
+                ruang=ruang,
+                ttd_perawat=request.FILES.get('ttd_perawat')  # opsional
+            )
+        except ValidationError as e:
+            messages.error(request, e.messages[0])
+            return redirect('isi_supervisi', format_id=format_supervisi.id)
 
         messages.success(request, "Data supervisi berhasil disimpan.")
         return redirect('daftar_format_supervisi')
@@ -363,7 +538,7 @@ def isi_supervisi(request, format_id):
 
     return render(request, 'supervisi/isi_supervisi.html', {
         'format': format_supervisi,
-        'items': items,
+        'items': struktur.items,
         'default_perawat_nama': default_perawat_nama,
     })
 
@@ -401,12 +576,8 @@ def ringkasan_saya(request):
 
 # ================== HITUNG SKOR ==================
 def hitung_skor_total(supervisi_id):
-    s = Supervisi.objects.get(id=supervisi_id)
-    jawaban = s.jawaban.all()
-    total_bobot = sum([j.item.bobot for j in jawaban])
-    total_score = sum([j.jawaban * j.item.bobot for j in jawaban])
-    s.skor_total = (total_score / total_bobot) * 100 if total_bobot > 0 else 0
-    s.save()
+    """Hitung ulang skor satu supervisi lewat mesin skor (lihat scoring.py)."""
+    hitung_ulang_skor(Supervisi.objects.filter(id=supervisi_id))
 
 
 # ================== FORMAT (ADMIN) ==================
@@ -425,28 +596,9 @@ def tambah_item_format(request, format_id):
     format_supervisi = get_object_or_404(FormatSupervisi, id=format_id)
 
     if request.method == 'POST':
-        prosedur_index = 0
-        while f'prosedur_{prosedur_index}' in request.POST:
-            prosedur_text = request.POST.get(f'prosedur_{prosedur_index}').strip()
-            if prosedur_text:
-                item = ItemFormat.objects.create(
-                    format_supervisi=format_supervisi,
-                    pertanyaan=prosedur_text
-                )
-                aspek_index = 0
-                while f'aspek_{prosedur_index}_{aspek_index}' in request.POST:
-                    nama_aspek = request.POST.get(f'aspek_{prosedur_index}_{aspek_index}').strip()
-                    if nama_aspek:
-                        d_checked = request.POST.get(f'd_{prosedur_index}_{aspek_index}') == 'on'
-                        td_checked = request.POST.get(f'td_{prosedur_index}_{aspek_index}') == 'on'
-                        AspekFormat.objects.create(
-                            item_format=item,
-                            nama_aspek=nama_aspek,
-                            d=d_checked,
-                            td=td_checked
-                        )
-                    aspek_index += 1
-            prosedur_index += 1
+        items = definisi_dari_post(request.POST)
+        if items:
+            impor_format({'items': items}, format_supervisi)
         return redirect('kelola_format')
 
     return render(request, 'admin/item_form.html', {
@@ -455,6 +607,85 @@ def tambah_item_format(request, format_id):
     })
 
 
+@login_required
+@user_passes_test(admin_required)
+def impor_supervisi_view(request):
+    """Impor massal supervisi lama dari file CSV/JSON (lihat impor_supervisi.py)."""
+    if request.method == 'POST':
+        form = ImporSupervisiForm(request.POST, request.FILES)
+        if form.is_valid():
+            berkas = form.cleaned_data['berkas']
+            try:
+                hasil = impor_supervisi(
+                    berkas.read(), berkas.name, lewati_salah=form.cleaned_data['lewati_salah'],
+                )
+            except ValidationError as e:
+                form.add_error(None, e)
+            else:
+                messages.success(
+                    request,
+                    f"{hasil['supervisi']} supervisi dan {hasil['jawaban']} jawaban diimpor "
+                    f"dalam {hasil['detik']:.1f} detik.",
+                )
+                if hasil['salah']:
+                    contoh = "; ".join(f"baris {no}: {p}" for no, p in hasil['salah'][:5])
+                    messages.warning(request, f"{len(hasil['salah'])} baris dilewati ({contoh}).")
+                return redirect('daftar_supervisi')
+    else:
+        form = ImporSupervisiForm()
+    return render(request, 'admin/impor_supervisi.html', {
+        'form': form,
+        'format_list': FormatSupervisi.objects.order_by('nama'),
+        'current': 'daftar_supervisi',
+    })
+
+
+@login_required
+@user_passes_test(admin_required)
+def templat_impor_supervisi(request):
+    pk = request.GET.get('format', '')
+    if not pk.isdigit():
+        raise Http404
+    format_supervisi = get_object_or_404(FormatSupervisi, pk=pk)
+    response = HttpResponse(templat_csv(format_supervisi), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="templat_supervisi_{format_supervisi.id}.csv"'
+    return response
+
+
+@login_required
+@user_passes_test(admin_required)
+def impor_format_view(request):
+    """Impor definisi format dari file JSON/CSV (lihat format_io.py)."""
+    if request.method == 'POST':
+        form = ImporFormatForm(request.POST, request.FILES)
+        if form.is_valid():
+            format_supervisi, jumlah_item, jumlah_aspek = impor_format(
+                form.cleaned_data['definisi'], form.cleaned_data['format_supervisi'],
+            )
+            messages.success(
+                request,
+                f"{jumlah_item} item dan {jumlah_aspek} aspek diimpor ke format '{format_supervisi.nama}'.",
+            )
+            return redirect('kelola_format')
+    else:
+        form = ImporFormatForm()
+    return render(request, 'admin/impor_format.html', {'form': form, 'current': 'kelola_format'})
+
+
+@login_required
+@user_passes_test(admin_required)
+def ekspor_format_view(request, pk):
+    format_supervisi = get_object_or_404(FormatSupervisi, pk=pk)
+    if request.GET.get('berkas') == 'csv':
+        response = HttpResponse(ekspor_csv(format_supervisi), content_type='text/csv; charset=utf-8')
+        ekstensi = 'csv'
+    else:
+        response = HttpResponse(ekspor_json(format_supervisi), content_type='application/json; charset=utf-8')
+        ekstensi = 'json'
+    response['Content-Disposition'] = f'attachment; filename="format_{format_supervisi.id}.{ekstensi}"'
+    return response
+
+
 @login_required
 @user_passes_test(admin_required)
 def edit_item_format(request, item_id):
@@ -531,178 +762,94 @@ def hapus_item_format(request, item_id):
 
 
 # ================== CETAK PDF (ReportLab, layout seperti HTML) ==================
+@login_required
 def cetak_supervisi_pdf(request, supervisi_id):
+    """
+    Unduh PDF hasil supervisi (admin: semua supervisi, perawat: miliknya sendiri).
+    File PDF di-cache di disk per supervisi dan waktu perubahan terakhir, jadi
+    unduhan berikutnya langsung dilayani dari file.
+    Jika belum ada di cache, render dimasukkan ke antrian tugas latar.
+    """
     s = get_object_or_404(Supervisi.objects.select_related(
         "format_supervisi", "perawat", "kepala_ruangan"
     ), id=supervisi_id)
+    if not (request.user.is_staff or s.perawat_id == request.user.id):
+        raise Http404
+
+    path = path_cache(s)
+    if not path.exists():
+        if settings.TUGAS_ANTRIAN_AKTIF:
+            tugas = antrekan('pdf_supervisi', {'supervisi_id': s.id}, user=request.user)
+            return redirect('status_tugas', tugas_id=tugas.id)
+        path = pdf_supervisi(s)
+
+    return FileResponse(
+        open(path, 'rb'),
+        as_attachment=True,
+        filename=f"supervisi_{s.id}.pdf",
+        content_type='application/pdf',
+    )
 
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="supervisi_{s.id}.pdf"'
 
-    doc = SimpleDocTemplate(
-        response, pagesize=A4,
-        leftMargin=1.4*cm, rightMargin=1.4*cm,
-        topMargin=1.6*cm, bottomMargin=1.4*cm
-    )
+# ================== TUGAS LATAR ==================
+def _tugas_milik(request, tugas_id):
+    tugas = get_object_or_404(Tugas, id=tugas_id)
+    if not (request.user.is_staff or tugas.dibuat_oleh_id == request.user.id):
+        raise Http404
+    return tugas
 
-    css = getSampleStyleSheet()
-    st_title = ParagraphStyle('title', parent=css['Normal'],
-                              fontName='Times-Bold', fontSize=14, leading=18,
-                              alignment=1, spaceAfter=14, spaceBefore=2)
-    st_small = ParagraphStyle('small', parent=css['Normal'],
-                              fontName='Times-Roman', fontSize=11.5, leading=13)
 
-    elements = []
+@login_required
+def status_tugas(request, tugas_id):
+    tugas = _tugas_milik(request, tugas_id)
+    return render(request, 'supervisi/status_tugas.html', {'tugas': tugas})
 
-    # Judul
-    elements.append(Paragraph("FORM SUPERVISI KEPERAWATAN MONITORING BALANCE CAIRAN", st_title))
-    elements.append(Spacer(1, 6))
 
-    iw = doc.width
+@login_required
+def status_tugas_json(request, tugas_id):
+    tugas = _tugas_milik(request, tugas_id)
+    return JsonResponse({
+        'id': tugas.id,
+        'status': tugas.status,
+        'status_label': tugas.get_status_display(),
+        'progres': tugas.progres,
+        'pesan': tugas.pesan,
+        'unduh_url': reverse('unduh_tugas', args=[tugas.id]) if tugas.status == Tugas.SELESAI else None,
+    })
 
-    # Info
-    perawat_display = (
-        s.perawat_nama
-        or (s.perawat.get_full_name() if s.perawat and s.perawat.get_full_name() else None)
-        or (s.perawat.username if s.perawat else "")
-    )
 
-    col_info_label = 0.22 * iw
-    col_info_value = 0.28 * iw
-    info_rows = [
-        [
-            Paragraph("<b>Perawat</b>", st_small),
-            Paragraph(perawat_display, st_small),
-            Paragraph("<b>Skor Total</b>", st_small),
-            Paragraph(f"{s.skor_total:.1f}%", st_small),
-        ],
-        [
-            Paragraph("<b>Ruang</b>", st_small),
-            Paragraph(s.ruang, st_small),
-            Paragraph("<b>Tim</b>", st_small),
-            Paragraph(f"Tim {s.tim}", st_small),
-        ],
-        [
-            Paragraph("<b>Jenjang PK</b>", st_small),
-            Paragraph(s.jenjang_pk, st_small),
-            "", ""
-        ],
-    ]
-    info_tbl = Table(
-        info_rows,
-        colWidths=[col_info_label, col_info_value, col_info_label, col_info_value]
-    )
-    info_tbl.setStyle(TableStyle([
-        ('FONT', (0,0), (-1,-1), 'Times-Roman', 12),
-        ('ALIGN', (0,0), (-1,-1), 'LEFT'),
-        ('VALIGN', (0,0), (-1,-1), 'TOP'),
-        ('TOPPADDING', (0,0), (-1,-1), 2),
-        ('BOTTOMPADDING', (0,0), (-1,-1), 2),
-        ('LEFTPADDING', (0,0), (-1,-1), 0),
-        ('RIGHTPADDING', (0,0), (-1,-1), 0),
-    ]))
-    elements.append(info_tbl)
-    elements.append(Spacer(1, 8))
-
-    # Tabel utama
-    col1 = 0.25 * iw
-    colD = 0.075 * iw
-    colTD = 0.075 * iw
-    col2 = iw - (col1 + colD + colTD)
-
-    data = [
-        [Paragraph("<b>PROSEDUR</b>", st_small),
-         Paragraph("<b>ASPEK YANG DINILAI</b>", st_small),
-         Paragraph("<b>PENILAIAN</b>", st_small), ""],
-        ["", "", Paragraph("<b>D</b>", st_small), Paragraph("<b>TD</b>", st_small)]
-    ]
-
-    for item in s.format_supervisi.items.all():
-        aspek_list = list(item.aspek.all())
-        for idx, aspek in enumerate(aspek_list):
-            jd = "✓" if s.jawaban_aspek.filter(aspek=aspek, d=True).exists() else ""
-            jtd = "✓" if s.jawaban_aspek.filter(aspek=aspek, td=True).exists() else ""
-            data.append([
-                Paragraph(item.pertanyaan if idx == 0 else "", st_small),
-                Paragraph(f"{idx+1}. {aspek.nama_aspek}", st_small),
-                Paragraph(f"<para align='center'>{jd}</para>", st_small),
-                Paragraph(f"<para align='center'>{jtd}</para>", st_small),
-            ])
-
-    tbl = Table(data, colWidths=[col1, col2, colD, colTD])
-    tbl.setStyle(TableStyle([
-        ('SPAN', (0,0), (0,1)),
-        ('SPAN', (1,0), (1,1)),
-        ('SPAN', (2,0), (3,0)),
-        ('GRID', (0,0), (-1,-1), 1, colors.black),
-        ('BOX',  (0,0), (-1,-1), 1, colors.black),
-        ('FONT', (0,0), (-1,1), 'Times-Bold', 12),
-        ('ALIGN', (0,0), (-1,1), 'CENTER'),
-        ('VALIGN', (0,0), (-1,-1), 'TOP'),
-        ('ALIGN', (2,2), (3,-1), 'CENTER'),
-        ('FONT', (0,2), (-1,-1), 'Times-Roman', 12),
-        ('LEFTPADDING', (0,0), (-1,-1), 6),
-        ('RIGHTPADDING', (0,0), (-1,-1), 6),
-        ('TOPPADDING', (0,0), (-1,-1), 5),
-        ('BOTTOMPADDING', (0,0), (-1,-1), 5),
-        ('BACKGROUND', (0,0), (-1,1), colors.whitesmoke),
-    ]))
-    elements.append(tbl)
-
-    # Spasi sebelum tanda tangan
-    elements.append(Spacer(1, 36))
-
-    # Label tanda tangan
-    col_signature = iw / 2
-    lbl = Table([["PERAWAT YANG DI SUPERVISI", "SUPERVISOR"]],
-                colWidths=[col_signature, col_signature])
-    lbl.setStyle(TableStyle([
-        ('FONT', (0,0), (-1,-1), 'Times-Bold', 12),
-        ('ALIGN', (0,0), (-1,-1), 'CENTER'),
-        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-        ('BOTTOMPADDING', (0,0), (-1,-1), 28),
-    ]))
-    elements.append(lbl)
-
-    # Gambar TTD
-    left_img = Image(s.ttd_perawat.path, width=4*cm, height=2.3*cm) if s.ttd_perawat else Spacer(1, 2.3*cm)
-    right_img = Image(s.ttd_kepala.path, width=4*cm, height=2.3*cm) if s.ttd_kepala else Spacer(1, 2.3*cm)
-    ttd = Table([[left_img, right_img]], colWidths=[col_signature, col_signature])
-    ttd.setStyle(TableStyle([
-        ('ALIGN', (0,0), (-1,-1), 'CENTER'),
-        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-        ('BOTTOMPADDING', (0,0), (-1,-1), 4),
-    ]))
-    elements.append(ttd)
-
-    # Nama + NIP kepala (ambil dari input admin/detail_supervisi.html jika diisi)
-    sup_name = (s.kepala_nama or
-                (s.kepala_ruangan.get_full_name() if s.kepala_ruangan and s.kepala_ruangan.get_full_name()
-                 else (s.kepala_ruangan.username if s.kepala_ruangan else "")))
-    sup_nip = s.kepala_nip or ""
-
-    nurse_name = perawat_display or ""
-
-    name_cells = [
-        [
-            Paragraph(
-                f"<para align='center'><u>{nurse_name}</u></para>",
-                st_small
-            ),
-            Paragraph(
-                f"<para align='center'><u>{sup_name}</u>{('<br/>NIP : ' + sup_nip) if sup_nip else ''}</para>",
-                st_small
-            )
-        ]
-    ]
-    names = Table(name_cells, colWidths=[col_signature, col_signature])
-    names.setStyle(TableStyle([
-        ('ALIGN', (0,0), (-1,-1), 'CENTER'),
-        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-        ('TOPPADDING', (0,0), (-1,-1), 8),
-        ('BOTTOMPADDING', (0,0), (-1,-1), 4),
-    ]))
-    elements.append(names)
-
-    doc.build(elements)
-    return response
+@login_required
+def unduh_tugas(request, tugas_id):
+    tugas = _tugas_milik(request, tugas_id)
+    if tugas.status != Tugas.SELESAI:
+        return redirect('status_tugas', tugas_id=tugas.id)
+    try:
+        berkas = open(tugas.hasil, 'rb')
+    except FileNotFoundError:
+        # hasil sudah kedaluwarsa (mis. cache PDF dibuang setelah data diubah)
+        if tugas.jenis == 'pdf_supervisi':
+            return redirect('cetak_supervisi_pdf', supervisi_id=tugas.parameter['supervisi_id'])
+        raise Http404
+    return FileResponse(berkas, as_attachment=True, filename=tugas.nama_file)
+
+
+# ================== MEDIA ==================
+@login_required
+@require_safe
+def media_terproteksi(request, nama):
+    """
+    Kirim file media (TTD) ke user yang login. Admin boleh mengakses semua file;
+    perawat hanya file yang dirujuk supervisinya sendiri.
+    """
+    try:
+        path = default_storage.path(nama)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not request.user.is_staff:
+        asli = nama_asli_thumbnail(nama) or nama
+        if not Supervisi.objects.filter(Q(ttd_perawat=asli) | Q(ttd_kepala=asli), perawat=request.user).exists():
+            raise Http404
+    try:
+        return kirim_berkas(request, nama, path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise Http404
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -43,6 +44,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'supervisi.profil.ProfilMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -55,7 +57,8 @@ ROOT_URLCONF = 'supervisi_ners.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates + pencatat waktu render untuk profil request (supervisi/profil.py)
+        'BACKEND': 'supervisi.profil.DjangoTemplatesTerukur',
         'DIRS': [ BASE_DIR / "templates"],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -75,12 +78,62 @@ WSGI_APPLICATION = 'supervisi_ners.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# Profil dipilih lewat environment DB_PROFIL: 'sqlite' (default) atau 'postgres'.
+# Uji beban tulis bersamaan: `manage.py bench_penulis`.
+DB_PROFIL = os.environ.get('DB_PROFIL', 'sqlite')
+
+if DB_PROFIL == 'postgres':
+    # Butuh psycopg (`pip install "psycopg[binary]"`; tambah `[pool]` untuk DB_POOL=django).
+    # DB_POOL: '' = koneksi persisten per proses, 'django' = pool psycopg bawaan Django,
+    # 'pgbouncer' = lewat PgBouncer mode transaction (tanpa server-side cursor).
+    DB_POOL = os.environ.get('DB_POOL', '')
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAMA', 'supervisi_ners'),
+            'USER': os.environ.get('DB_USER', 'supervisi_ners'),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DB_PORT', '5432'),
+            # pool Django tidak boleh digabung dengan koneksi persisten
+            'CONN_MAX_AGE': 0 if DB_POOL == 'django' else int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': True,
+            'DISABLE_SERVER_SIDE_CURSORS': DB_POOL == 'pgbouncer',
+            'OPTIONS': {
+                'connect_timeout': 5,
+                **({'pool': {
+                    'min_size': int(os.environ.get('DB_POOL_MIN', 2)),
+                    'max_size': int(os.environ.get('DB_POOL_MAKS', 10)),
+                    'timeout': 10,
+                }} if DB_POOL == 'django' else {}),
+            },
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DB_NAMA', BASE_DIR / 'db.sqlite3'),
+            # koneksi dipakai ulang antar request; dicek dulu sebelum dipakai
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 600)),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                # tunggu kunci tulis hingga N detik alih-alih langsung "database is locked"
+                'timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', 20)),
+                # ambil kunci tulis di awal transaksi supaya tidak gagal saat upgrade kunci
+                'transaction_mode': 'IMMEDIATE',
+                # WAL: pembaca tidak memblokir penulis; synchronous=NORMAL aman di WAL;
+                # cache 20MB per koneksi dan tabel sementara di memori
+                'init_command': (
+                    'PRAGMA journal_mode=WAL;'
+                    'PRAGMA synchronous=NORMAL;'
+                    'PRAGMA cache_size=-20000;'
+                    'PRAGMA temp_store=MEMORY;'
+                    'PRAGMA mmap_size=134217728;'
+                ),
+            },
+        }
     }
-}
 
 
 # Password validation
@@ -121,6 +174,31 @@ STATIC_URL = 'static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Cache PDF hasil supervisi (di luar MEDIA_ROOT supaya tidak ikut dilayani publik)
+PDF_CACHE_DIR = BASE_DIR / 'cache' / 'pdf'
+# Jumlah proses render untuk ekspor PDF massal (None = jumlah CPU, 1 = tanpa process pool)
+PDF_EXPORT_WORKERS = None
+# Skor supervisi memperhitungkan ItemFormat.bobot (False = setiap aspek bernilai sama).
+# Skor lama tidak ikut berubah saat ini diganti: jalankan `manage.py hitung_ulang_skor`
+# sesudahnya supaya dashboard dan ekspor tidak mencampur dua skala.
+SKOR_TERTIMBANG = False
+# Render PDF lewat antrian tugas (`manage.py jalankan_tugas`); False = render langsung di request
+TUGAS_ANTRIAN_AKTIF = True
+# Jumlah struktur format (item + aspek) yang disimpan di memori tiap proses
+STRUKTUR_FORMAT_CACHE = 128
+# Batas ukuran (lebar, tinggi) TTD hasil olahan untuk PDF dan thumbnail web
+TTD_UKURAN_PDF = (800, 400)
+TTD_UKURAN_THUMB = (240, 120)
+# Pengiriman isi file media oleh web server depan: None (FileResponse dari Django),
+# 'x-accel-redirect' (nginx) atau 'x-sendfile' (Apache/lighttpd)
+MEDIA_OFFLOAD = None
+# Lokasi `internal` nginx yang menunjuk ke MEDIA_ROOT, untuk X-Accel-Redirect
+MEDIA_OFFLOAD_PREFIX = '/_media/'
+# Porsi request yang diprofil (SQL, template, total; lihat supervisi/profil.py): 0 = mati, 1 = semua
+PROFIL_SAMPEL = 0.1
+# Jumlah request tersampel terakhir per view yang disimpan untuk persentil halaman Performa
+PROFIL_JENDELA = 500
+
 LOGIN_URL = '/login/'      # URL halaman login
 LOGIN_REDIRECT_URL = ''   # Setelah login sukses
 
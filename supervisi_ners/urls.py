@@ -8,7 +8,3 @@ urlpatterns = [
     path('', include('supervisi.urls')),
 ]
 
-# Tambahkan jika menggunakan media
-from django.conf import settings
-from django.conf.urls.static import static
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)